@@ -0,0 +1,182 @@
+import argparse  # Розбір параметрів командного рядка
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+
+try:
+    import resource  # Пікова пам'ять процесу (лише Unix)
+except ImportError:
+    resource = None
+
+import randomizer
+from genetic_algo import genetic_algorithm
+
+# Драбина розмірів задач для генераторів з randomizer
+LADDER = {
+    'small': {'groups': 5, 'subjects_per_group': 3, 'lecturers': 5, 'auditoriums': 7},
+    'medium': {'groups': 50, 'subjects_per_group': 3, 'lecturers': 50, 'auditoriums': 70},
+    'large': {'groups': 500, 'subjects_per_group': 3, 'lecturers': 500, 'auditoriums': 700},
+}
+
+# Розміри, що запускаються за замовчуванням ('large' на рушії python триває десятки хвилин)
+DEFAULT_SIZES = ['small', 'medium']
+
+# Показники, за якими порівнюються запуски: назва -> чи краще більше значення
+COMPARED_METRICS = {
+    'wall_seconds': False,
+    'evaluations_per_second': True,
+    'peak_memory_mb': False,
+    'hard': False,
+    'soft': False,
+}
+
+
+# Генерація задачі розміру size з фіксованим seed (генератори randomizer використовують модуль random)
+def generate_instance(size, seed):
+    params = LADDER[size]
+    random.seed(seed)
+    groups = randomizer.generate_random_groups(params['groups'])
+    subjects = randomizer.generate_random_subjects(groups, params['subjects_per_group'])
+    lecturers = randomizer.generate_random_lecturers(params['lecturers'], subjects)
+    auditoriums = randomizer.generate_random_auditoriums(params['auditoriums'])
+    return groups, subjects, lecturers, auditoriums
+
+
+# Пікова резидентна пам'ять цього процесу та його дочірніх процесів у мегабайтах
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss — у кілобайтах на Linux та в байтах на macOS
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+
+# Один запуск алгоритму на задачі розміру size (без виводу перебігу поколінь)
+def run_case(size, seed, ga_options):
+    clock = time.perf_counter()
+    groups, subjects, lecturers, auditoriums = generate_instance(size, seed)
+    generate_seconds = time.perf_counter() - clock
+
+    stats = {}
+    clock = time.perf_counter()
+    best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums, seed=seed, stats=stats,
+                                      observers=[], **ga_options)
+    wall_seconds = time.perf_counter() - clock
+    best_schedule.attach(groups, lecturers, auditoriums)
+
+    phase_seconds = {'generate_instance': generate_seconds}
+    phase_seconds.update(stats['phase_seconds'])
+    return {
+        'size': size,
+        **LADDER[size],
+        'events': len(best_schedule.events),
+        'wall_seconds': round(wall_seconds, 3),
+        'phase_seconds': {phase: round(seconds, 3) for phase, seconds in phase_seconds.items()},
+        'evaluations': stats.get('evaluations'),
+        'evaluations_per_second': round(stats['evaluations'] / wall_seconds, 1) if stats.get('evaluations') else None,
+        'peak_memory_mb': peak_memory_mb(),
+        'generations_hard': stats.get('generations_hard'),
+        'generations_soft': stats.get('generations_soft'),
+        'feasible_generation': stats.get('feasible_generation'),
+        'hard': best_schedule.hard_constraints_violations,
+        'soft': best_schedule.soft_constraints_score,
+    }
+
+
+def _case_process(queue, size, seed, ga_options):
+    queue.put(run_case(size, seed, ga_options))
+
+
+# Запуск у окремому процесі, щоб пікова пам'ять кожного розміру вимірювалась незалежно
+def run_isolated(size, seed, ga_options):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_case_process, args=(queue, size, seed, ga_options))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+# Порівняння результатів з базовими: повертає список регресій понад допуск tolerance (частка)
+def compare(results, baseline, tolerance=0.2):
+    baseline_by_size = {result['size']: result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        base = baseline_by_size.get(result['size'])
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, base_value = result.get(metric), base.get(metric)
+            if value is None or base_value is None:
+                continue
+            if higher_is_better:
+                worse = value < base_value * (1 - tolerance)
+            else:
+                worse = value > base_value * (1 + tolerance)
+            if worse:
+                regressions.append((result['size'], metric, base_value, value))
+    return regressions
+
+
+# Виведення результатів у вигляді таблиці
+def print_results(results):
+    print(f"{'Size':<8} {'Events':<8} {'Wall, s':<10} {'Evals/s':<10} {'Peak, MB':<10} "
+          f"{'Feasible':<10} {'Hard':<8} {'Soft':<8}")
+    print("-" * 78)
+    for result in results:
+        print(f"{result['size']:<8} {result['events']:<8} {result['wall_seconds']:<10} "
+              f"{str(result['evaluations_per_second']):<10} {str(result['peak_memory_mb']):<10} "
+              f"{str(result['feasible_generation']):<10} {result['hard']:<8} {result['soft']:<8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк генетичного алгоритму на задачах різного розміру')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, choices=list(LADDER))
+    parser.add_argument('--seed', type=int, default=1)  # Seed генераторів задач та алгоритму
+    parser.add_argument('--generations', type=int, default=20)  # Поколінь на кожному етапі
+    parser.add_argument('--engine', default='python', choices=['python', 'numpy'])
+    parser.add_argument('--backend', default='serial', choices=['serial', 'thread', 'process'])
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default='benchmark_results.json')  # Файл з результатами
+    parser.add_argument('--baseline')  # Файл з попередніми результатами для порівняння
+    parser.add_argument('--tolerance', type=float, default=0.2)  # Допустиме погіршення (частка)
+    args = parser.parse_args()
+
+    ga_options = {'generations': args.generations, 'engine': args.engine, 'backend': args.backend,
+                  'workers': args.workers}
+    results = []
+    for size in args.sizes:
+        print(f"Розмір {size}: {LADDER[size]}", flush=True)
+        results.append(run_isolated(size, args.seed, ga_options))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'options': ga_options,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print()
+    print_results(results)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('options') != ga_options or baseline.get('seed') != args.seed:
+            print("\nУвага: параметри базового запуску відрізняються від поточних")
+        regressions = compare(results, baseline, args.tolerance)
+        for size, metric, base_value, value in regressions:
+            print(f"Регресія: {size}, {metric}: {base_value} -> {value}")
+        if regressions:
+            sys.exit(1)
+        print("\nРегресій відносно базового запуску немає.")
+
+
+if __name__ == '__main__':
+    main()
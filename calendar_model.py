@@ -0,0 +1,182 @@
+import contextlib
+
+# Типи тижнів за замовчуванням: парний та непарний
+WEEK_TYPES = ['EVEN', 'ODD']
+
+# Тип тижня дисципліни, що проводиться в усі тижні календаря
+EVERY_WEEK = 'Both'
+
+# Кількість днів у тижні (без врахування субот) та академічних годин (пар) на день за замовчуванням
+DAYS_PER_WEEK = 5
+LESSONS_PER_DAY = 4
+
+# Найбільша кількість пар на день: таблиці «вікон» мають 2^lessons_per_day рядків
+MAX_LESSONS_PER_DAY = 12
+
+# Тривалість однієї пари в годинах
+LESSON_HOURS = 1.5
+
+# Час початку пар за замовчуванням (для календаря iCalendar); для довших днів продовжується з тим самим кроком
+LESSON_STARTS = ['08:40', '10:35', '12:20', '14:05']
+
+
+# Час початку кожної з count пар: LESSON_STARTS, продовжений кроком між двома останніми парами
+def default_lesson_starts(count):
+    minutes = [int(t[:2]) * 60 + int(t[3:]) for t in LESSON_STARTS]
+    step = minutes[-1] - minutes[-2]
+    while len(minutes) < count:
+        minutes.append(minutes[-1] + step)
+    return [f"{m // 60:02d}:{m % 60:02d}" for m in minutes[:count]]
+
+
+# Календар розкладу: тижні (з типами, за якими дисципліни обирають тижні), дні, пари та заблоковані слоти.
+# Слот — ціле число week * slots_per_week + day * lessons_per_day + lesson, тож тиждень, день і пара
+# обчислюються арифметично, а маски зайнятості мають по біту на слот. Таблиці «вікон» і маски тижнів
+# будуються один раз під час створення календаря
+class Calendar:
+    def __init__(self, weeks=None, days_per_week=DAYS_PER_WEEK, lessons_per_day=LESSONS_PER_DAY, week_types=None,
+                 blocked=(), lesson_hours=LESSON_HOURS, lesson_starts=None):
+        weeks = list(weeks or WEEK_TYPES)
+        week_types = list(week_types or weeks)
+        if len(set(weeks)) != len(weeks) or EVERY_WEEK in weeks:
+            raise ValueError(f"Назви тижнів мають бути різними й не збігатися з '{EVERY_WEEK}'")
+        if len(week_types) != len(weeks) or EVERY_WEEK in week_types:
+            raise ValueError("Кожен тиждень повинен мати тип, відмінний від 'Both'")
+        if days_per_week < 1 or not 1 <= lessons_per_day <= MAX_LESSONS_PER_DAY:
+            raise ValueError(f"Потрібен щонайменше один день і від 1 до {MAX_LESSONS_PER_DAY} пар на день")
+        lesson_starts = list(lesson_starts or default_lesson_starts(lessons_per_day))
+        if len(lesson_starts) != lessons_per_day:
+            raise ValueError("Кількість часів початку пар не збігається з кількістю пар на день")
+
+        self.weeks = weeks
+        self.week_types = week_types
+        self.days_per_week = days_per_week
+        self.lessons_per_day = lessons_per_day
+        self.lesson_hours = lesson_hours
+        self.lesson_starts = lesson_starts
+        self.slots_per_week = days_per_week * lessons_per_day
+        self.n_slots = len(weeks) * self.slots_per_week
+
+        # Назви слотів для виведення та номер тижня кожного слоту (список — без ділення в гарячих циклах)
+        self.labels = [f"{week} - day {day + 1}, lesson {lesson + 1}"
+                       for week in weeks for day in range(days_per_week) for lesson in range(lessons_per_day)]
+        self.slot_index = {label: slot for slot, label in enumerate(self.labels)}
+        self.slot_week = [slot // self.slots_per_week for slot in range(self.n_slots)]
+
+        # Заблоковані слоти (week, day, lesson — номери з нуля; None означає «усі»)
+        for week, day, lesson in blocked:
+            if not all(value is None or 0 <= value < limit for value, limit in
+                       ((week, len(weeks)), (day, days_per_week), (lesson, lessons_per_day))):
+                raise ValueError(f"Заблокований слот поза календарем: {(week, day, lesson)}")
+        self.blocked = sorted({
+            self.slot(w, d, ls)
+            for week, day, lesson in blocked
+            for w in (range(len(weeks)) if week is None else [week])
+            for d in (range(days_per_week) if day is None else [day])
+            for ls in (range(lessons_per_day) if lesson is None else [lesson])
+        })
+        self.blocked_mask = sum(1 << slot for slot in self.blocked)
+
+        # Ключ календаря: однакові налаштування дають однаковий ключ (для перевірки скомпільованих даних)
+        self.key = (tuple(weeks), tuple(week_types), days_per_week, lessons_per_day, tuple(self.blocked),
+                    lesson_hours, tuple(lesson_starts))
+
+        # Доступні (незаблоковані) слоти кожного тижня
+        week_mask = (1 << self.slots_per_week) - 1
+        self.week_masks = {week: (week_mask << (w * self.slots_per_week)) & ~self.blocked_mask
+                           for w, week in enumerate(weeks)}
+
+        # Маска пар одного дня та маски бітів, що після зсуву на k пар уліво (вправо) залишаються в межах дня
+        self.day_mask = (1 << lessons_per_day) - 1
+        self.fill_up = {k: sum(1 << i for i in range(self.n_slots) if i % lessons_per_day >= k)
+                        for k in range(1, lessons_per_day)}
+        self.fill_down = {k: sum(1 << i for i in range(self.n_slots) if i % lessons_per_day < lessons_per_day - k)
+                          for k in range(1, lessons_per_day)}
+
+        # «Вікна» дня для кожної маски пар одного дня та їх зміна після перемикання пари lesson:
+        # gap_change[mask][lesson], де mask — маска дня після перемикання
+        self.day_gaps = [self.mask_gaps(mask) for mask in range(1 << lessons_per_day)]
+        self.gap_change = [[self.day_gaps[mask] - self.day_gaps[mask ^ (1 << lesson)]
+                            for lesson in range(lessons_per_day)]
+                           for mask in range(1 << lessons_per_day)]
+
+    # Номер тижня, дня та пари слоту
+    def week(self, slot):
+        return slot // self.slots_per_week
+
+    def day(self, slot):
+        return slot // self.lessons_per_day % self.days_per_week
+
+    def lesson(self, slot):
+        return slot % self.lessons_per_day
+
+    # Слот за номерами тижня, дня та пари
+    def slot(self, week, day, lesson):
+        return (week * self.days_per_week + day) * self.lessons_per_day + lesson
+
+    # Тижні календаря, у які проводиться дисципліна з типом тижня week_type ('Both' — усі тижні)
+    def subject_weeks(self, week_type):
+        if week_type == EVERY_WEEK:
+            return self.weeks
+        return [week for week, kind in zip(self.weeks, self.week_types) if kind == week_type]
+
+    # Кількість «вікон» у масці зайнятості: у кожному дні заповнюємо біти від першої пари вгору та від
+    # останньої вниз (зсувами на 1, 2, ... пари), перетин — проміжок між першою та останньою парою дня
+    def mask_gaps(self, mask):
+        up = down = mask
+        shift = 1
+        while shift < self.lessons_per_day:
+            up |= (up << shift) & self.fill_up[shift]
+            down |= (down >> shift) & self.fill_down[shift]
+            shift *= 2
+        return (up & down & ~mask).bit_count()
+
+
+# Календар з налаштувань (словник, наприклад, з calendar.json):
+#   weeks — список назв тижнів або кількість тижнів семестру (тоді тижні W1, W2, ... з типами, що чергуються
+#   як WEEK_TYPES); week_types — типи тижнів; days_per_week, lessons_per_day, lesson_hours, lesson_starts;
+#   blocked — заблоковані слоти: {"week": назва або тип тижня, "day": номер дня, "lesson": номер пари}
+#   (номери з одиниці, відсутнє поле означає «усі»)
+def calendar_from_config(config):
+    weeks = config.get('weeks', WEEK_TYPES)
+    week_types = config.get('week_types')
+    if isinstance(weeks, int):
+        week_types = week_types or [WEEK_TYPES[w % len(WEEK_TYPES)] for w in range(weeks)]
+        weeks = [f"W{w + 1}" for w in range(weeks)]
+    week_types = week_types or weeks
+    blocked = []
+    for entry in config.get('blocked', ()):
+        week = entry.get('week')
+        matching = [w for w, (name, kind) in enumerate(zip(weeks, week_types)) if week in (name, kind)]
+        if week is not None and not matching:
+            raise ValueError(f"Невідомий тиждень заблокованого слоту: {week}")
+        day, lesson = entry.get('day'), entry.get('lesson')
+        for w in (matching if week is not None else [None]):
+            blocked.append((w, None if day is None else day - 1, None if lesson is None else lesson - 1))
+    return Calendar(weeks, config.get('days_per_week', DAYS_PER_WEEK), config.get('lessons_per_day', LESSONS_PER_DAY),
+                    week_types, blocked, config.get('lesson_hours', LESSON_HOURS), config.get('lesson_starts'))
+
+
+# Календар, з яким працюють генерація, оцінка та виведення розкладу. Модулі імпортують цей самий об'єкт,
+# тож use_calendar змінює його на місці, а не замінює
+CALENDAR = Calendar()
+
+
+# Перемикання на інший календар (наприклад, завантажений з даних задачі); повертає CALENDAR
+def use_calendar(calendar):
+    if calendar is not CALENDAR:
+        CALENDAR.__dict__.update(vars(calendar))
+    return CALENDAR
+
+
+# Календар на час блоку with (наприклад, одного завдання сервера): calendar (якщо задано) стає поточним,
+# а після блоку, навіть якщо він завершився помилкою, CALENDAR повертається до попереднього календаря,
+# тож наступне завдання того самого процесу не успадковує календар попереднього
+@contextlib.contextmanager
+def calendar_scope(calendar=None):
+    previous = dict(vars(CALENDAR))
+    try:
+        yield use_calendar(calendar) if calendar is not None else CALENDAR
+    finally:
+        CALENDAR.__dict__.clear()
+        CALENDAR.__dict__.update(previous)
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from calendar_model import CALENDAR
+from genetic_algo import (EventTemplate, Schedule, create_random_event, generation_index, group_size, lesson_count,
+                          sample_free, template_event)
+
+# Сигнатура та версія формату файлів контрольних точок
+MAGIC = b'GACKPT'
+VERSION = 1
+
+# Цілочисельні гени однієї події: шаблон, слот, викладач, аудиторія
+GENES_PER_EVENT = 4
+
+
+# Відбиток даних задачі: контрольна точка продовжується лише з тими самими даними
+def problem_fingerprint(groups, subjects, lecturers, auditoriums):
+    data = json.dumps([groups, subjects, lecturers, auditoriums], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+# Ключ шаблону події (незмінні поля) для таблиці шаблонів
+def _template_key(event):
+    subgroup_ids = sorted(event.subgroup_ids.items()) if event.subgroup_ids else None
+    return [list(event.group_ids), event.subject_id, event.subject_name, event.event_type, subgroup_ids,
+            event.week_type]
+
+
+# Кодування розкладів: таблиці шаблонів, викладачів та аудиторій і плаский масив цілочисельних генів
+def encode_population(population):
+    templates, template_index = [], {}
+    lecturer_ids, lecturer_index = [], {}
+    auditorium_ids, auditorium_index = [], {}
+    sizes, genes = array('I'), array('I')
+    for schedule in population:
+        sizes.append(len(schedule.events))
+        for event in schedule.events:
+            # Копії події в різних розкладах ділять шаблон, тож ключ будується один раз на шаблон
+            t = template_index.get(id(event.template))
+            if t is None:
+                key = json.dumps(_template_key(event), ensure_ascii=False)
+                t = template_index.get(key)
+                if t is None:
+                    t = template_index[key] = len(templates)
+                    templates.append(_template_key(event))
+                template_index[id(event.template)] = t
+            if event.lecturer_id not in lecturer_index:
+                lecturer_index[event.lecturer_id] = len(lecturer_ids)
+                lecturer_ids.append(event.lecturer_id)
+            if event.auditorium_id not in auditorium_index:
+                auditorium_index[event.auditorium_id] = len(auditorium_ids)
+                auditorium_ids.append(event.auditorium_id)
+            genes.extend((t, event.slot, lecturer_index[event.lecturer_id],
+                          auditorium_index[event.auditorium_id]))
+    tables = {'templates': templates, 'lecturers': lecturer_ids, 'auditoriums': auditorium_ids}
+    return tables, sizes, genes
+
+
+# Відновлення розкладів (без лічильників: їх перераховує Schedule.attach) з таблиць і генів
+def decode_population(tables, sizes, genes):
+    templates = []
+    for group_ids, subject_id, subject_name, event_type, subgroup_ids, week_type in tables['templates']:
+        # Шаблон створюється один раз і ділиться всіма подіями, як після Event.copy
+        templates.append(EventTemplate(group_ids, subject_id, subject_name, event_type,
+                                       dict(subgroup_ids) if subgroup_ids else None, week_type))
+    lecturer_ids, auditorium_ids = tables['lecturers'], tables['auditoriums']
+
+    population, position = [], 0
+    for size in sizes:
+        schedule = Schedule()
+        for _ in range(size):
+            t, slot, lecturer, auditorium = genes[position:position + GENES_PER_EVENT]
+            position += GENES_PER_EVENT
+            schedule.events.append(template_event(templates[t], slot, lecturer_ids[lecturer],
+                                                  auditorium_ids[auditorium]))
+        population.append(schedule)
+    return population
+
+
+# Масив цілих чисел у порядку байтів little-endian (формат файлу не залежить від платформи)
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values = array('I', values)
+        values.byteswap()
+    return values
+
+
+# Запис: сигнатура, версія, довжина та JSON-заголовок, стиснуті масиви цілих чисел.
+# Файл спочатку пишеться поруч і лише потім замінює попередній, тож перерваний запис його не псує
+def _write(path, header, arrays):
+    header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    body = b''.join(struct.pack('<I', len(values)) + _little_endian(values).tobytes() for values in arrays)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<BI', VERSION, len(header)) + header)
+        f.write(zlib.compress(body))
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} не є файлом контрольної точки")
+    offset = len(MAGIC)
+    version, header_size = struct.unpack_from('<BI', data, offset)
+    if version != VERSION:
+        raise ValueError(f"Непідтримувана версія контрольної точки: {version}")
+    offset += struct.calcsize('<BI')
+    header = json.loads(data[offset:offset + header_size].decode('utf-8'))
+    body = zlib.decompress(data[offset + header_size:])
+
+    arrays, position = [], 0
+    itemsize = array('I').itemsize
+    while position < len(body):
+        (count,) = struct.unpack_from('<I', body, position)
+        position += 4
+        values = array('I')
+        values.frombytes(body[position:position + count * itemsize])
+        position += count * itemsize
+        arrays.append(_little_endian(values))
+    return header, arrays
+
+
+# Контрольна точка еволюції: популяція, етап ('hard' або 'soft'), номер наступного покоління та стан генератора
+def save_checkpoint(path, population, phase, generation, rng, fingerprint):
+    tables, sizes, genes = encode_population(population)
+    version, internal_state, gauss_next = rng.getstate()
+    header = {'kind': 'checkpoint', 'phase': phase, 'generation': generation, 'fingerprint': fingerprint,
+              'rng': [version, gauss_next], **tables}
+    _write(path, header, [sizes, genes, array('I', internal_state)])
+
+
+# Завантаження контрольної точки для тих самих даних задачі (розклади прив'язуються до даних)
+def load_checkpoint(path, groups, subjects, lecturers, auditoriums):
+    header, (sizes, genes, internal_state) = _read(path)
+    if header.get('kind') != 'checkpoint':
+        raise ValueError(f"{path} містить розклад, а не контрольну точку")
+    if header['fingerprint'] != problem_fingerprint(groups, subjects, lecturers, auditoriums):
+        raise ValueError("Дані задачі змінилися після збереження контрольної точки; "
+                         "використайте теплий старт з найкращого розкладу")
+    lessons = lesson_count(groups, subjects, lecturers, auditoriums)
+    population = [schedule.attach(groups, lecturers, auditoriums).expect_lessons(lessons)
+                  for schedule in decode_population(header, sizes, genes)]
+    version, gauss_next = header['rng']
+    return {
+        'population': population,
+        'phase': header['phase'],
+        'generation': header['generation'],
+        'rng_state': (version, tuple(internal_state), gauss_next),
+    }
+
+
+# Збереження одного розкладу (наприклад, найкращого) у тому самому форматі.
+# Разом з розкладом можна зберегти вхідні дані problem_data = (groups, subjects, lecturers, auditoriums),
+# щоб пізніше порівняти їх зі зміненими даними (інкрементальне перепланування)
+def save_schedule(path, schedule, problem_data=None):
+    tables, sizes, genes = encode_population([schedule])
+    header = {'kind': 'schedule', **tables}
+    if problem_data is not None:
+        header['problem'] = list(problem_data)
+    _write(path, header, [sizes, genes])
+
+
+# Завантаження розкладу без прив'язки до даних задачі
+def load_schedule(path):
+    header, arrays = _read(path)
+    return decode_population(header, arrays[0], arrays[1])[0]
+
+
+# Вхідні дані, збережені разом з розкладом (None, якщо їх не зберігали)
+def load_problem_data(path):
+    header, _ = _read(path)
+    problem = header.get('problem')
+    return tuple(problem) if problem is not None else None
+
+
+# Ключ заняття для теплого старту: у збережених раніше розкладах лекції могли мати довільні групи,
+# тож лекції збігаються без урахування груп
+def lesson_key(subject_id, event_type, week_type, group_ids, subgroup_ids):
+    if event_type == 'Лекція':
+        group_ids = None
+    return (subject_id, event_type, week_type, tuple(group_ids) if group_ids else None,
+            tuple(sorted(subgroup_ids.items())) if subgroup_ids else None)
+
+
+# Теплий старт: розклад для поточних даних, у якому кожне заняття (у порядку generate_initial_population)
+# бере гени відповідної події збереженого розкладу. Якщо викладача чи аудиторії події вже немає, слот
+# зберігається, а замість них обирається придатний (за можливості вільний) викладач чи аудиторія.
+# Нові заняття розміщуються випадково у вільних слотах, як під час звичайної генерації.
+# Позиції подій з новими генами додаються до списку changed, якщо його передано.
+# Якщо передано quota (ключ заняття -> кількість), випадково розміщується не більше quota[key] занять
+# без відповідної події, а решта пропускається (так само, як у збереженому розкладі)
+def warm_schedule(saved, groups, subjects, lecturers, auditoriums, rng, index=None, changed=None, quota=None):
+    index = index or generation_index(lecturers, auditoriums)
+    available = {}
+    for event in saved.events:
+        group_ids = [gid for gid in event.group_ids if gid in groups]  # Лекція могла втратити частину груп
+        if group_ids:
+            key = lesson_key(event.subject_id, event.event_type, event.week_type, group_ids, event.subgroup_ids)
+            available.setdefault(key, []).append(event)
+    for events in available.values():
+        events.reverse()  # Події беруться у збереженому порядку
+
+    schedule = Schedule(groups, lecturers, auditoriums, lesson_count(groups, subjects, lecturers, auditoriums))
+    occupancy = schedule.occupancy
+
+    def place(subj, event_type, week, subgroup_ids=None):
+        key = lesson_key(subj['SubjectID'], event_type, week, [subj['GroupID']], subgroup_ids)
+        events = available.get(key)
+        event, renewed, limited = None, False, quota is not None
+        if events and not CALENDAR.week_masks[week] >> events[-1].slot & 1:
+            # Слот збереженої події заблоковано (або він поза тижнем) у поточному календарі: заняття
+            # розміщується заново без урахування quota
+            events.pop()
+            limited = False
+        elif events:
+            old = events.pop()
+            template = index.template(subj, event_type, week, subgroup_ids)
+            bit = 1 << old.slot
+            lecturer_id, auditorium_id = old.lecturer_id, old.auditorium_id
+            if lecturer_id not in lecturers:
+                candidates = index.eligible_lecturers.get((subj['SubjectID'], event_type), ())
+                lecturer_id = sample_free(candidates, lambda lid: not occupancy.lecturers.mask(lid) & bit, rng)
+                if lecturer_id is None and candidates:
+                    lecturer_id = rng.choice(candidates)
+                renewed = True
+            if auditorium_id not in auditoriums:
+                candidates = (index.suitable_auditoriums(group_size(groups, template.group_ids,
+                                                                    template.subgroup_ids))
+                              or index.auditorium_ids)
+                auditorium_id = sample_free(candidates, lambda aid: not occupancy.auditoriums.mask(aid) & bit, rng)
+                if auditorium_id is None and candidates:
+                    auditorium_id = rng.choice(candidates)
+                renewed = True
+            if lecturer_id is not None and auditorium_id is not None:
+                event = template_event(template, old.slot, lecturer_id, auditorium_id)
+        if event is None:
+            if limited:
+                if not quota.get(key):
+                    return
+                quota[key] -= 1
+            event = create_random_event(subj, groups, lecturers, auditoriums, event_type, week, occupancy,
+                                        subgroup_ids, rng, index)
+            renewed = True
+        if event is not None:
+            if renewed and changed is not None:
+                changed.append(len(schedule.events))
+            schedule.add_event(event)
+
+    for subj in subjects:
+        for week in CALENDAR.subject_weeks(subj['WeekType']):
+            for _ in range(subj['NumLectures']):
+                place(subj, 'Лекція', week)
+            for _ in range(subj['NumPracticals']):
+                if subj['RequiresSubgroups']:
+                    for subgroup_id in groups[subj['GroupID']]['Subgroups']:
+                        place(subj, 'Практика', week, {subj['GroupID']: subgroup_id})
+                else:
+                    place(subj, 'Практика', week)
+    return schedule
@@ -0,0 +1,143 @@
+import heapq
+import random
+
+from genetic_algo import SlotBitset, sample_free, random_bit
+from problem import compile_problem
+
+
+# Конструктивне розміщення всіх занять задачі за принципом DSATUR (розфарбування графа конфліктів слотами):
+# першим розміщується заняття з найменшою кількістю допустимих слотів, за рівності — з "найзавантаженішої" групи.
+# Заняття конфліктують, якщо мають спільну групу (підгрупу) або претендують на тих самих викладачів і аудиторії;
+# допустимий слот — той, де вільні група, підгрупа, хоча б один придатний викладач (з запасом навантаження)
+# та хоча б одна аудиторія достатньої місткості.
+# Повертає гени (слот, аудиторія, викладач) у порядку problem.lessons; якщо допустимого слоту немає,
+# заняття все одно розміщується з найменшою кількістю конфліктів, тож розклад завжди повний
+def construct_genes(problem, rng=random):
+    lessons = problem.lessons
+    n_lecturers = len(problem.lecturer_ids)
+    slots, auditoriums, lecturers = [0] * len(lessons), [0] * len(lessons), [0] * len(lessons)
+
+    lecturer_bits, group_bits, subgroup_bits, auditorium_bits = SlotBitset(), SlotBitset(), SlotBitset(), SlotBitset()
+    load = [[0] * len(problem.week_slots) for _ in range(n_lecturers)]
+    week_masks = [sum(1 << slot for slot in week_slots) for week_slots in problem.week_slots]
+
+    # Однакові заняття (дисципліна, тип, тиждень, група, підгрупа) мають однакові допустимі слоти
+    kinds = {}
+    for i, lesson in enumerate(lessons):
+        kinds.setdefault((lesson.subject, lesson.event_type, lesson.week, lesson.group, lesson.subgroup), []).append(i)
+    kind_lessons = list(kinds.values())
+    kind_template = [lessons[indices[0]] for indices in kind_lessons]
+
+    all_lecturers = list(range(n_lecturers))
+    by_capacity = sorted(range(len(problem.auditorium_ids)), key=lambda a: problem.auditorium_capacity[a])
+    kind_eligible, kind_auditoriums = [], []
+    kinds_by_group, kinds_by_lecturer = {}, {}
+    pressure = {}  # (група, тиждень) -> кількість занять
+    for k, lesson in enumerate(kind_template):
+        # Якщо придатних викладачів чи аудиторій немає, беремо всіх (штраф нарахує оцінка)
+        eligible = [lid for lid in all_lecturers if problem.can_teach(lid, lesson)] or all_lecturers
+        suitable = [a for a in by_capacity if problem.auditorium_capacity[a] >= lesson.size] or by_capacity
+        kind_eligible.append(eligible)
+        kind_auditoriums.append(suitable)
+        kinds_by_group.setdefault(lesson.group, []).append(k)
+        for lid in eligible:
+            kinds_by_lecturer.setdefault(lid, []).append(k)
+        key = (lesson.group, lesson.week)
+        pressure[key] = pressure.get(key, 0) + len(kind_lessons[k])
+
+    # Маска слотів, де вільні група/підгрупа та хоча б один придатний викладач (і, за потреби, аудиторія)
+    def group_free(k):
+        lesson = kind_template[k]
+        mask = week_masks[lesson.week] & ~group_bits.mask(lesson.group)
+        if lesson.subgroup >= 0:
+            mask &= ~subgroup_bits.mask(lesson.subgroup)
+        return mask
+
+    def feasible(k, with_auditoriums, candidates=None):
+        lesson = kind_template[k]
+        lecturer_free = 0
+        for lid in kind_eligible[k] if candidates is None else candidates:
+            if load[lid][lesson.week] < problem.lecturer_limit[lid]:
+                lecturer_free |= ~lecturer_bits.mask(lid)
+        mask = group_free(k) & lecturer_free
+        if with_auditoriums and mask:
+            all_busy = -1
+            for a in kind_auditoriums[k]:
+                all_busy &= auditorium_bits.mask(a)
+                if not all_busy:
+                    break
+            mask &= ~all_busy
+        return mask
+
+    remaining = [len(indices) for indices in kind_lessons]
+    current = [feasible(k, True).bit_count() for k in range(len(kind_lessons))]
+    tiebreak = [rng.random() for _ in kind_lessons]
+    heap = [(current[k], -pressure[(kind_template[k].group, kind_template[k].week)], tiebreak[k], k)
+            for k in range(len(kind_lessons))]
+    heapq.heapify(heap)
+
+    def push(k):
+        lesson = kind_template[k]
+        heapq.heappush(heap, (current[k], -pressure[(lesson.group, lesson.week)], tiebreak[k], k))
+
+    while heap:
+        count, _, _, k = heapq.heappop(heap)
+        if not remaining[k] or count != current[k]:
+            continue  # Застарілий запис у купі
+        # Зайнятість аудиторій враховується ліниво: якщо слотів стало менше, повертаємо заняття в купу
+        mask = feasible(k, True)
+        if mask.bit_count() < count:
+            current[k] = mask.bit_count()
+            push(k)
+            continue
+
+        lesson = kind_template[k]
+        i = kind_lessons[k][len(kind_lessons[k]) - remaining[k]]
+        remaining[k] -= 1
+
+        candidates = kind_eligible[k]
+        if not mask:
+            # Придатні викладачі вичерпали навантаження або зайняті: кваліфікація — лише м'яке обмеження,
+            # тож краще взяти іншого вільного викладача, ніж перевантажити придатного
+            candidates = all_lecturers
+            mask = feasible(k, True, candidates)
+        if mask:
+            slot = random_bit(mask, rng)
+        else:
+            # Допустимого слоту немає: беремо слот, де хоча б група вільна, або будь-який слот тижня
+            fallback = group_free(k) or week_masks[lesson.week]
+            slot = random_bit(fallback, rng)
+        bit = 1 << slot
+
+        lecturer = sample_free(candidates, lambda lid: not lecturer_bits.mask(lid) & bit and
+                               load[lid][lesson.week] < problem.lecturer_limit[lid], rng)
+        if lecturer is None:
+            lecturer = min(kind_eligible[k], key=lambda lid: load[lid][lesson.week])
+        # Найменша вільна аудиторія достатньої місткості (великі аудиторії залишаються для великих занять)
+        auditorium = next((a for a in kind_auditoriums[k] if not auditorium_bits.mask(a) & bit), None)
+        if auditorium is None:
+            auditorium = rng.choice(kind_auditoriums[k])
+
+        slots[i], auditoriums[i], lecturers[i] = slot, auditorium, lecturer
+        lecturer_bits.update(lecturer, slot, 1)
+        group_bits.update(lesson.group, slot, 1)
+        if lesson.subgroup >= 0:
+            subgroup_bits.update(lesson.subgroup, slot, 1)
+        auditorium_bits.update(auditorium, slot, 1)
+        load[lecturer][lesson.week] += 1
+
+        # Оновлюємо насиченість занять, які ділять з цим заняттям групу або викладача
+        for other in set(kinds_by_group[lesson.group]) | set(kinds_by_lecturer.get(lecturer, ())):
+            if remaining[other]:
+                available = feasible(other, False).bit_count()
+                if available != current[other] or other == k:
+                    current[other] = available
+                    push(other)
+
+    return slots, auditoriums, lecturers
+
+
+# Генерація count повних розкладів конструктивним методом
+def constructive_population(count, groups, subjects, lecturers, auditoriums, rng=random, problem=None):
+    problem = problem or compile_problem(groups, subjects, lecturers, auditoriums)
+    return [problem.to_schedule(*construct_genes(problem, rng)) for _ in range(count)]
@@ -0,0 +1,277 @@
+import collections
+import heapq
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import telemetry
+from calendar_model import CALENDAR, use_calendar
+from genetic_algo import Schedule, generation_index, lesson_count, repair
+
+# Типи занять дисципліни та відповідні поля з кількістю занять
+LESSON_KINDS = (('Лекція', 'NumLectures'), ('Практика', 'NumPracticals'))
+
+# Наскільки (у частках однієї частини) компонента може перевищувати розмір частини, не поділяючись
+SPLIT_TOLERANCE = 0.25
+
+# Найбільша частка спільних викладачів (відносно викладачів компоненти) та втрачених призначень (див.
+# dropped_share), за якої компонента вважається слабко зв'язаною і ділиться; сильніше зв'язана компонента
+# розв'язується цілою
+MAX_SHARED_SHARE = 0.1
+
+# Найбільша кількість проходів ремонту конфліктів між частинами після об'єднання
+MERGE_REPAIR_PASSES = 5
+
+
+# Частина задачі: групи, дисципліни та викладачі, які не взаємодіють з іншими частинами, і аудиторії
+class SubProblem:
+    def __init__(self):
+        self.groups = {}
+        self.subjects = []
+        self.lecturers = {}
+        self.auditoriums = {}
+        self.events = 0  # Кількість подій, які потрібно розмістити
+
+    def add(self, other):
+        self.groups.update(other.groups)
+        self.subjects.extend(other.subjects)
+        for lid, lecturer in other.lecturers.items():
+            mine = self.lecturers.get(lid)
+            if mine is not None and mine is not lecturer:
+                # Спільний викладач у двох частинах: їх частки тижневого ліміту додаються
+                lecturer = dict(lecturer, MaxHoursPerWeek=mine['MaxHoursPerWeek'] + lecturer['MaxHoursPerWeek'])
+            self.lecturers[lid] = lecturer
+        self.events += other.events
+
+
+# Компоненти зв'язності графа взаємодії ресурсів: група пов'язана з усіма викладачами, що можуть вести
+# заняття її дисциплін. Аудиторії придатні майже для всіх занять і зв'язали б усю задачу в одну компоненту,
+# тому вони не входять у граф: кожна частина отримує весь пул аудиторій (див. solve).
+# Групи без дисциплін та викладачі без придатних занять у жодну компоненту не потрапляють
+def components(groups, subjects, lecturers, auditoriums):
+    index = generation_index(lecturers, auditoriums)
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[node] != root:  # Стискання шляху
+            parent[node], node = root, parent[node]
+        return root
+
+    for subj in subjects:
+        group = find(('group', subj['GroupID']))
+        for event_type, field in LESSON_KINDS:
+            if subj[field]:
+                for lid in index.eligible_lecturers.get((subj['SubjectID'], event_type), ()):
+                    parent[find(('lecturer', lid))] = group
+                    group = find(group)
+
+    parts = {}
+    for subj in subjects:
+        part = parts.setdefault(find(('group', subj['GroupID'])), SubProblem())
+        part.subjects.append(subj)
+        part.groups[subj['GroupID']] = groups[subj['GroupID']]
+        part.events += telemetry.expected_event_count(groups, (subj,))
+    for lid, lecturer in lecturers.items():
+        root = find(('lecturer', lid))
+        if root in parts:
+            parts[root].lecturers[lid] = lecturer
+    return list(parts.values())
+
+
+# Поділ слабко зв'язаної компоненти на n_pieces частин, близьких за кількістю подій: частини нарощуються
+# жадібно за графом група–викладач (сусідні групи потрапляють в одну частину), кожен викладач закріплюється
+# за частиною, де він може вести найбільше подій, а в інших частинах з'являється лише тоді, коли без нього
+# якесь заняття залишилося б без придатного викладача. Тижневий ліміт такого спільного викладача ділиться
+# між його частинами, а конфлікти його занять у часі усуває перевірка під час об'єднання
+def split_component(part, n_pieces, groups, index):
+    by_group = {}
+    for subj in part.subjects:
+        by_group.setdefault(subj['GroupID'], []).append(subj)
+    kinds = {}  # (дисципліна, тип заняття) -> придатні викладачі частини
+    for subj in part.subjects:
+        for event_type, field in LESSON_KINDS:
+            if subj[field]:
+                kinds[(subj['SubjectID'], event_type)] = [
+                    lid for lid in index.eligible_lecturers.get((subj['SubjectID'], event_type), ())
+                    if lid in part.lecturers]
+    lecturer_groups = {}  # викладач -> групи, для яких він придатний (без повторів, у порядку появи)
+    for subj in part.subjects:
+        for event_type, _ in LESSON_KINDS:
+            for lid in kinds.get((subj['SubjectID'], event_type), ()):
+                lecturer_groups.setdefault(lid, {})[subj['GroupID']] = None
+
+    # Нарощування частин: наступною до частини додається група, більшість викладачів якої вже є в частині.
+    # Частина закривається на слабкому зв'язку (група пов'язана з нею не більше ніж одним викладачем), щойно
+    # досягає розміру в межах SPLIT_TOLERANCE від цільового, тож межі частин проходять між щільними кластерами
+    target = part.events / n_pieces
+    pieces = []
+    piece_of = {}
+    remaining = iter(by_group)
+    assigned = set()
+    while len(assigned) < len(by_group):
+        piece = SubProblem()
+        pieces.append(piece)
+        reached, gain, heap = set(), collections.Counter(), []
+        while len(assigned) < len(by_group):
+            while heap and (heap[0][2] in assigned or -heap[0][0] != gain[heap[0][2]]):
+                heapq.heappop(heap)
+            strength = -heap[0][0] if heap else 0
+            if len(pieces) < n_pieces and piece.events >= (
+                    (1 - SPLIT_TOLERANCE) * target if strength <= 1 else target) and (
+                    strength <= 1 or piece.events >= (1 + SPLIT_TOLERANCE) * target):
+                break
+            gid = heapq.heappop(heap)[2] if heap else next(g for g in remaining if g not in assigned)
+            assigned.add(gid)
+            piece.groups[gid] = groups[gid]
+            for subj in by_group[gid]:
+                piece.subjects.append(subj)
+                piece.events += telemetry.expected_event_count(groups, (subj,))
+                piece_of[subj['SubjectID']] = len(pieces) - 1
+                for event_type, _ in LESSON_KINDS:
+                    for lid in kinds.get((subj['SubjectID'], event_type), ()):
+                        if lid in reached:
+                            continue
+                        reached.add(lid)
+                        for other in lecturer_groups[lid]:
+                            if other not in assigned:
+                                gain[other] += 1
+                                heapq.heappush(heap, (-gain[other], len(heap), other))
+
+    # Закріплення викладачів: частина з найбільшою кількістю подій, які викладач може вести
+    demand = {}
+    for subj in part.subjects:
+        for event_type, field in LESSON_KINDS:
+            for lid in kinds.get((subj['SubjectID'], event_type), ()):
+                counts = demand.setdefault(lid, [0] * len(pieces))
+                counts[piece_of[subj['SubjectID']]] += subj[field]
+    member = {lid: {max(range(len(pieces)), key=counts.__getitem__)} for lid, counts in demand.items()}
+    for (sid, _), lids in kinds.items():
+        k = piece_of[sid]
+        if lids and not any(k in member[lid] for lid in lids):
+            member[max(lids, key=lambda lid: demand[lid][k])].add(k)
+    for lid, ks in member.items():
+        lecturer = part.lecturers[lid]
+        total = sum(demand[lid][k] for k in ks)
+        for k in ks:
+            if len(ks) > 1:
+                # Частка тижневого ліміту пропорційна подіям, які викладач може вести в частині
+                pieces[k].lecturers[lid] = dict(
+                    lecturer, MaxHoursPerWeek=lecturer['MaxHoursPerWeek'] * demand[lid][k] / total)
+            else:
+                pieces[k].lecturers[lid] = lecturer
+    return pieces
+
+
+# Частка призначень (заняття, придатний викладач компоненти), втрачених поділом: викладач закріплений за
+# іншою частиною, тож у частині заняття він не веде. Поділ компоненти, у якій багато взаємозамінних
+# викладачів, обмежує їх вибір і погіршує розклад, навіть якщо спільних викладачів немає
+def dropped_share(pieces, index):
+    total = dropped = 0
+    for piece in pieces:
+        for subj in piece.subjects:
+            for event_type, field in LESSON_KINDS:
+                for lid in index.eligible_lecturers.get((subj['SubjectID'], event_type), ()):
+                    total += subj[field]
+                    if lid not in piece.lecturers:
+                        dropped += subj[field]
+    return dropped / total if total else 0.0
+
+
+# Пакування компонент у n_parts частин, близьких за кількістю подій (найбільші компоненти — першими
+# в найменш завантажену частину); порожні частини відкидаються
+def pack_components(parts, n_parts):
+    packed = [SubProblem() for _ in range(max(1, min(n_parts, len(parts))))]
+    heap = [(0, i) for i in range(len(packed))]
+    for part in sorted(parts, key=lambda p: p.events, reverse=True):
+        _, i = heapq.heappop(heap)
+        packed[i].add(part)
+        heapq.heappush(heap, (packed[i].events, i))
+    return [part for part in packed if part.subjects]
+
+
+# Розв'язання однієї частини в окремому процесі (без виводу перебігу поколінь)
+def _solve_part(part, seed, ga_options):
+    from genetic_algo import genetic_algorithm
+    stats = {}
+    schedule = genetic_algorithm(part.groups, part.subjects, part.lecturers, part.auditoriums, seed=seed,
+                                 stats=stats, observers=[], **ga_options)
+    return schedule, stats
+
+
+# Розв'язання задачі частинами: компоненти графа взаємодії ресурсів пакуються в parts частин (за
+# замовчуванням — кількість процесів), кожна частина розв'язується генетичним алгоритмом (ga_options)
+# у своєму процесі, а розклади частин об'єднуються в один розклад. Пул аудиторій частини не ділять:
+# поділ обмежував вибір аудиторій кожної частини і погіршував розклад сильніше, ніж конфлікти аудиторій
+# між частинами, які легко усунути заміною аудиторії в тому самому слоті. Тож об'єднаний розклад
+# перевіряється на конфлікти між частинами (аудиторій та спільних викладачів поділених компонент; його
+# оцінка на повних даних проти суми оцінок частин), і їх ремонтує repair, доки кількість порушень зменшується
+def solve(groups, subjects, lecturers, auditoriums, workers=None, parts=None, seed=None, stats=None,
+          observers=None, **ga_options):
+    stats = {} if stats is None else stats
+    stats.setdefault('phase_seconds', {})
+    observers = [telemetry.ConsoleSink()] if observers is None else observers
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+    ga_options.update(backend='serial', local_search_iterations=0, local_search_time=None)
+
+    clock = time.perf_counter()
+    found = components(groups, subjects, lecturers, auditoriums)
+    n_parts = parts or workers
+    # Компоненти, більші за частку однієї частини, діляться на слабко зв'язані частини
+    target = sum(part.events for part in found) / n_parts
+    index = generation_index(lecturers, auditoriums)
+    pieces = []
+    for part in found:
+        n_pieces = math.ceil(part.events / target - SPLIT_TOLERANCE)
+        split = split_component(part, n_pieces, groups, index) if n_pieces > 1 else [part]
+        shared = sum(len(piece.lecturers) for piece in split) - len(part.lecturers)
+        weak = shared <= MAX_SHARED_SHARE * len(part.lecturers) and dropped_share(split, index) <= MAX_SHARED_SHARE
+        pieces.extend(split if weak else [part])
+    packed = pack_components(pieces, n_parts)
+    for part in packed:
+        part.auditoriums = auditoriums
+    stats['components'] = len(found)
+    stats['shared_lecturers'] = sum(len(part.lecturers) for part in packed) - len(
+        {lid for part in packed for lid in part.lecturers})
+    stats['phase_seconds']['decomposition'] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    jobs = [(part, rng.getrandbits(64), ga_options) for part in packed]
+    if len(jobs) == 1 or workers == 1:
+        results = [_solve_part(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(min(workers, len(jobs)), initializer=use_calendar, initargs=(CALENDAR,)) as pool:
+            results = list(pool.map(_solve_part, *zip(*jobs)))
+    stats['phase_seconds']['parts'] = time.perf_counter() - clock
+
+    # Об'єднання: події всіх частин в одному розкладі з оцінкою на повних даних задачі
+    merged = Schedule(groups, lecturers, auditoriums, lesson_count(groups, subjects, lecturers, auditoriums))
+    stats['evaluations'] = 0
+    stats['parts'] = []
+    expected = 0
+    for i, (part, (schedule, part_stats)) in enumerate(zip(packed, results)):
+        schedule.attach(part.groups, part.lecturers, part.auditoriums)
+        for event in schedule.events:
+            merged.add_event(event.copy())
+        expected += schedule.hard_constraints_violations
+        stats['evaluations'] += part_stats.get('evaluations', 0)
+        summary = {'part': i, 'groups': len(part.groups), 'events': part.events,
+                   'lecturers': len(part.lecturers), 'hard': schedule.hard_constraints_violations,
+                   'soft': schedule.soft_constraints_score}
+        stats['parts'].append(summary)
+        telemetry.notify(observers, {'event': 'part', **summary})
+
+    # Перевірка спільних ресурсів: конфлікти між розкладами частин усуваються ремонтом
+    stats['merge_conflicts'] = merged.hard_constraints_violations - expected
+    if stats['merge_conflicts'] > 0:
+        for _ in range(MERGE_REPAIR_PASSES):
+            before = merged.hard_constraints_violations
+            repair(merged, index, rng)
+            if merged.hard_constraints_violations >= before:
+                break
+    return merged
@@ -0,0 +1,273 @@
+import csv
+import datetime
+import io
+import json
+import os
+
+from calendar_model import CALENDAR
+from genetic_algo import group_size
+
+# Подання розкладу та файли, у які вони записуються
+VIEWS = {
+    'text': 'schedule_output.txt',         # Загальна таблиця за часовими слотами (як раніше)
+    'groups': 'schedule_groups.txt',       # Розклад кожної групи
+    'lecturers': 'schedule_lecturers.txt',  # Розклад кожного викладача
+    'auditoriums': 'schedule_auditoriums.txt',  # Зайнятість кожної аудиторії
+    'csv': 'schedule.csv',                 # Одна подія на рядок
+    'json': 'schedule.json',               # Події кожної групи
+    'ical': 'schedule.ics',                # Календар iCalendar
+}
+
+# Розмір буфера файлів експорту
+BUFFER_SIZE = 1 << 16
+
+# Тривалість семестру в тижнях (для календаря)
+TERM_WEEKS = 14
+
+# Стовпці CSV-експорту
+CSV_FIELDS = ['timeslot', 'week', 'day', 'lesson', 'group_ids', 'subgroups', 'subject_id', 'subject', 'type',
+              'lecturer_id', 'lecturer', 'auditorium', 'students', 'capacity']
+
+
+# Індекс розкладу для експорту: рядки подій з усіма полями, потрібними поданням, та їх списки за слотами,
+# групами, викладачами й аудиторіями (у порядку слотів). Будується за один прохід по schedule.events
+class ScheduleIndex:
+    def __init__(self, schedule, groups, lecturers, auditoriums):
+        self.groups = groups
+        self.lecturers = lecturers
+        self.auditoriums = auditoriums
+        self.by_slot = [[] for _ in range(CALENDAR.n_slots)]
+        for event in schedule.events:
+            slot = event.slot
+            subgroup_ids = event.subgroup_ids or {}
+            self.by_slot[slot].append({
+                'timeslot': CALENDAR.labels[slot],
+                'slot': slot,
+                'week': CALENDAR.weeks[CALENDAR.week(slot)],
+                'day': CALENDAR.day(slot) + 1,
+                'lesson': CALENDAR.lesson(slot) + 1,
+                'group_ids': list(event.group_ids),
+                'subgroups': {gid: subgroup_ids[gid] for gid in event.group_ids if gid in subgroup_ids},
+                'subject_id': event.subject_id,
+                'subject': event.subject_name,
+                'type': event.event_type,
+                'lecturer_id': event.lecturer_id,
+                'lecturer': lecturers[event.lecturer_id]['LecturerName'],
+                'auditorium': event.auditorium_id,
+                'students': group_size(groups, event.group_ids, event.subgroup_ids),
+                'capacity': auditoriums[event.auditorium_id],
+            })
+
+        # Списки подій за групами, викладачами та аудиторіями (порядок ключів — як у вхідних даних)
+        self.by_group = {gid: [] for gid in groups}
+        self.by_lecturer = {lid: [] for lid in lecturers}
+        self.by_auditorium = {aid: [] for aid in auditoriums}
+        for rows in self.by_slot:
+            for row in rows:
+                for gid in row['group_ids']:
+                    self.by_group[gid].append(row)
+                self.by_lecturer[row['lecturer_id']].append(row)
+                self.by_auditorium[row['auditorium']].append(row)
+
+
+# Опис груп події, включаючи підгрупи, якщо вони є
+def _group_info(row):
+    return ', '.join(f"{gid} (Subgroup {row['subgroups'][gid]})" if gid in row['subgroups'] else f"{gid}"
+                     for gid in row['group_ids'])
+
+
+# Загальна таблиця за часовими слотами з годинами викладачів (вигляд schedule_output.txt)
+def write_text(index, f):
+    lines = ["", "Best schedule:", ""]
+    lines.append(f"{'Timeslot':<25} {'Group(s)':<30} {'Subject':<30} {'Type':<15} "
+                 f"{'Lecturer':<25} {'Auditorium':<10} {'Students':<10} {'Capacity':<10}")
+    lines.append("-" * 167)
+    for timeslot, rows in zip(CALENDAR.labels, index.by_slot):
+        if not rows:
+            # Якщо у цьому часовому слоті немає подій, виводимо "EMPTY" у першій колонці
+            lines.append(f"{timeslot:<25} {'EMPTY':<120}")
+        for row in rows:
+            lines.append(f"{timeslot:<25} {_group_info(row):<30} {row['subject']:<30} {row['type']:<15} "
+                         f"{row['lecturer']:<25} {row['auditorium']:<10} "
+                         f"{row['students']:<10} {row['capacity']:<10}")
+        lines.append("")
+
+    # Кількість годин викладачів на тиждень
+    lines += ["", "Кількість годин лекторів на тиждень:", f"{'Lecturer':<25} {'Total Hours':<10}", "-" * 35]
+    for lecturer_id, rows in index.by_lecturer.items():
+        hours = len(rows) * CALENDAR.lesson_hours if rows else 0
+        lines.append(f"{index.lecturers[lecturer_id]['LecturerName']:<25} {hours:<10} годин")
+    f.write('\n'.join(lines) + '\n')
+
+
+# Розклад кожної групи
+def write_groups(index, f):
+    for gid, rows in index.by_group.items():
+        f.write(f"Група {gid} ({index.groups[gid]['NumStudents']} студентів)\n")
+        f.write(f"{'Timeslot':<25} {'Subject':<30} {'Type':<15} {'Subgroup':<10} {'Lecturer':<25} "
+                f"{'Auditorium':<10}\n")
+        f.write("-" * 120 + "\n")
+        f.writelines(f"{row['timeslot']:<25} {row['subject']:<30} {row['type']:<15} "
+                     f"{str(row['subgroups'].get(gid, '')):<10} {row['lecturer']:<25} {row['auditorium']:<10}\n"
+                     for row in rows)
+        f.write("\n")
+
+
+# Розклад кожного викладача з кількістю годин
+def write_lecturers(index, f):
+    for lecturer_id, rows in index.by_lecturer.items():
+        f.write(f"Викладач {index.lecturers[lecturer_id]['LecturerName']} ({lecturer_id}), "
+                f"годин: {len(rows) * CALENDAR.lesson_hours}\n")
+        f.write(f"{'Timeslot':<25} {'Group(s)':<30} {'Subject':<30} {'Type':<15} {'Auditorium':<10}\n")
+        f.write("-" * 114 + "\n")
+        f.writelines(f"{row['timeslot']:<25} {_group_info(row):<30} {row['subject']:<30} {row['type']:<15} "
+                     f"{row['auditorium']:<10}\n" for row in rows)
+        f.write("\n")
+
+
+# Зайнятість кожної аудиторії: зайняті слоти з кількістю студентів
+def write_auditoriums(index, f):
+    for auditorium_id, rows in index.by_auditorium.items():
+        used = len({row['slot'] for row in rows})
+        f.write(f"Аудиторія {auditorium_id} (місткість {index.auditoriums[auditorium_id]}), "
+                f"зайнято слотів: {used} з {CALENDAR.n_slots}\n")
+        f.write(f"{'Timeslot':<25} {'Group(s)':<30} {'Subject':<30} {'Lecturer':<25} {'Students':<10}\n")
+        f.write("-" * 124 + "\n")
+        f.writelines(f"{row['timeslot']:<25} {_group_info(row):<30} {row['subject']:<30} {row['lecturer']:<25} "
+                     f"{row['students']:<10}\n" for row in rows)
+        f.write("\n")
+
+
+# Одна подія на рядок; групи та підгрупи розділені ';'
+def write_csv(index, f):
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    for rows in index.by_slot:
+        writer.writerows([
+            row['timeslot'], row['week'], row['day'], row['lesson'], ';'.join(row['group_ids']),
+            ';'.join(f"{gid}:{subgroup}" for gid, subgroup in row['subgroups'].items()),
+            row['subject_id'], row['subject'], row['type'], row['lecturer_id'], row['lecturer'],
+            row['auditorium'], row['students'], row['capacity'],
+        ] for row in rows)
+
+
+# Події кожної групи у JSON; групи записуються по одній, без побудови всього документа в пам'яті
+def write_json(index, f):
+    f.write('{"timeslots": ' + json.dumps(CALENDAR.labels, ensure_ascii=False) + ', "groups": {')
+    for position, (gid, rows) in enumerate(index.by_group.items()):
+        events = [{
+            'timeslot': row['timeslot'], 'week': row['week'], 'day': row['day'], 'lesson': row['lesson'],
+            'subject_id': row['subject_id'], 'subject': row['subject'], 'type': row['type'],
+            'subgroup': row['subgroups'].get(gid), 'groups': row['group_ids'],
+            'lecturer_id': row['lecturer_id'], 'lecturer': row['lecturer'], 'auditorium': row['auditorium'],
+        } for row in rows]
+        f.write((', ' if position else '') + json.dumps(gid, ensure_ascii=False) + ': ' +
+                json.dumps(events, ensure_ascii=False))
+    f.write('}}\n')
+
+
+# Екранування тексту iCalendar
+def _ical_text(value):
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+# Рядок iCalendar, згорнутий до 75 байтів
+def _ical_line(line):
+    data = line.encode('utf-8')
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        while data[cut] & 0xC0 == 0x80:  # Не розриваємо багатобайтові символи UTF-8
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+    parts.append(data.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+# Календар iCalendar: кожна подія повторюється з періодом, рівним кількості тижнів календаря (для двох типів
+# тижнів — раз на два тижні). Семестр починається з понеділка term_start першим тижнем календаря
+# (за замовчуванням — понеділок поточного тижня)
+def write_ical(index, f, term_start=None, term_weeks=TERM_WEEKS):
+    if term_start is None:
+        today = datetime.date.today()
+        term_start = today - datetime.timedelta(days=today.weekday())
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    f.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//genetic-timetable//schedule export//UK\r\n')
+    number = 0
+    for rows in index.by_slot:
+        for row in rows:
+            number += 1
+            week = CALENDAR.week(row['slot'])
+            hour, minute = map(int, CALENDAR.lesson_starts[row['lesson'] - 1].split(':'))
+            start = datetime.datetime.combine(term_start + datetime.timedelta(weeks=week, days=row['day'] - 1),
+                                              datetime.time(hour, minute))
+            end = start + datetime.timedelta(hours=CALENDAR.lesson_hours)
+            period = len(CALENDAR.weeks)
+            count = max((term_weeks - week + period - 1) // period, 1)
+            lines = [
+                'BEGIN:VEVENT',
+                f'UID:{number}-{row["slot"]}-{row["subject_id"]}-{row["lecturer_id"]}@genetic-timetable',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART:{start:%Y%m%dT%H%M%S}',
+                f'DTEND:{end:%Y%m%dT%H%M%S}',
+                f'RRULE:FREQ=WEEKLY;INTERVAL={period};COUNT={count}',
+                f'SUMMARY:{_ical_text(row["subject"] + " (" + row["type"] + ")")}',
+                f'LOCATION:{_ical_text(row["auditorium"])}',
+                f'DESCRIPTION:{_ical_text(_group_info(row) + "; " + row["lecturer"])}',
+                f'CATEGORIES:{",".join(_ical_text(gid) for gid in row["group_ids"])}',
+                'END:VEVENT',
+            ]
+            f.write(''.join(_ical_line(line) for line in lines))
+    f.write('END:VCALENDAR\r\n')
+
+
+WRITERS = {
+    'text': write_text,
+    'groups': write_groups,
+    'lecturers': write_lecturers,
+    'auditoriums': write_auditoriums,
+    'csv': write_csv,
+    'json': write_json,
+    'ical': write_ical,
+}
+
+
+# Експорт розкладу в подання views (ключі VIEWS) у каталозі directory. Індекс будується один раз,
+# кожне подання пишеться буферизовано у свій файл. Якщо передано console, загальна таблиця
+# також виводиться туди (один раз сформований текст, без дублювання кожного запису).
+# Повертає шляхи записаних файлів
+def export(schedule, groups, lecturers, auditoriums, views=('text',), directory='.', console=None):
+    index = ScheduleIndex(schedule, groups, lecturers, auditoriums)
+    text = None
+    if console is not None or 'text' in views:
+        buffer = io.StringIO()
+        write_text(index, buffer)
+        text = buffer.getvalue()
+        if console is not None:
+            console.write(text)
+
+    if views:
+        os.makedirs(directory, exist_ok=True)
+    paths = []
+    for view in views:
+        path = os.path.join(directory, VIEWS[view])
+        newline = '' if view in ('csv', 'ical') else None  # CSV та iCalendar самі задають кінці рядків
+        with open(path, 'w', encoding='utf-8', newline=newline, buffering=BUFFER_SIZE) as f:
+            if view == 'text':
+                f.write(text)
+            else:
+                WRITERS[view](index, f)
+        paths.append(path)
+    return paths
+
+
+# Подання розкладу views у вигляді рядків (ключ VIEWS -> вміст файлу) без запису на диск
+def render(schedule, groups, lecturers, auditoriums, views=('json',)):
+    index = ScheduleIndex(schedule, groups, lecturers, auditoriums)
+    rendered = {}
+    for view in views:
+        buffer = io.StringIO()
+        WRITERS[view](index, buffer)
+        rendered[view] = buffer.getvalue()
+    return rendered
@@ -1,4 +1,44 @@
+import contextlib  # Імпортуємо модуль contextlib для обробки помилок розбору рядків
 import csv  # Імпортуємо модуль csv для роботи з CSV-файлами
+import hashlib  # Імпортуємо модуль hashlib для ключа кешу скомпільованої задачі
+import json  # Імпортуємо модуль json для читання налаштувань календаря
+import os  # Імпортуємо модуль os для роботи з файлами кешу
+import pickle  # Імпортуємо модуль pickle для збереження скомпільованої задачі
+
+from calendar_model import CALENDAR, EVERY_WEEK, Calendar, calendar_from_config, use_calendar
+from problem import EVENT_TYPES, Problem, remember_problem
+
+# Файли вхідних даних у каталозі задачі (у порядку groups, subjects, lecturers, auditoriums)
+PROBLEM_FILES = ['groups.csv', 'subjects.csv', 'lectures.csv', 'auditoriums.csv']
+
+# Необов'язковий файл календаря в каталозі задачі (тижні, дні, пари, заблоковані слоти)
+CALENDAR_FILE = 'calendar.json'
+
+# Версія формату кешу: змінюється разом зі структурою Problem, щоб старий кеш не використовувався
+CACHE_VERSION = 3
+
+
+# Помилка у вхідних даних задачі; errors — перелік усіх знайдених проблем
+class ProblemDataError(ValueError):
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("Помилки у вхідних даних:\n" + '\n'.join(self.errors))
+
+
+# Помилка розбору рядка CSV (відсутній стовпець, нечислове значення, повторний ідентифікатор)
+# з назвою файлу та номером рядка
+@contextlib.contextmanager
+def _parsing(filename, reader):
+    try:
+        yield
+    except (KeyError, ValueError) as error:
+        raise ProblemDataError([f"{filename}, рядок {reader.line_num}: {type(error).__name__}: {error}"]) from None
+
+
+# Перевірка, що ідентифікатор ще не зустрічався у файлі
+def _check_new(item_id, items):
+    if item_id in items:
+        raise ValueError(f"повторний ідентифікатор {item_id}")
 
 
 # Функція для завантаження даних про аудиторії з файлу
@@ -7,8 +47,10 @@ def load_auditoriums(filename):
     with open(filename, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)  # Створюємо об'єкт читання CSV-файлу як словників
         for row in reader:
-            auditorium_id = row['auditoriumID']  # Зчитуємо ідентифікатор аудиторії
-            auditoriums[auditorium_id] = int(row['capacity'])  # Зберігаємо місткість аудиторії
+            with _parsing(filename, reader):
+                auditorium_id = row['auditoriumID']  # Зчитуємо ідентифікатор аудиторії
+                _check_new(auditorium_id, auditoriums)
+                auditoriums[auditorium_id] = int(row['capacity'])  # Зберігаємо місткість аудиторії
     return auditoriums  # Повертаємо словник з аудиторіями та їх місткістю
 
 
@@ -18,11 +60,13 @@ def load_groups(filename):
     with open(filename, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)  # Створюємо об'єкт читання CSV-файлу як словників
         for row in reader:
-            group_id = row['groupNumber']  # Зчитуємо номер групи
-            groups[group_id] = {
-                'NumStudents': int(row['studentAmount']),  # Кількість студентів у групі
-                'Subgroups': row['subgroups'].split(';') if row['subgroups'] else []  # Список підгруп, якщо вони є
-            }
+            with _parsing(filename, reader):
+                group_id = row['groupNumber']  # Зчитуємо номер групи
+                _check_new(group_id, groups)
+                groups[group_id] = {
+                    'NumStudents': int(row['studentAmount']),  # Кількість студентів у групі
+                    'Subgroups': row['subgroups'].split(';') if row['subgroups'] else []  # Список підгруп, якщо вони є
+                }
     return groups  # Повертаємо словник з інформацією про групи
 
 
@@ -32,16 +76,17 @@ def load_subjects(filename):
     with open(filename, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)  # Створюємо об'єкт читання CSV-файлу як словників
         for row in reader:
-            subjects.append({
-                'SubjectID': row['id'],  # Ідентифікатор дисципліни
-                'SubjectName': row['name'],  # Назва дисципліни
-                'GroupID': row['groupID'],  # Номер групи, для якої призначена дисципліна
-                'NumLectures': int(row['numLectures']),  # Кількість лекцій з дисципліни
-                'NumPracticals': int(row['numPracticals']),  # Кількість практичних занять
-                'RequiresSubgroups': row['requiresSubgroups'] == 'Yes',  # Чи потрібен поділ на підгрупи
-                'WeekType': row['weekType'] if 'weekType' in row else 'Both'
-                # Тип тижня ('Парний', 'Непарний' або 'Both')
-            })
+            with _parsing(filename, reader):
+                subjects.append({
+                    'SubjectID': row['id'],  # Ідентифікатор дисципліни
+                    'SubjectName': row['name'],  # Назва дисципліни
+                    'GroupID': row['groupID'],  # Номер групи, для якої призначена дисципліна
+                    'NumLectures': int(row['numLectures']),  # Кількість лекцій з дисципліни
+                    'NumPracticals': int(row['numPracticals']),  # Кількість практичних занять
+                    'RequiresSubgroups': row['requiresSubgroups'] == 'Yes',  # Чи потрібен поділ на підгрупи
+                    'WeekType': row['weekType'] if 'weekType' in row else 'Both'
+                    # Тип тижня ('Парний', 'Непарний' або 'Both')
+                })
     return subjects  # Повертаємо список з інформацією про дисципліни
 
 
@@ -51,12 +96,156 @@ def load_lecturers(filename):
     with open(filename, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)  # Створюємо об'єкт читання CSV-файлу як словників
         for row in reader:
-            lecturer_id = row['lecturerID']  # Зчитуємо ідентифікатор викладача
-            lecturers[lecturer_id] = {
-                'LecturerName': row['lecturerName'],  # Ім'я викладача
-                'SubjectsCanTeach': row['subjectsCanTeach'].split(';'),  # Список дисциплін, які може викладати викладач
-                'TypesCanTeach': row['typesCanTeach'].split(';'),
-                # Типи занять (лекції, практики тощо), які може проводити
-                'MaxHoursPerWeek': int(row['maxHoursPerWeek'])  # Максимальна кількість годин на тиждень для викладача
-            }
+            with _parsing(filename, reader):
+                lecturer_id = row['lecturerID']  # Зчитуємо ідентифікатор викладача
+                _check_new(lecturer_id, lecturers)
+                lecturers[lecturer_id] = {
+                    'LecturerName': row['lecturerName'],  # Ім'я викладача
+                    'SubjectsCanTeach': row['subjectsCanTeach'].split(';'),  # Список дисциплін, які може викладати викладач
+                    'TypesCanTeach': row['typesCanTeach'].split(';'),
+                    # Типи занять (лекції, практики тощо), які може проводити
+                    'MaxHoursPerWeek': int(row['maxHoursPerWeek'])  # Максимальна кількість годин на тиждень для викладача
+                }
     return lecturers  # Повертаємо словник з інформацією про викладачів
+
+
+# Поля записів даних задачі та їх типи (для перевірки даних, переданих не через CSV, наприклад, сервером)
+GROUP_FIELDS = {'NumStudents': int, 'Subgroups': list}
+SUBJECT_FIELDS = {'SubjectID': str, 'SubjectName': str, 'GroupID': str, 'NumLectures': int, 'NumPracticals': int,
+                  'RequiresSubgroups': bool, 'WeekType': str}
+LECTURER_FIELDS = {'LecturerName': str, 'SubjectsCanTeach': list, 'TypesCanTeach': list, 'MaxHoursPerWeek': int}
+
+
+# Функція для завантаження календаря з JSON-файлу (див. calendar_from_config)
+def load_calendar(filename):
+    try:
+        with open(filename, encoding='utf-8') as f:
+            return calendar_from_config(json.load(f))
+    except (ValueError, TypeError, AttributeError) as error:
+        raise ProblemDataError([f"{filename}: {type(error).__name__}: {error}"]) from None
+
+
+# Перевірка відсутніх полів і типів значень одного запису (name — як запис називається в повідомленнях)
+def _record_errors(name, record, fields):
+    if not isinstance(record, dict):
+        return [f"{name}: запис має бути словником"]
+    errors = []
+    for field, kind in fields.items():
+        if field not in record:
+            errors.append(f"{name}: відсутнє поле {field}")
+        elif not isinstance(record[field], kind):
+            errors.append(f"{name}: поле {field} має бути типу {kind.__name__}")
+    return errors
+
+
+# Перевірка структури даних задачі: типи колекцій, поля записів та типи їх значень
+def _structure_errors(groups, subjects, lecturers, auditoriums):
+    for name, value, kind in (('groups', groups, dict), ('subjects', subjects, list),
+                              ('lecturers', lecturers, dict), ('auditoriums', auditoriums, dict)):
+        if not isinstance(value, kind):
+            return [f"{name}: очікується {kind.__name__}"]
+    errors = []
+    for gid, group in groups.items():
+        errors += _record_errors(f"Група {gid}", group, GROUP_FIELDS)
+    for i, subj in enumerate(subjects):
+        sid = subj.get('SubjectID', f"№{i + 1}") if isinstance(subj, dict) else f"№{i + 1}"
+        errors += _record_errors(f"Дисципліна {sid}", subj, SUBJECT_FIELDS)
+    for lid, lecturer in lecturers.items():
+        errors += _record_errors(f"Викладач {lid}", lecturer, LECTURER_FIELDS)
+    for aid, capacity in auditoriums.items():
+        if not isinstance(capacity, int):
+            errors.append(f"Аудиторія {aid}: місткість має бути цілим числом")
+    return errors
+
+
+# Перевірка перехресних посилань і значень у даних задачі; повертає перелік знайдених проблем.
+# Значення перевіряються лише тоді, коли структура даних (поля записів та їх типи) правильна
+def validate_problem(groups, subjects, lecturers, auditoriums):
+    errors = _structure_errors(groups, subjects, lecturers, auditoriums)
+    if errors:
+        return errors
+    for gid, group in groups.items():
+        if group['NumStudents'] <= 0:
+            errors.append(f"Група {gid}: кількість студентів має бути додатною")
+    for aid, capacity in auditoriums.items():
+        if capacity <= 0:
+            errors.append(f"Аудиторія {aid}: місткість має бути додатною")
+
+    subject_ids = set()
+    for subj in subjects:
+        sid = subj['SubjectID']
+        if sid in subject_ids:
+            errors.append(f"Дисципліна {sid}: повторний ідентифікатор")
+        subject_ids.add(sid)
+        if subj['GroupID'] not in groups:
+            errors.append(f"Дисципліна {sid}: невідома група {subj['GroupID']}")
+        elif subj['RequiresSubgroups'] and subj['NumPracticals'] and not groups[subj['GroupID']]['Subgroups']:
+            errors.append(f"Дисципліна {sid}: потрібен поділ на підгрупи, але група {subj['GroupID']} їх не має")
+        if subj['NumLectures'] < 0 or subj['NumPracticals'] < 0:
+            errors.append(f"Дисципліна {sid}: кількість занять не може бути від'ємною")
+        if subj['WeekType'] not in CALENDAR.week_types and subj['WeekType'] != EVERY_WEEK:
+            errors.append(f"Дисципліна {sid}: невідомий тип тижня {subj['WeekType']}")
+
+    for lid, lecturer in lecturers.items():
+        unknown = [sid for sid in lecturer['SubjectsCanTeach'] if sid not in subject_ids]
+        if unknown:
+            errors.append(f"Викладач {lid}: невідомі дисципліни {', '.join(unknown)}")
+        unknown = [t for t in lecturer['TypesCanTeach'] if t not in EVENT_TYPES]
+        if unknown:
+            errors.append(f"Викладач {lid}: невідомі типи занять {', '.join(unknown)}")
+        if lecturer['MaxHoursPerWeek'] < 0:
+            errors.append(f"Викладач {lid}: ліміт годин не може бути від'ємним")
+    return errors
+
+
+# Ключ кешу: хеш вмісту файлів даних та версії формату кешу
+def source_hash(paths):
+    digest = hashlib.sha256(f"problem-cache-{CACHE_VERSION}".encode('utf-8'))
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+# Завантаження задачі з каталогу directory: календар (calendar.json або календар за замовчуванням стає
+# поточним CALENDAR), розбір CSV, перевірка даних (ProblemDataError з усіма проблемами) та компіляція
+# в Problem (щільні цілі індекси, розміри груп і підгруп, перелік занять).
+# Якщо задано cache_dir, результат зберігається там з ключем — хешем файлів даних, тож повторний запуск
+# з тими самими файлами пропускає розбір, перевірку та компіляцію
+def load_problem(directory='datasource', cache_dir=None):
+    paths = [os.path.join(directory, name) for name in PROBLEM_FILES]
+    calendar_path = os.path.join(directory, CALENDAR_FILE)
+    if os.path.exists(calendar_path):
+        use_calendar(load_calendar(calendar_path))
+        paths.append(calendar_path)
+    else:
+        use_calendar(Calendar())
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, source_hash(paths) + '.pickle')
+        try:
+            with open(cache_path, 'rb') as f:
+                return remember_problem(pickle.load(f))
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+            pass  # Кешу ще немає, або він пошкоджений чи застарілий: задача будується заново
+
+    groups_path, subjects_path, lecturers_path, auditoriums_path = paths[:len(PROBLEM_FILES)]
+    groups = load_groups(groups_path)
+    subjects = load_subjects(subjects_path)
+    lecturers = load_lecturers(lecturers_path)
+    auditoriums = load_auditoriums(auditoriums_path)
+    errors = validate_problem(groups, subjects, lecturers, auditoriums)
+    if errors:
+        raise ProblemDataError(errors)
+    problem = remember_problem(Problem(groups, subjects, lecturers, auditoriums))
+
+    if cache_path:
+        # Запис через тимчасовий файл, щоб перерваний запис не залишив пошкодженого кешу
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(problem, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return problem
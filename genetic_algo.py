@@ -1,140 +1,647 @@
+import bisect
+import hashlib
+import itertools
 import random
-import copy
+import time
+from collections import OrderedDict
 
-# Константи для розкладу
+import telemetry
+from calendar_model import CALENDAR
 
-# Кількість днів у тижні (без врахування субот)
-DAYS_PER_WEEK = 5
+# Вага одного «вікна» (вільної пари між заняттями одного дня) у м'яких обмеженнях
+GAP_WEIGHT = 1
 
-# Кількість академічних годин на день
-LESSONS_PER_DAY = 4
 
-# Типи тижнів: парний та непарний
-WEEK_TYPE = ['EVEN', 'ODD']
+# Види порушень у покажчику порушень розкладу (Schedule.violations): жорсткі та м'які
+HARD_VIOLATIONS = ('lecturer', 'group', 'subgroup', 'auditorium', 'overload', 'blocked')
+SOFT_VIOLATIONS = ('capacity', 'qualification')
 
-# Загальна кількість академічних годин
-TOTAL_LESSONS = DAYS_PER_WEEK * LESSONS_PER_DAY * len(WEEK_TYPE)
+# Маска 64-бітних відбитків генома
+FINGERPRINT_MASK = (1 << 64) - 1
 
-# Часові слоти з урахуванням парних/непарних тижнів
-TIMESLOTS = [f"{week} - day {day + 1}, lesson {slot + 1}"
-             for week in WEEK_TYPE
-             for day in range(DAYS_PER_WEEK)
-             for slot in range(LESSONS_PER_DAY)]
 
+# Детермінований 64-бітний ключ значення (однаковий у всіх процесах, на відміну від вбудованого hash())
+def zobrist_key(*value):
+    return int.from_bytes(hashlib.blake2b(repr(value).encode('utf-8'), digest_size=8).digest(), 'little')
 
-# Клас для представлення події розкладу
-class Event:
-    def __init__(self, timeslot, group_ids, subject_id, subject_name, lecturer_id, auditorium_id, event_type,
-                 subgroup_ids=None, week_type='Both'):
-        self.timeslot = timeslot
+
+# Перемішування 64-бітного числа (фіналізатор splitmix64)
+def mix64(z):
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & FINGERPRINT_MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & FINGERPRINT_MASK
+    return z ^ (z >> 31)
+
+
+# Ключі Зобріста для генів (обчислюються ліниво): часових слотів, викладачів і аудиторій
+SLOT_KEYS = {}
+LECTURER_KEYS = {}
+AUDITORIUM_KEYS = {}
+
+
+# Незмінні дані заняття (flyweight), спільні для всіх подій цього заняття в усіх розкладах популяції
+class EventTemplate:
+    __slots__ = ('group_ids', 'subject_id', 'subject_name', 'event_type', 'subgroup_ids', 'week_type', 'fingerprint')
+
+    def __init__(self, group_ids, subject_id, subject_name, event_type, subgroup_ids=None, week_type='Both'):
         self.group_ids = group_ids  # Список груп, які беруть участь у події
         self.subject_id = subject_id
         self.subject_name = subject_name
-        self.lecturer_id = lecturer_id
-        self.auditorium_id = auditorium_id
         self.event_type = event_type  # Тип заняття (наприклад, лекція або практика)
         self.subgroup_ids = subgroup_ids  # Словник з підгрупами для груп
         self.week_type = week_type  # Тип тижня ('EVEN', 'ODD' або 'Both')
+        self.fingerprint = None  # Ключ Зобріста шаблону (обчислюється під час першої реєстрації події)
 
 
-class Schedule:
-    def __init__(self):
-        self.events = []  # Список подій у розкладі
-        self.hard_constraints_violations = 0  # Ініціалізація для жорстких обмежень
-        self.soft_constraints_score = 0       # Ініціалізація для м'яких обмежень
+# Клас для представлення події розкладу: змінні гени (номер слоту календаря, аудиторія, викладач)
+# та спільний шаблон. Незмінні поля читаються з шаблону через властивості, тож подія займає лише чотири
+# слоти без __dict__
+class Event:
+    __slots__ = ('slot', 'lecturer_id', 'auditorium_id', 'template')
 
-    def add_event(self, event):
-        if event:
-            self.events.append(event)  # Додаємо подію до розкладу
+    def __init__(self, slot, group_ids, subject_id, subject_name, lecturer_id, auditorium_id, event_type,
+                 subgroup_ids=None, week_type='Both'):
+        self.slot = slot
+        self.lecturer_id = lecturer_id
+        self.auditorium_id = auditorium_id
+        self.template = EventTemplate(group_ids, subject_id, subject_name, event_type, subgroup_ids, week_type)
 
-    # Функція оцінки розкладу
-    def fitness(self, groups, lecturers, auditoriums):
-        self.hard_constraints_violations = 0  # Скидаємо лічильник порушень
-        self.soft_constraints_score = 0       # Скидаємо лічильник м'яких обмежень
+    # Копія події: копіюються лише гени, шаблон залишається спільним
+    def copy(self):
+        return template_event(self.template, self.slot, self.lecturer_id, self.auditorium_id)
 
-        lecturer_times = {}
-        group_times = {}
-        subgroup_times = {}
-        auditorium_times = {}
-        lecturer_hours = {}
+    # Назва часового слоту для виведення
+    @property
+    def timeslot(self):
+        return CALENDAR.labels[self.slot]
 
-        for event in self.events:
-            # Жорсткі обмеження
-            lt_key = (event.lecturer_id, event.timeslot)
-            if lt_key in lecturer_times:
-                self.hard_constraints_violations += 1  # Викладач зайнятий на іншому занятті
-            else:
-                lecturer_times[lt_key] = event
-
-            for group_id in event.group_ids:
-                gt_key = (group_id, event.timeslot)
-                if gt_key in group_times:
-                    self.hard_constraints_violations += 1  # Група зайнята на іншому занятті
-                else:
-                    group_times[gt_key] = event
-
-                if event.subgroup_ids and group_id in event.subgroup_ids:
-                    subgroup_id = event.subgroup_ids[group_id]
-                    sgt_key = (group_id, subgroup_id, event.timeslot)
-                    if sgt_key in subgroup_times:
-                        self.hard_constraints_violations += 1  # Підгрупа зайнята на іншому занятті
-                    else:
-                        subgroup_times[sgt_key] = event
-
-            at_key = (event.auditorium_id, event.timeslot)
-            if at_key in auditorium_times:
-                existing_event = auditorium_times[at_key]
-                if (event.event_type == 'Лекція' and
-                        existing_event.event_type == 'Лекція' and
-                        event.lecturer_id == existing_event.lecturer_id):
-                    pass
-                else:
-                    self.hard_constraints_violations += 1  # Аудиторія зайнята
-            else:
-                auditorium_times[at_key] = event
+    @property
+    def group_ids(self):
+        return self.template.group_ids
+
+    @property
+    def subject_id(self):
+        return self.template.subject_id
+
+    @property
+    def subject_name(self):
+        return self.template.subject_name
+
+    @property
+    def event_type(self):
+        return self.template.event_type
+
+    @property
+    def subgroup_ids(self):
+        return self.template.subgroup_ids
+
+    @property
+    def week_type(self):
+        return self.template.week_type
 
-            week = event.timeslot.split(' - ')[0]
-            lecturer_hours_key = (event.lecturer_id, week)
-            lecturer_hours[lecturer_hours_key] = lecturer_hours.get(lecturer_hours_key, 0) + 1.5
-            if lecturer_hours[lecturer_hours_key] > lecturers[event.lecturer_id]['MaxHoursPerWeek']:
-                self.hard_constraints_violations += 1  # Перевищено навантаження
 
-            # М'які обмеження
-            total_group_size = sum(
-                groups[g]['NumStudents'] // 2 if event.subgroup_ids and event.subgroup_ids.get(g) else groups[g][
-                    'NumStudents']
-                for g in event.group_ids)
-            if auditoriums[event.auditorium_id] < total_group_size:
-                self.soft_constraints_score += 1  # Аудиторія замала
+# Подія зі спільним шаблоном template та заданими генами
+def template_event(template, slot, lecturer_id, auditorium_id):
+    event = Event.__new__(Event)
+    event.slot = slot
+    event.lecturer_id = lecturer_id
+    event.auditorium_id = auditorium_id
+    event.template = template
+    return event
 
-            if event.subject_id not in lecturers[event.lecturer_id]['SubjectsCanTeach']:
-                self.soft_constraints_score += 1  # Викладач не може викладати цей предмет
 
-            if event.event_type not in lecturers[event.lecturer_id]['TypesCanTeach']:
-                self.soft_constraints_score += 1  # Викладач не може проводити цей тип заняття
+# Зайнятість слотів одним видом ресурсів: для кожного ресурсу одне ціле число, де біт i — зайнятий слот i.
+# Події понад першу в тому самому слоті (конфлікти) рахуються окремо, тож словник з кортежними ключами
+# використовується лише для конфліктів
+class SlotBitset:
+    def __init__(self):
+        self.masks = {}           # ресурс -> маска зайнятих слотів
+        self.overflow_masks = {}  # ресурс -> маска слотів, де подій більше однієї
+        self.overflow = {}        # (ресурс, слот) -> кількість подій понад першу
+
+    def copy(self):
+        bitset = SlotBitset.__new__(SlotBitset)
+        bitset.masks = self.masks.copy()
+        bitset.overflow_masks = self.overflow_masks.copy()
+        bitset.overflow = self.overflow.copy()
+        return bitset
+
+    def mask(self, resource):
+        return self.masks.get(resource, 0)
+
+    # Додає (sign=1) або прибирає (sign=-1) подію ресурсу в слоті; повертає зміну кількості конфліктів
+    def update(self, resource, slot, sign):
+        bit = 1 << slot
+        if sign > 0:
+            mask = self.masks.get(resource, 0)
+            if not mask & bit:
+                self.masks[resource] = mask | bit
+                return 0
+            key = (resource, slot)
+            self.overflow[key] = self.overflow.get(key, 0) + 1
+            self.overflow_masks[resource] = self.overflow_masks.get(resource, 0) | bit
+            return 1
+
+        if self.overflow_masks.get(resource, 0) & bit:
+            key = (resource, slot)
+            count = self.overflow[key] - 1
+            if count:
+                self.overflow[key] = count
+            else:
+                del self.overflow[key]
+                self.overflow_masks[resource] &= ~bit
+            return -1
+        self.masks[resource] &= ~bit
+        return 0
+
+    # Чи є в слоті інші події ресурсу, крім (можливо) однієї події, яку ми не враховуємо
+    def busy_without(self, resource, slot, excluded):
+        bit = 1 << slot
+        if not self.masks.get(resource, 0) & bit:
+            return False
+        return not excluded or bool(self.overflow_masks.get(resource, 0) & bit)
+
+
+# Зайнятість усіх ресурсів розкладу
+class Occupancy:
+    def __init__(self):
+        self.lecturers = SlotBitset()
+        self.groups = SlotBitset()
+        self.subgroups = SlotBitset()    # ресурс — (група, підгрупа)
+        self.group_lessons = SlotBitset()  # заняття всієї групи (без поділу на підгрупи)
+        self.auditoriums = SlotBitset()
+        self.shared_lectures = SlotBitset()  # ресурс — (аудиторія, викладач), лише для лекцій
+        self.lecturer_load = {}  # викладач -> [кількість пар у кожному типі тижня]
+
+    def copy(self):
+        occupancy = Occupancy.__new__(Occupancy)
+        occupancy.lecturers = self.lecturers.copy()
+        occupancy.groups = self.groups.copy()
+        occupancy.subgroups = self.subgroups.copy()
+        occupancy.group_lessons = self.group_lessons.copy()
+        occupancy.auditoriums = self.auditoriums.copy()
+        occupancy.shared_lectures = self.shared_lectures.copy()
+        occupancy.lecturer_load = {lid: load.copy() for lid, load in self.lecturer_load.items()}
+        return occupancy
+
+    # Маска слотів, у які можна поставити заняття без конфлікту для викладача, груп та підгруп
+    def free_mask(self, lecturer_id, group_ids, subgroup_ids=None):
+        busy = self.lecturers.mask(lecturer_id)
+        for group_id in group_ids:
+            busy |= self.groups.mask(group_id)
+            if subgroup_ids and group_id in subgroup_ids:
+                busy |= self.subgroups.mask((group_id, subgroup_ids[group_id]))
+        return ~busy
+
+    # Маска слотів, у яких вільна хоча б одна з аудиторій
+    def free_auditorium_mask(self, auditorium_ids):
+        all_busy = -1
+        for auditorium_id in auditorium_ids:
+            all_busy &= self.auditoriums.mask(auditorium_id)
+            if not all_busy:
+                break
+        return ~all_busy
 
-        total_score = self.hard_constraints_violations * 1000 + self.soft_constraints_score
-        return total_score  # Повертаємо загальне значення обмежень
 
+class Schedule:
+    def __init__(self, groups=None, lecturers=None, auditoriums=None, lessons=0):
+        self.events = []  # Список подій у розкладі
+        # Дані задачі; якщо вони задані, оцінка підтримується інкрементально
+        self.groups = groups
+        self.lecturers = lecturers
+        self.auditoriums = auditoriums
+        # Кількість занять задачі: кожне заняття без події (нерозміщене) — порушення жорстких обмежень
+        self.lessons = lessons
+        self._reset_occupancy()
+
+    def _reset_occupancy(self):
+        self.hard_constraints_violations = 0  # Ініціалізація для жорстких обмежень
+        self.soft_constraints_score = 0       # Ініціалізація для м'яких обмежень (разом з «вікнами»)
+        self.gaps = 0                         # Кількість «вікон» викладачів, груп та підгруп
+        self.fingerprint = 0                  # Відбиток генома (сума ключів подій за модулем 2^64)
+        self.missing = 0                      # Кількість нерозміщених занять (входить у жорсткі порушення)
+
+        # Побітова зайнятість ресурсів
+        self.occupancy = Occupancy()
+        self._count_missing()
+
+    # Облік нерозміщених занять після зміни кількості подій
+    def _count_missing(self):
+        missing = max(self.lessons - len(self.events), 0)
+        self.hard_constraints_violations += missing - self.missing
+        self.missing = missing
+
+    # Задання кількості занять задачі (наприклад, для розкладу, відновленого з файлу)
+    def expect_lessons(self, lessons):
+        self.lessons = lessons
+        self._count_missing()
+        return self
 
-# Функція для генерації початкової популяції розкладів
-def generate_initial_population(pop_size, groups, subjects, lecturers, auditoriums):
+    def add_event(self, event):
+        if event:
+            self.events.append(event)  # Додаємо подію до розкладу
+            if self.lecturers is not None:
+                self._register(event, 1)  # Оновлюємо лічильники та оцінку
+            self._count_missing()
+
+    # Копія розкладу: нові гени подій та лічильники, дані задачі та шаблони подій спільні
+    def copy(self):
+        schedule = Schedule.__new__(Schedule)
+        schedule.events = [event.copy() for event in self.events]
+        schedule.groups = self.groups
+        schedule.lecturers = self.lecturers
+        schedule.auditoriums = self.auditoriums
+        schedule.hard_constraints_violations = self.hard_constraints_violations
+        schedule.soft_constraints_score = self.soft_constraints_score
+        schedule.gaps = self.gaps
+        schedule.fingerprint = self.fingerprint
+        schedule.lessons = self.lessons
+        schedule.missing = self.missing
+        schedule.occupancy = self.occupancy.copy()
+        return schedule
+
+    # Заміна подій, починаючи з позиції start, копіями інших подій (оцінка оновлюється інкрементально)
+    def splice(self, start, events):
+        tracked = self.lecturers is not None
+        if tracked:
+            for event in self.events[start:]:
+                self._register(event, -1)
+        self.events[start:] = [event.copy() for event in events]
+        if tracked:
+            for event in self.events[start:]:
+                self._register(event, 1)
+        self._count_missing()
+
+    # Прив'язка розкладу до даних задачі (наприклад, після передачі з іншого процесу) з перерахунком лічильників
+    def attach(self, groups, lecturers, auditoriums):
+        if self.lecturers is not lecturers or self.groups is not groups or self.auditoriums is not auditoriums:
+            self.fitness(groups, lecturers, auditoriums)
+        return self
+
+    # Між процесами передаються лише події та оцінки: дані задачі вже є у процесі-отримувачі,
+    # а лічильники зайнятості відновлює attach()
+    def __getstate__(self):
+        return {
+            'events': self.events,
+            'hard_constraints_violations': self.hard_constraints_violations,
+            'soft_constraints_score': self.soft_constraints_score,
+            'gaps': self.gaps,
+            'fingerprint': self.fingerprint,
+            'lessons': self.lessons,
+            'missing': self.missing,
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.events = state['events']
+        self.hard_constraints_violations = state['hard_constraints_violations']
+        self.soft_constraints_score = state['soft_constraints_score']
+        self.gaps = state.get('gaps', 0)
+        self.fingerprint = state['fingerprint']
+        self.lessons = state.get('lessons', 0)
+        self.missing = state.get('missing', 0)
+
+    # Загальна оцінка розкладу за поточними лічильниками
+    def score(self):
+        return self.hard_constraints_violations * 1000 + self.soft_constraints_score
+
+    # Функція оцінки розкладу (повний перерахунок)
+    def fitness(self, groups, lecturers, auditoriums):
+        self.groups = groups
+        self.lecturers = lecturers
+        self.auditoriums = auditoriums
+        self._reset_occupancy()  # Скидаємо лічильники порушень та зайнятості
+        for event in self.events:
+            self._register(event, 1)
+        return self.score()  # Повертаємо загальне значення обмежень
+
+    # Зміна слоту, аудиторії або викладача події з інкрементальним оновленням оцінки
+    def move_event(self, event, slot=None, auditorium_id=None, lecturer_id=None):
+        tracked = self.lecturers is not None
+        if tracked:
+            self._register(event, -1)
+        if slot is not None:
+            event.slot = slot
+        if auditorium_id is not None:
+            event.auditorium_id = auditorium_id
+        if lecturer_id is not None:
+            event.lecturer_id = lecturer_id
+        if tracked:
+            self._register(event, 1)
+
+    # Обмін значенням атрибута ('slot', 'auditorium_id' або 'lecturer_id') між двома подіями
+    def swap_events(self, event1, event2, attribute):
+        tracked = self.lecturers is not None
+        if tracked:
+            self._register(event1, -1)
+            self._register(event2, -1)
+        value1, value2 = getattr(event1, attribute), getattr(event2, attribute)
+        setattr(event1, attribute, value2)
+        setattr(event2, attribute, value1)
+        if tracked:
+            self._register(event1, 1)
+            self._register(event2, 1)
+
+    # Додає (sign=1) або прибирає (sign=-1) подію з лічильників, змінюючи оцінку лише на її внесок
+    def _register(self, event, sign):
+        slot = event.slot
+        template = event.template
+        occupancy = self.occupancy
+        calendar = CALENDAR
+        gap_change, day_mask = calendar.gap_change, calendar.day_mask
+        lesson = slot % calendar.lessons_per_day
+        day_shift = slot - lesson  # Перший біт дня слоту
+        bit = 1 << slot
+        # Зміна «вікон»: SlotBitset.update повертає 0 саме тоді, коли змінився біт маски зайнятості,
+        # тож «вікна» перераховуються лише для цих ресурсів і лише в дні слоту
+        gaps = 0
+
+        # Жорсткі обмеження
+        hard = occupancy.lecturers.update(event.lecturer_id, slot, sign)  # Викладач зайнятий
+        if not hard:
+            gaps += gap_change[occupancy.lecturers.masks[event.lecturer_id] >> day_shift & day_mask][lesson]
+        for group_id in template.group_ids:
+            conflicts = occupancy.groups.update(group_id, slot, sign)  # Група зайнята
+            if conflicts:
+                hard += conflicts
+            else:
+                gaps += gap_change[occupancy.groups.masks[group_id] >> day_shift & day_mask][lesson]
+
+            # Розклад підгрупи — заняття всієї групи разом з її власними
+            lessons = occupancy.group_lessons.masks.get(group_id, 0)
+            if template.subgroup_ids and group_id in template.subgroup_ids:
+                subgroup = (group_id, template.subgroup_ids[group_id])
+                conflicts = occupancy.subgroups.update(subgroup, slot, sign)  # Підгрупа зайнята
+                if conflicts:
+                    hard += conflicts
+                elif not lessons & bit:
+                    mask = lessons | occupancy.subgroups.masks[subgroup]
+                    gaps += gap_change[mask >> day_shift & day_mask][lesson]
+            elif not occupancy.group_lessons.update(group_id, slot, sign):
+                lessons ^= bit
+                for subgroup_id in self.groups[group_id]['Subgroups']:
+                    mask = occupancy.subgroups.masks.get((group_id, subgroup_id), 0)
+                    if not mask & bit:
+                        gaps += gap_change[(lessons | mask) >> day_shift & day_mask][lesson]
+
+        # Аудиторія зайнята, якщо це не спільна лекція одного викладача
+        hard += occupancy.auditoriums.update(event.auditorium_id, slot, sign)
+        if template.event_type == 'Лекція':
+            hard -= occupancy.shared_lectures.update((event.auditorium_id, event.lecturer_id), slot, sign)
+
+        # Заняття в заблокованому слоті календаря
+        if calendar.blocked_mask & bit:
+            hard += sign
+
+        # Перевищено навантаження: кожна пара понад ліміт тижня — окреме порушення
+        week = calendar.slot_week[slot]
+        limit = lecturer_limit(self.lecturers, event.lecturer_id)
+        load = occupancy.lecturer_load.get(event.lecturer_id)
+        if load is None:
+            load = occupancy.lecturer_load[event.lecturer_id] = [0] * len(calendar.weeks)
+        hard -= max(load[week] - limit, 0)
+        load[week] += sign
+        hard += max(load[week] - limit, 0)
+
+        self.hard_constraints_violations += hard
+        self.gaps += gaps
+        self.soft_constraints_score += sign * self.event_soft_score(event) + GAP_WEIGHT * gaps
+        self.fingerprint = (self.fingerprint + sign * event_fingerprint(event, slot)) & FINGERPRINT_MASK
+
+    # Чи можна обміняти часові слоти подій так, щоб жодна з них не потрапила в слот,
+    # де її викладач, група чи підгрупа вже зайняті іншою подією
+    def can_swap_timeslots(self, event1, event2):
+        slot1, slot2 = event1.slot, event2.slot
+        if slot1 == slot2:
+            return True
+        return (not self._lands_busy(event1, slot2, event2, slot2)
+                and not self._lands_busy(event2, slot1, event1, slot1))
+
+    # Чи зайняті ресурси події в слоті slot (подію other у слоті other_slot не враховуємо)
+    def _lands_busy(self, event, slot, other, other_slot):
+        occupancy = self.occupancy
+        excluded = other.lecturer_id == event.lecturer_id and other_slot == slot
+        if occupancy.lecturers.busy_without(event.lecturer_id, slot, excluded):
+            return True
+        subgroup_ids = event.subgroup_ids
+        for group_id in event.group_ids:
+            excluded = other_slot == slot and group_id in other.group_ids
+            if occupancy.groups.busy_without(group_id, slot, excluded):
+                return True
+            if subgroup_ids and group_id in subgroup_ids:
+                subgroup = (group_id, subgroup_ids[group_id])
+                excluded = (other_slot == slot and other.subgroup_ids
+                            and other.subgroup_ids.get(group_id) == subgroup[1])
+                if occupancy.subgroups.busy_without(subgroup, slot, excluded):
+                    return True
+        return False
+
+    # М'які обмеження, що залежать лише від однієї події
+    def event_soft_score(self, event):
+        score = 0
+        template = event.template
+        total_group_size = sum(
+            self.groups[g]['NumStudents'] // 2 if template.subgroup_ids and template.subgroup_ids.get(g) else
+            self.groups[g]['NumStudents']
+            for g in template.group_ids)
+        if self.auditoriums[event.auditorium_id] < total_group_size:
+            score += 1  # Аудиторія замала
+
+        lecturer = self.lecturers[event.lecturer_id]
+        if template.subject_id not in lecturer['SubjectsCanTeach']:
+            score += 1  # Викладач не може викладати цей предмет
+
+        if template.event_type not in lecturer['TypesCanTeach']:
+            score += 1  # Викладач не може проводити цей тип заняття
+        return score
+
+    # Види порушень, у яких бере участь подія (за лічильниками, що підтримує оцінка):
+    # конфлікт викладача, групи, підгрупи чи аудиторії в її слоті, перевантаження викладача в її тижні,
+    # замала аудиторія та некваліфікований викладач
+    def event_violations(self, event):
+        occupancy = self.occupancy
+        template = event.template
+        slot = event.slot
+        bit = 1 << slot
+        kinds = []
+        if occupancy.lecturers.overflow_masks.get(event.lecturer_id, 0) & bit:
+            kinds.append('lecturer')
+        if any(occupancy.groups.overflow_masks.get(group_id, 0) & bit for group_id in template.group_ids):
+            kinds.append('group')
+        if template.subgroup_ids and any(occupancy.subgroups.overflow_masks.get(subgroup, 0) & bit
+                                         for subgroup in template.subgroup_ids.items()):
+            kinds.append('subgroup')
+        # Спільна лекція одного викладача в одній аудиторії не є конфліктом аудиторії
+        extra = occupancy.auditoriums.overflow.get((event.auditorium_id, slot), 0)
+        if extra and (template.event_type != 'Лекція' or extra > occupancy.shared_lectures.overflow.get(
+                ((event.auditorium_id, event.lecturer_id), slot), 0)):
+            kinds.append('auditorium')
+        if occupancy.lecturer_load[event.lecturer_id][CALENDAR.slot_week[slot]] > lecturer_limit(
+                self.lecturers, event.lecturer_id):
+            kinds.append('overload')
+        if CALENDAR.blocked_mask & bit:
+            kinds.append('blocked')
+        if self.auditoriums[event.auditorium_id] < group_size(self.groups, template.group_ids, template.subgroup_ids):
+            kinds.append('capacity')
+        lecturer = self.lecturers[event.lecturer_id]
+        if (template.subject_id not in lecturer['SubjectsCanTeach']
+                or template.event_type not in lecturer['TypesCanTeach']):
+            kinds.append('qualification')
+        return kinds
+
+    # Покажчик порушень розкладу: позиція події -> види порушень, у яких вона бере участь
+    # (конфлікт позначає всі події слоту, тож його усуває перенесення будь-якої з них)
+    def violations(self):
+        index = {}
+        for position, event in enumerate(self.events):
+            kinds = self.event_violations(event)
+            if kinds:
+                index[position] = kinds
+        return index
+
+
+# Тижневий ліміт викладача в парах
+def lecturer_limit(lecturers, lecturer_id):
+    return int(lecturers[lecturer_id]['MaxHoursPerWeek'] // CALENDAR.lesson_hours)
+
+
+# Ключ Зобріста події: перемішані ключі шаблону та генів. Відбиток розкладу — сума ключів подій,
+# тож він не залежить від порядку подій, а однакові події не взаємознищуються (як при XOR)
+def event_fingerprint(event, slot):
+    key = event.template.fingerprint
+    if key is None:
+        key = template_key(event.template)
+    lecturer = LECTURER_KEYS.get(event.lecturer_id)
+    if lecturer is None:
+        lecturer = LECTURER_KEYS[event.lecturer_id] = zobrist_key('lecturer', event.lecturer_id)
+    auditorium = AUDITORIUM_KEYS.get(event.auditorium_id)
+    if auditorium is None:
+        auditorium = AUDITORIUM_KEYS[event.auditorium_id] = zobrist_key('auditorium', event.auditorium_id)
+    slot_key = SLOT_KEYS.get(slot)
+    if slot_key is None:
+        slot_key = SLOT_KEYS[slot] = zobrist_key('slot', slot)
+    return mix64(key ^ slot_key ^ lecturer ^ auditorium)
+
+
+# Ключ Зобріста шаблону заняття: визначається змістом шаблону, тож однаковий для копій шаблону
+# в різних процесах (обчислюється один раз і зберігається в шаблоні)
+def template_key(template):
+    if template.fingerprint is None:
+        subgroups = sorted(template.subgroup_ids.items()) if template.subgroup_ids else None
+        template.fingerprint = zobrist_key(template.subject_id, template.event_type, template.week_type,
+                                           tuple(template.group_ids), subgroups)
+    return template.fingerprint
+
+
+# Обмежений LRU-кеш оцінок розкладів за відбитком генома
+class FitnessCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # відбиток -> оцінка, від найдавніше до найнещодавніше використаних
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint):
+        value = self.entries.get(fingerprint)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(fingerprint)
+        return value
+
+    def put(self, fingerprint, value):
+        self.entries[fingerprint] = value
+        self.entries.move_to_end(fingerprint)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+# Індекси задачі для генерації подій: будуються один раз, а не при кожному виклику create_random_event
+class GenerationIndex:
+    def __init__(self, lecturers, auditoriums):
+        # Придатні викладачі для (дисципліна, тип заняття): кортеж для вибору та множина для перевірок
+        eligible = {}
+        for lid, lecturer in lecturers.items():
+            for subject_id in lecturer['SubjectsCanTeach']:
+                for event_type in lecturer['TypesCanTeach']:
+                    eligible.setdefault((subject_id, event_type), []).append(lid)
+        self.eligible_lecturers = {key: tuple(lids) for key, lids in eligible.items()}
+        self.eligible_lecturer_sets = {key: frozenset(lids) for key, lids in eligible.items()}
+
+        # Аудиторії, відсортовані за місткістю: придатні для n студентів знаходяться бінарним пошуком
+        by_capacity = sorted(auditoriums.items(), key=lambda item: item[1])
+        self.auditorium_ids = tuple(aid for aid, _ in by_capacity)
+        self.auditorium_capacities = [capacity for _, capacity in by_capacity]
+
+        # Шаблони занять: створюються один раз на заняття задачі та діляться всіма розкладами
+        self.templates = {}
+
+    # Шаблон заняття дисципліни subj заданого типу та типу тижня (для підгрупи з subgroup_ids, якщо задано)
+    def template(self, subj, event_type, week_type, subgroup_ids=None):
+        group_id = subj['GroupID']
+        subgroup_id = subgroup_ids[group_id] if subgroup_ids else None
+        key = (subj['SubjectID'], group_id, event_type, week_type, subgroup_id)
+        template = self.templates.get(key)
+        if template is None:
+            template = self.templates[key] = EventTemplate(
+                [group_id], subj['SubjectID'], subj['SubjectName'], event_type,
+                {group_id: subgroup_id} if subgroup_ids else None, week_type)
+        return template
+
+    # Аудиторії, що вміщають size студентів (суфікс відсортованого списку)
+    def suitable_auditoriums(self, size):
+        return self.auditorium_ids[bisect.bisect_left(self.auditorium_capacities, size):]
+
+
+# Останній побудований індекс: для тих самих об'єктів даних не будується повторно
+_last_index = None
+
+
+# Індекс генерації для даних задачі, повторно використовує останній, якщо дані — ті самі об'єкти
+def generation_index(lecturers, auditoriums):
+    global _last_index
+    if _last_index is None or _last_index[0] is not lecturers or _last_index[1] is not auditoriums:
+        _last_index = (lecturers, auditoriums, GenerationIndex(lecturers, auditoriums))
+    return _last_index[2]
+
+
+# Випадковий кандидат, що задовольняє is_free: лінива перестановка Фішера–Єйтса без копіювання списку,
+# тож перевіряються лише вибрані кандидати, а розподіл такий самий, як у "перемішати та взяти перший вільний"
+def sample_free(candidates, is_free, rng):
+    n = len(candidates)
+    swapped = {}
+    for i in range(n):
+        j = rng.randrange(i, n)
+        candidate = candidates[swapped.get(j, j)]
+        swapped[j] = swapped.get(i, i)
+        if is_free(candidate):
+            return candidate
+    return None
+
+
+# Кількість занять задачі (скомпільована задача повторно використовується для тих самих даних)
+def lesson_count(groups, subjects, lecturers, auditoriums):
+    from problem import compile_problem  # Відкладений імпорт: модуль problem сам імпортує цей модуль
+    return len(compile_problem(groups, subjects, lecturers, auditoriums).lessons)
+
+
+# Функція для генерації початкової популяції розкладів. Заняття, для якого не знайшлося вільного слоту,
+# не отримує події й рахується як порушення жорстких обмежень
+def generate_initial_population(pop_size, groups, subjects, lecturers, auditoriums, rng=random, index=None):
+    index = index or generation_index(lecturers, auditoriums)
+    lessons = lesson_count(groups, subjects, lecturers, auditoriums)
     population = []
     for _ in range(pop_size):
-        lecturer_times = {}  # Словник для зберігання зайнятих часових слотів викладачами
-        group_times = {}  # Словник для зберігання зайнятих часових слотів групами
-        subgroup_times = {}  # Словник для зберігання зайнятості підгруп
-        auditorium_times = {}  # Словник для зберігання зайнятих аудиторій
-        schedule = Schedule()
+        # Оцінка та зайнятість оновлюються під час додавання подій
+        schedule = Schedule(groups, lecturers, auditoriums, lessons)
+        occupancy = schedule.occupancy  # Побітова зайнятість викладачів, груп, підгруп та аудиторій
 
         for subj in subjects:
-            weeks = [subj['WeekType']] if subj['WeekType'] in WEEK_TYPE else WEEK_TYPE
-            for week in weeks:
+            for week in CALENDAR.subject_weeks(subj['WeekType']):
                 # Додаємо лекції
                 for _ in range(subj['NumLectures']):
                     event = create_random_event(
-                        subj, groups, lecturers, auditoriums, 'Лекція', week,
-                        lecturer_times, group_times, subgroup_times, auditorium_times
+                        subj, groups, lecturers, auditoriums, 'Лекція', week, occupancy, rng=rng, index=index
                     )
                     if event:
                         schedule.add_event(event)
@@ -146,15 +653,14 @@ def generate_initial_population(pop_size, groups, subjects, lecturers, auditoriu
                         for subgroup_id in groups[subj['GroupID']]['Subgroups']:
                             subgroup_ids = {subj['GroupID']: subgroup_id}
                             event = create_random_event(
-                                subj, groups, lecturers, auditoriums, 'Практика', week,
-                                lecturer_times, group_times, subgroup_times, auditorium_times, subgroup_ids
+                                subj, groups, lecturers, auditoriums, 'Практика', week, occupancy, subgroup_ids,
+                                rng, index
                             )
                             if event:
                                 schedule.add_event(event)
                     else:
                         event = create_random_event(
-                            subj, groups, lecturers, auditoriums, 'Практика', week,
-                            lecturer_times, group_times, subgroup_times, auditorium_times
+                            subj, groups, lecturers, auditoriums, 'Практика', week, occupancy, rng=rng, index=index
                         )
                         if event:
                             schedule.add_event(event)
@@ -164,105 +670,63 @@ def generate_initial_population(pop_size, groups, subjects, lecturers, auditoriu
     return population
 
 
+# Випадковий встановлений біт маски (номер вільного слоту)
+def random_bit(mask, rng):
+    for _ in range(rng.randrange(mask.bit_count())):
+        mask &= mask - 1  # Прибираємо молодший встановлений біт
+    return (mask & -mask).bit_length() - 1
+
+
+# Створення випадкової події у слоті, де вільні викладач, група (підгрупа) та аудиторія.
+# Вільні слоти визначаються побітовими операціями над масками зайнятості occupancy,
+# тож подія втрачається лише тоді, коли вільного слоту справді немає. Подія ділить шаблон заняття
+# з index (один на заняття задачі), тож новою є лише трійка генів.
+# Подію потрібно додати до розкладу (Schedule.add_event), щоб вона зайняла ресурси в occupancy
 def create_random_event(
-        subj, groups, lecturers, auditoriums, event_type, week_type,
-        lecturer_times, group_times, subgroup_times, auditorium_times, subgroup_ids=None
+        subj, groups, lecturers, auditoriums, event_type, week_type, occupancy, subgroup_ids=None, rng=random,
+        index=None
 ):
-    # Вибираємо випадковий часовий слот для заданого типу тижня
-    global lecturer_key
-    timeslot = random.choice([t for t in TIMESLOTS if t.startswith(week_type)])
-
-    # Знаходимо викладачів, які можуть викладати цей предмет і тип заняття
-    suitable_lecturers = [
-        lid for lid, l in lecturers.items()
-        if subj['SubjectID'] in l['SubjectsCanTeach'] and event_type in l['TypesCanTeach']
-    ]
+    index = index or generation_index(lecturers, auditoriums)
+
+    # Викладачі, які можуть викладати цей предмет і тип заняття
+    suitable_lecturers = index.eligible_lecturers.get((subj['SubjectID'], event_type))
     if not suitable_lecturers:
         return None  # Немає підходящих викладачів
 
-    # Вибираємо випадкового викладача, який не зайнятий у цей часовий слот
-    random.shuffle(suitable_lecturers)
-    lecturer_id = None
+    # Слоти заданого типу тижня, у які вільний хоча б один підходящий викладач
+    free = 0
     for lid in suitable_lecturers:
-        lecturer_key = (lid, timeslot)
-        if lecturer_key not in lecturer_times:
-            lecturer_id = lid
-            break
-    if not lecturer_id:
-        return None  # Всі викладачі зайняті
-
-    # Вибір груп
-    if event_type == 'Лекція':
-        # Вибираємо від 1 до 3 груп, які не зайняті в цей часовий слот
-        available_groups = [gid for gid in groups if (gid, timeslot) not in group_times]
-        if not available_groups:
-            return None  # Немає доступних груп
-        num_groups = random.randint(1, min(3, len(available_groups)))
-        group_ids = random.sample(available_groups, num_groups)
-    else:
-        group_ids = [subj['GroupID']]
-        # Перевірка зайнятості групи
-        if (group_ids[0], timeslot) in group_times:
-            return None  # Група зайнята
-
-    # Перевірка зайнятості груп
-    for group_id in group_ids:
-        group_key = (group_id, timeslot)
-        if group_key in group_times:
-            return None  # Група зайнята у цей часовий слот
-
-    # Перевірка зайнятості підгруп
-    if event_type == 'Практика' and subj['RequiresSubgroups']:
-        if subgroup_ids is None:
-            subgroup_ids = {}
-            for group_id in group_ids:
-                subgroup_ids[group_id] = random.choice(groups[group_id]['Subgroups'])
-        for group_id, subgroup_id in subgroup_ids.items():
-            subgroup_key = (group_id, subgroup_id, timeslot)
-            if subgroup_key in subgroup_times:
-                return None  # Підгрупа зайнята у цей часовий слот
-    else:
-        subgroup_ids = None  # Якщо підгрупи не потрібні, встановлюємо None
-
-    # Вибір аудиторії з підходящою місткістю
-    total_group_size = sum(
+        free |= ~occupancy.lecturers.mask(lid)
+    free &= CALENDAR.week_masks[week_type]
+
+    # Лекції та практики без поділу ведуться для всієї групи дисципліни
+    if event_type == 'Лекція' or not subj['RequiresSubgroups']:
+        subgroup_ids = None
+    elif subgroup_ids is None:
+        subgroup_ids = {subj['GroupID']: rng.choice(groups[subj['GroupID']]['Subgroups'])}
+    template = index.template(subj, event_type, week_type, subgroup_ids)
+
+    # Група та підгрупа мають бути вільні, а також хоча б одна аудиторія з достатньою місткістю
+    suitable_auditoriums = index.suitable_auditoriums(group_size(groups, template.group_ids, template.subgroup_ids))
+    free &= occupancy.free_mask(None, template.group_ids, template.subgroup_ids)
+    free &= occupancy.free_auditorium_mask(suitable_auditoriums)
+    if not free:
+        return None  # Немає вільного часового слоту
+    slot = random_bit(free, rng)
+    bit = 1 << slot
+
+    # Вибираємо випадкового викладача та аудиторію, які не зайняті в цей часовий слот
+    lecturer_id = sample_free(suitable_lecturers, lambda lid: not occupancy.lecturers.mask(lid) & bit, rng)
+    auditorium_id = sample_free(suitable_auditoriums, lambda aid: not occupancy.auditoriums.mask(aid) & bit, rng)
+    return template_event(template, slot, lecturer_id, auditorium_id)
+
+
+# Кількість студентів на занятті (підгрупа — половина групи)
+def group_size(groups, group_ids, subgroup_ids):
+    return sum(
         groups[g]['NumStudents'] // 2 if subgroup_ids and g in subgroup_ids else groups[g]['NumStudents']
         for g in group_ids
     )
-    suitable_auditoriums = [
-        (aid, cap) for aid, cap in auditoriums.items() if cap >= total_group_size
-    ]
-    if not suitable_auditoriums:
-        return None  # Немає аудиторій з достатньою місткістю
-
-    # Випадковим чином обираємо аудиторію з доступних
-    random.shuffle(suitable_auditoriums)
-    auditorium_id = None
-    for aid, cap in suitable_auditoriums:
-        auditorium_key = (aid, timeslot)
-        if auditorium_key not in auditorium_times:
-            auditorium_id = aid
-            break
-    if not auditorium_id:
-        return None  # Всі аудиторії зайняті
-
-    event = Event(
-        timeslot, group_ids, subj['SubjectID'], subj['SubjectName'],
-        lecturer_id, auditorium_id, event_type, subgroup_ids, week_type
-    )
-
-    # Реєструємо зайнятість викладача, груп, підгруп та аудиторії
-    lecturer_times[lecturer_key] = event
-    for group_id in group_ids:
-        group_key = (group_id, timeslot)
-        group_times[group_key] = event
-        if event_type == 'Практика' and subgroup_ids and group_id in subgroup_ids:
-            subgroup_id = subgroup_ids[group_id]
-            subgroup_key = (group_id, subgroup_id, timeslot)
-            subgroup_times[subgroup_key] = event
-    auditorium_times[(auditorium_id, timeslot)] = event
-
-    return event
 
 
 # Функція для відбору найкращих розкладів у популяції
@@ -273,12 +737,12 @@ def select_population(population, groups, lecturers, auditoriums, fitness_functi
 
 
 # Реалізація "травоїдного" згладжування
-def herbivore_smoothing(population, best_schedule, lecturers, auditoriums):
+def herbivore_smoothing(population, best_schedule, lecturers, auditoriums, rng=random):
     # Додаємо невеликі випадкові варіації до найкращого розкладу
     new_population = []
     for _ in range(len(population)):
-        new_schedule = copy.deepcopy(best_schedule)  # Копіюємо найкращий розклад
-        mutate(new_schedule, lecturers, auditoriums, intensity=0.1)  # Виконуємо мутацію з низькою інтенсивністю
+        new_schedule = best_schedule.copy()  # Копіюємо гени найкращого розкладу
+        mutate(new_schedule, lecturers, auditoriums, intensity=0.1, rng=rng)  # Виконуємо мутацію з низькою інтенсивністю
         new_population.append(new_schedule)
     return new_population
 
@@ -291,13 +755,13 @@ def predator_approach(population, groups, lecturers, auditoriums, fitness_functi
 
 
 # Реалізація "дощу"
-def rain(population_size, groups, subjects, lecturers, auditoriums):
+def rain(population_size, groups, subjects, lecturers, auditoriums, rng=random):
     # Генеруємо нові випадкові розклади та додаємо їх до популяції
-    new_population = generate_initial_population(population_size, groups, subjects, lecturers, auditoriums)
+    new_population = generate_initial_population(population_size, groups, subjects, lecturers, auditoriums, rng)
     return new_population
 
 
-def mutate(schedule, lecturers, auditoriums, intensity=0.3):
+def mutate(schedule, lecturers, auditoriums, intensity=0.3, rng=random):
     num_events_to_mutate = int(len(schedule.events) * intensity)
     # Забезпечуємо, що кількість подій для мутації є парною та не менше 2
     if num_events_to_mutate < 2:
@@ -307,24 +771,90 @@ def mutate(schedule, lecturers, auditoriums, intensity=0.3):
     if num_events_to_mutate > len(schedule.events):
         num_events_to_mutate = len(schedule.events) - (len(schedule.events) % 2)
 
-    events_to_mutate = random.sample(schedule.events, num_events_to_mutate)
+    events_to_mutate = rng.sample(schedule.events, num_events_to_mutate)
     # Обмінюємо часові слоти між парами подій
     for i in range(0, len(events_to_mutate), 2):
         event1 = events_to_mutate[i]
         event2 = events_to_mutate[i + 1]
 
         # Перевіряємо, чи можна обміняти події без порушення жорстких обмежень
-        if can_swap_events(event1, event2):
-            # Виконуємо обмін часовими слотами
-            event1.timeslot, event2.timeslot = event2.timeslot, event1.timeslot
+        if can_swap_events(event1, event2) and schedule.can_swap_timeslots(event1, event2):
+            # Виконуємо обмін часовими слотами (оцінка розкладу оновлюється інкрементально)
+            schedule.swap_events(event1, event2, 'slot')
 
             # З випадковою ймовірністю обмінюємо аудиторії, тільки якщо це дозволено
-            if random.random() < 0.5 and can_swap_auditoriums(event1, event2):
-                event1.auditorium_id, event2.auditorium_id = event2.auditorium_id, event1.auditorium_id
+            if rng.random() < 0.5 and can_swap_auditoriums(event1, event2):
+                schedule.swap_events(event1, event2, 'auditorium_id')
 
             # З випадковою ймовірністю обмінюємо викладачів, тільки якщо це дозволено
-            if random.random() < 0.5 and can_swap_lecturers(event1, event2):
-                event1.lecturer_id, event2.lecturer_id = event2.lecturer_id, event1.lecturer_id
+            if rng.random() < 0.5 and can_swap_lecturers(event1, event2):
+                schedule.swap_events(event1, event2, 'lecturer_id')
+
+
+# Ремонт розкладу, спрямований на конфлікти: події з покажчика порушень (у випадковому порядку, не більше
+# limit) переносяться туди, де за масками зайнятості вільні їх викладач, групи, підгрупи та придатна аудиторія.
+# Жорсткі порушення від ремонту не з'являються. Повертає кількість змінених подій
+def repair(schedule, index, rng=random, limit=None):
+    positions = list(schedule.violations())
+    rng.shuffle(positions)
+    repaired = 0
+    for position in positions[:limit]:
+        event = schedule.events[position]
+        kinds = schedule.event_violations(event)  # Попередні ходи могли вже усунути порушення
+        if kinds and _repair_event(schedule, event, kinds, index, rng):
+            repaired += 1
+    return repaired
+
+
+# Ремонт однієї події: без конфліктів викладача, груп та підгруп спершу пробуємо замінити в тому самому слоті
+# аудиторію (конфлікт чи замала місткість) та викладача (кваліфікація чи перевантаження), інакше переносимо
+# подію в слот, де вільні її викладач (або придатний викладач із запасом навантаження), групи, підгрупи
+# та хоча б одна аудиторія достатньої місткості
+def _repair_event(schedule, event, kinds, index, rng):
+    occupancy = schedule.occupancy
+    slot = event.slot
+    bit = 1 << slot
+    week = CALENDAR.slot_week[slot]
+    auditorium_ids = index.suitable_auditoriums(group_size(schedule.groups, event.group_ids, event.subgroup_ids))
+    auditorium_ids = auditorium_ids or index.auditorium_ids
+    lecturer_ids = [event.lecturer_id]
+    if 'qualification' in kinds or 'overload' in kinds:
+        # Придатні викладачі, яким нова пара не перевищить тижневий ліміт
+        load = occupancy.lecturer_load
+        lecturer_ids = [lid for lid in index.eligible_lecturers.get((event.subject_id, event.event_type), ())
+                        if lid != event.lecturer_id
+                        and (lid not in load or load[lid][week] < lecturer_limit(schedule.lecturers, lid))]
+        if not lecturer_ids:
+            if set(kinds) <= {'qualification', 'overload'}:
+                return False  # Перенесення в інший слот цих порушень не усуває
+            lecturer_ids = [event.lecturer_id]
+
+    if not {'lecturer', 'group', 'subgroup'} & set(kinds):
+        change = {}
+        if 'auditorium' in kinds or 'capacity' in kinds:
+            auditorium_id = sample_free(auditorium_ids, lambda aid: not occupancy.auditoriums.mask(aid) & bit, rng)
+            if auditorium_id is not None:
+                change['auditorium_id'] = auditorium_id
+        if lecturer_ids[0] != event.lecturer_id:
+            lecturer_id = sample_free(lecturer_ids, lambda lid: not occupancy.lecturers.mask(lid) & bit, rng)
+            if lecturer_id is not None:
+                change['lecturer_id'] = lecturer_id
+        if change:
+            schedule.move_event(event, **change)
+            return True
+
+    # Слоти того самого типу тижня, де вільні групи, підгрупи та хоча б одна придатна аудиторія
+    free = CALENDAR.week_masks[CALENDAR.weeks[week]] & ~bit
+    free &= occupancy.free_mask(None, event.group_ids, event.subgroup_ids)
+    free &= occupancy.free_auditorium_mask(auditorium_ids)
+    lecturer_id = sample_free(lecturer_ids, lambda lid: free & ~occupancy.lecturers.mask(lid), rng)
+    if lecturer_id is None:
+        return False
+    slot = random_bit(free & ~occupancy.lecturers.mask(lecturer_id), rng)
+    bit = 1 << slot
+    auditorium_id = sample_free(auditorium_ids, lambda aid: not occupancy.auditoriums.mask(aid) & bit, rng)
+    schedule.move_event(event, slot, auditorium_id, lecturer_id)
+    return True
 
 
 # Функція для перевірки можливості обміну подіями
@@ -362,80 +892,418 @@ def select_from_population(population, fitness_function):
     return population[:len(population) // 2] if len(population) > 1 else population  # Повертаємо половину найкращих
 
 
-# Функція для вибору N найкращих розкладів у популяції
-def select_top_n(population, fitness_function, n):
-    population.sort(key=fitness_function)
-    return population[:n]
+# Параметри мутації (ймовірність, інтенсивність) для рівнів застою 0, 1 та 2
+STAGNATION_MUTATION = [(0.3, 0.3), (0.6, 0.5), (0.6, 0.5)]
 
+# Рівень застою, на якому етап завершується
+STAGNATION_STOP = 3
 
-# Функція для схрещування двох розкладів
-def crossover(parent1, parent2):
-    # Створюємо копію батьківських розкладів
-    child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
-    crossover_point = len(parent1.events) // 2
+# Частка популяції, яку на другому рівні застою замінюють нові випадкові розклади
+IMMIGRANT_SHARE = 0.25
 
-    # Обмінюємо події на основі точки схрещування
-    child1.events[crossover_point:], child2.events[crossover_point:] = parent2.events[crossover_point:], parent1.events[
-                                                                                                         crossover_point:]
-    return child1, child2
+# Ймовірність ремонту порушень кожного нащадка
+REPAIR_PROBABILITY = 1.0
 
 
-# Генетичний алгоритм з схрещуванням та вибором кількох елементів
-def genetic_algorithm(groups, subjects, lecturers, auditoriums, generations=100):
-    global best_schedule
-    population_size = 50
-    n_best_to_select = 10  # Кількість найкращих розкладів, що обираються для наступного покоління
-    population = generate_initial_population(population_size, groups, subjects, lecturers, auditoriums)
-
-    # Етап 1: Жорсткі обмеження
-    for generation in range(generations):
-        population = select_top_n(population, lambda sched: sched.hard_constraints_violations, n_best_to_select)
-
-        # Перевірка, чи знайдено розклад без порушень жорстких обмежень
-        if population[0].hard_constraints_violations == 0:
-            best_schedule = population[0]
-            print(f"Покоління: {generation + 1}, Найкращий розклад для жорстких обмежень знайдено.")
-            break
+# Облік застою етапу: якщо найкраща оцінка не покращується patience поколінь поспіль, рівень зростає.
+# Рівень 1 — сильніша мутація, 2 — ще й нові випадкові розклади в популяції, 3 — етап завершується,
+# бо подальші покоління не окупаються. Покращення скидає рівень до 0
+class Stagnation:
+    def __init__(self, patience):
+        self.patience = patience
+        self.best = None
+        self.stalled = 0  # Поколінь поспіль без покращення
+
+    @property
+    def level(self):
+        return min(self.stalled // self.patience, STAGNATION_STOP)
+
+    # Облік найкращої оцінки покоління; повертає новий рівень, якщо він щойно змінився, інакше None
+    def update(self, value):
+        previous = self.level
+        if self.best is None or value < self.best:
+            self.best, self.stalled = value, 0
         else:
-            best_schedule = population[0]
+            self.stalled += 1
+        level = self.level
+        return level if level != previous else None
 
-        # Схрещування між вибраними найкращими розкладами
-        new_population = []
-        while len(new_population) < population_size:
-            parent1, parent2 = random.sample(population, 2)
-            child1, child2 = crossover(parent1, parent2)
-            new_population.extend([child1, child2])
+    # Ймовірність та інтенсивність мутації для поточного рівня
+    def mutation(self):
+        return STAGNATION_MUTATION[min(self.level, len(STAGNATION_MUTATION) - 1)]
 
-        # Мутація нової популяції
-        for schedule in new_population:
-            if random.random() < 0.3:
-                mutate(schedule, lecturers, auditoriums)
 
-        population = new_population
+# Функція для вибору N найкращих розкладів у популяції.
+# Якщо unique, однакові розклади (з тим самим відбитком генома) відбираються лише тоді,
+# коли різних розкладів менше за N
+def select_top_n(population, fitness_function, n, unique=False):
+    population.sort(key=fitness_function)
+    if not unique:
+        return population[:n]
+    seen, distinct, copies = set(), [], []
+    for schedule in population:
+        if schedule.fingerprint in seen:
+            copies.append(schedule)
+        else:
+            seen.add(schedule.fingerprint)
+            distinct.append(schedule)
+    return (distinct + copies)[:n]
+
+
+# Заняття розкладу, вирівняні між розкладами: (ключ шаблону, номер повторення) -> подія. Повторення
+# одного заняття (наприклад, кілька лекцій дисципліни в тиждень) нумеруються в порядку подій розкладу,
+# тож однаковий ключ у двох розкладах означає те саме заняття, навіть якщо розклади втратили різні події
+def aligned_lessons(schedule):
+    lessons, repeats = {}, {}
+    for event in schedule.events:
+        key = event.template.fingerprint
+        if key is None:
+            key = template_key(event.template)
+        k = repeats.get(key, 0)
+        repeats[key] = k + 1
+        lessons[key, k] = event
+    return lessons
+
+
+# Блоки схрещування: усі заняття одного блоку нащадок успадковує від того самого з батьків.
+# uniform — кожне заняття окремо, group — заняття групи дисципліни, lecturer — заняття викладача
+# (за першим з батьків, у якому заняття є), тож узгоджені частини розкладу переходять цілими
+def _lesson_block(lesson, event):
+    return lesson
+
+
+def _group_block(lesson, event):
+    return event.template.group_ids[0]
+
+
+def _lecturer_block(lesson, event):
+    return event.lecturer_id
+
+
+# Оператори схрещування (значення crossover_operator)
+CROSSOVERS = {'uniform': _lesson_block, 'group': _group_block, 'lecturer': _lecturer_block}
+
+
+# Функція для схрещування двох розкладів: заняття вирівнюються за шаблоном (aligned_lessons), і для кожного
+# блоку оператора operator випадково обирається, чи обмінюються нащадки (копії батьків) генами його занять.
+# Заняття, яке один з батьків втратив, нащадки беруть від іншого, тож схрещування не дублює й не губить
+# занять. Оцінка оновлюється інкрементально лише для занять, гени яких у батьків різні
+def crossover(parent1, parent2, operator='group', rng=random):
+    # Створюємо копію батьківських розкладів (копіюються лише гени, шаблони подій спільні)
+    child1, child2 = parent1.copy(), parent2.copy()
+    if parent1.fingerprint == parent2.fingerprint and parent1.lecturers is not None:
+        return child1, child2  # Однакові батьки: нащадки — їх копії, обмін подіями та переоцінка не потрібні
+    block_of = CROSSOVERS[operator]
+    lessons1, lessons2 = aligned_lessons(child1), aligned_lessons(child2)
+    exchanged = {}  # Блок -> чи обмінюються нащадки генами його занять
+    only_second = ((lesson, event) for lesson, event in lessons2.items() if lesson not in lessons1)
+    for lesson, event in itertools.chain(lessons1.items(), only_second):
+        event1, event2 = lessons1.get(lesson), lessons2.get(lesson)
+        if event1 is None:
+            child1.add_event(event2.copy())
+            continue
+        if event2 is None:
+            child2.add_event(event1.copy())
+            continue
+        block = block_of(lesson, event)
+        exchange = exchanged.get(block)
+        if exchange is None:
+            exchange = exchanged[block] = rng.random() < 0.5
+        if exchange and (event1.slot != event2.slot or event1.lecturer_id != event2.lecturer_id
+                         or event1.auditorium_id != event2.auditorium_id):
+            slot, auditorium_id, lecturer_id = event1.slot, event1.auditorium_id, event1.lecturer_id
+            child1.move_event(event1, event2.slot, event2.auditorium_id, event2.lecturer_id)
+            child2.move_event(event2, slot, auditorium_id, lecturer_id)
+    return child1, child2
+
+
+# Кількість найкращих розкладів, з яких відбір truncation обирає батьків
+TRUNCATION_SIZE = 10
+
+# Кількість учасників турніру відбору tournament
+TOURNAMENT_SIZE = 7
+
+
+# Відбір пар батьків з n_ranked розкладів, упорядкованих від найкращого (тож відбір працює з рангами).
+# truncation — рівноймовірні пари з n_best найкращих розкладів
+def truncation_pairs(n_ranked, n_pairs, rng, n_best=TRUNCATION_SIZE):
+    pool = range(min(n_best, n_ranked))
+    return [rng.sample(pool, 2) for _ in range(n_pairs)]
+
+
+# tournament — кожен з батьків є переможцем (найменший ранг) турніру з size випадкових розкладів;
+# другий турнір пари проводиться без переможця першого
+def tournament_pairs(n_ranked, n_pairs, rng, size=TOURNAMENT_SIZE):
+    size = min(size, n_ranked - 1)
+    pairs = []
+    for _ in range(n_pairs):
+        first = min(rng.sample(range(n_ranked), size))
+        second = min(rng.sample(range(n_ranked - 1), size))
+        pairs.append((first, second + (second >= first)))
+    return pairs
 
-    # Етап 2: Оптимізація м'яких обмежень, зберігаючи жорсткі
-    for generation in range(generations):
-        population = select_top_n(population, lambda sched: sched.soft_constraints_score, n_best_to_select)
-        best_schedule = population[0]
-        best_fitness = best_schedule.soft_constraints_score
 
-        print(f"Покоління: {generation + 1}, Оптимізація м'яких обмежень, поточна найкраща оцінка: {best_fitness}")
+# Способи відбору пар батьків (значення selection)
+SELECTIONS = {'truncation': truncation_pairs, 'tournament': tournament_pairs}
 
-        if best_fitness == 0:
-            break
 
-        # Схрещування для оптимізації м'яких обмежень
-        new_population = []
-        while len(new_population) < population_size:
-            parent1, parent2 = random.sample(population, 2)
-            child1, child2 = crossover(parent1, parent2)
-            new_population.extend([child1, child2])
+# Створення нащадків: схрещування заданих пар батьків (пари індексів) оператором crossover_operator
+# (див. CROSSOVERS), мутація нащадків та (з ймовірністю repair_probability) ремонт їх порушень.
+# Якщо передано словник timings, до нього додається час схрещування, мутації та ремонту
+# (оцінка нащадків інкрементальна, тож її час входить у ці етапи)
+def breed(parents, pairs, lecturers, auditoriums, rng=random, mutation_probability=0.3, timings=None,
+          mutation_intensity=0.3, repair_probability=REPAIR_PROBABILITY, crossover_operator='group'):
+    clock = time.perf_counter()
+    children = []
+    for i, j in pairs:
+        children.extend(crossover(parents[i], parents[j], crossover_operator, rng))
+    crossed = time.perf_counter()
 
-        # Мутація нової популяції
-        for schedule in new_population:
-            if random.random() < 0.3:
-                mutate(schedule, lecturers, auditoriums)
+    # Мутація нової популяції
+    for schedule in children:
+        if rng.random() < mutation_probability:
+            mutate(schedule, lecturers, auditoriums, mutation_intensity, rng=rng)
+    mutated = time.perf_counter()
 
-        population = new_population
+    # Ремонт нащадків, спрямований на події з порушеннями
+    if repair_probability:
+        index = generation_index(lecturers, auditoriums)
+        for schedule in children:
+            if rng.random() < repair_probability:
+                repair(schedule, index, rng)
+    if timings is not None:
+        timings['crossover'] = timings.get('crossover', 0.0) + crossed - clock
+        timings['mutation'] = timings.get('mutation', 0.0) + mutated - crossed
+        timings['repair'] = timings.get('repair', 0.0) + time.perf_counter() - mutated
+    return children
 
+
+# Генетичний алгоритм з схрещуванням та вибором кількох елементів
+def genetic_algorithm(groups, subjects, lecturers, auditoriums, generations=100, engine='python',
+                      backend='serial', workers=None, seed=None, islands=0, migration_interval=10, topology='ring',
+                      seed_strategy='random', constructive_share=0.5, local_search_iterations=0,
+                      local_search_time=None, stats=None, observers=None, checkpoint=None, checkpoint_interval=10,
+                      resume=None, warm_start=None, warm_share=0.2, time_limit=None, stagnation=None,
+                      repair_probability=REPAIR_PROBABILITY, decompose=False, crossover_operator='group',
+                      selection='tournament', elites=2):
+    # Режим anytime: time_limit — бюджет усього запуску в секундах, stagnation — кількість поколінь без
+    # покращення, після якої посилюється мутація, додаються нові розклади, а згодом етап завершується.
+    # У цьому режимі generations=None знімає обмеження кількості поколінь. Рушії python та numpy
+    # повертають найкращий за score() розклад з усіх поколінь обох етапів.
+    # repair_probability — ймовірність ремонту порушень кожного нащадка (рушій python та острови).
+    # decompose — розв'язувати незалежні частини задачі паралельно (workers процесів) та об'єднати
+    # їх розклади. crossover_operator (CROSSOVERS) та selection (SELECTIONS) — оператори схрещування
+    # та відбору пар батьків, elites — кількість найкращих розкладів, що переходять у наступне
+    # покоління без змін (рушій python та острови)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    if generations is None and deadline is None and not stagnation:
+        raise ValueError("Без кількості поколінь потрібен ліміт часу або поріг застою")
+    # Необов'язкова статистика запуску: час етапів, кількість поколінь та оцінених розкладів
+    stats = {} if stats is None else stats
+    stats.setdefault('phase_seconds', {})
+    # Спостерігачі отримують запис телеметрії кожного покоління; за замовчуванням — вивід у консоль
+    observers = [telemetry.ConsoleSink()] if observers is None else observers
+    # Контрольні точки (checkpoint — файл, resume — файл для продовження) та теплий старт
+    # з розкладу warm_start підтримує лише рушій python без островів
+    if (islands or engine != 'python') and (checkpoint or resume or warm_start is not None):
+        raise ValueError("Контрольні точки та теплий старт підтримує лише рушій python без островів")
+    if islands and (deadline is not None or stagnation or generations is None):
+        raise ValueError("Ліміт часу та поріг застою не підтримуються острівною моделлю")
+    if islands and (engine != 'python' or backend != 'serial' or workers is not None):
+        raise ValueError("Острівна модель підтримує лише рушій python: острови вже є окремими процесами")
+    if decompose and (islands or checkpoint or resume or warm_start is not None):
+        raise ValueError("Декомпозиція не підтримує острови, контрольні точки та теплий старт")
+    if crossover_operator not in CROSSOVERS:
+        raise ValueError(f"Невідомий оператор схрещування: {crossover_operator}")
+    if selection not in SELECTIONS:
+        raise ValueError(f"Невідомий спосіб відбору: {selection}")
+    if decompose:
+        # Декомпозиція: незалежні частини задачі розв'язуються в окремих процесах
+        import decomposition
+        best_schedule = decomposition.solve(groups, subjects, lecturers, auditoriums, workers=workers, seed=seed,
+                                            stats=stats, observers=observers, generations=generations,
+                                            engine=engine, seed_strategy=seed_strategy,
+                                            constructive_share=constructive_share, time_limit=time_limit,
+                                            stagnation=stagnation, repair_probability=repair_probability,
+                                            crossover_operator=crossover_operator, selection=selection, elites=elites)
+    elif islands:
+        # Острівна модель: кожен острів еволюціонує в окремому процесі та обмінюється мігрантами
+        import islands as island_model
+        best_schedule = island_model.island_model(groups, subjects, lecturers, auditoriums, islands, generations,
+                                                  migration_interval=migration_interval, topology=topology, seed=seed,
+                                                  stats=stats, observers=observers, seed_strategy=seed_strategy,
+                                                  constructive_share=constructive_share,
+                                                  repair_probability=repair_probability,
+                                                  crossover_operator=crossover_operator, selection=selection,
+                                                  elites=elites)
+    elif engine == 'numpy':
+        # Векторизований рушій: уся популяція зберігається як цілочисельні масиви NumPy
+        import numpy_engine
+        best_schedule = numpy_engine.genetic_algorithm(groups, subjects, lecturers, auditoriums, generations,
+                                                       seed=seed, seed_strategy=seed_strategy,
+                                                       constructive_share=constructive_share, stats=stats,
+                                                       observers=observers, deadline=deadline,
+                                                       stagnation=stagnation)
+    elif engine == 'python':
+        best_schedule = _evolve(groups, subjects, lecturers, auditoriums, generations, backend, workers, seed,
+                                seed_strategy, constructive_share, stats, observers, checkpoint, checkpoint_interval,
+                                resume, warm_start, warm_share, deadline, stagnation, repair_probability,
+                                crossover_operator, selection, elites)
+    else:
+        raise ValueError(f"Невідомий рушій генетичного алгоритму: {engine}")
+
+    # Локальний пошук (імітація відпалу) навколо найкращого розкладу з бюджетом ітерацій та/або часу
+    # (з лімітом часу запуску — не довше, ніж залишилось)
+    if deadline is not None and (local_search_iterations or local_search_time):
+        remaining = deadline - time.perf_counter()
+        local_search_time = remaining if local_search_time is None else min(local_search_time, remaining)
+        if local_search_time <= 0:
+            local_search_iterations = local_search_time = None
+    if local_search_iterations or local_search_time:
+        import local_search
+        rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        before = best_schedule.attach(groups, lecturers, auditoriums).score()
+        clock = time.perf_counter()
+        best_schedule = local_search.simulated_annealing(best_schedule, groups, lecturers, auditoriums,
+                                                         local_search_iterations or None, local_search_time, rng=rng)
+        stats['phase_seconds']['local_search'] = time.perf_counter() - clock
+        telemetry.notify(observers, {'event': 'local_search', 'before': before, 'after': best_schedule.score(),
+                                     'seconds': round(stats['phase_seconds']['local_search'], 6)})
     return best_schedule
+
+
+# Оцінки, різноманітність та кількість втрачених подій популяції для запису телеметрії
+# (час підрахунку додається до timings як час оцінки)
+def _population_summary(population, expected_events, timings):
+    clock = time.perf_counter()
+    hard = [schedule.hard_constraints_violations for schedule in population]
+    soft = [schedule.soft_constraints_score for schedule in population]
+    diversity = telemetry.schedule_diversity(population)
+    dropped = sum(max(expected_events - len(schedule.events), 0) for schedule in population)
+    timings['evaluation'] = time.perf_counter() - clock
+    return hard, soft, diversity, dropped
+
+
+# Еволюція популяції розкладів у два етапи: спочатку жорсткі, потім м'які обмеження
+def _evolve(groups, subjects, lecturers, auditoriums, generations, backend, workers, seed, seed_strategy,
+            constructive_share, stats, observers, checkpoint=None, checkpoint_interval=10, resume=None,
+            warm_start=None, warm_share=0.2, deadline=None, stagnation=None, repair_probability=REPAIR_PROBABILITY,
+            crossover_operator='group', selection='tournament', elites=2):
+    import parallel  # Відкладений імпорт: модуль parallel сам імпортує цей модуль
+    import checkpoint as checkpoints  # Назву checkpoint має параметр з шляхом до файлу
+
+    population_size = 50
+    elites = min(elites, population_size - 1)  # Хоча б один нащадок у кожному поколінні
+    # Без явного seed генератор залежить від стану модуля random, тож random.seed() відтворює запуск
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+
+    expected_events = telemetry.expected_event_count(groups, subjects)
+    start = time.perf_counter()
+
+    fingerprint = checkpoints.problem_fingerprint(groups, subjects, lecturers, auditoriums) if checkpoint else None
+    start_phase, start_generation = 'hard', 0
+
+    with parallel.GenerationExecutor(groups, subjects, lecturers, auditoriums, backend, workers) as executor:
+        clock = time.perf_counter()
+        if resume:
+            # Продовження з контрольної точки: популяція, стан генератора та номер покоління
+            state = checkpoints.load_checkpoint(resume, groups, subjects, lecturers, auditoriums)
+            population = state['population']
+            rng.setstate(state['rng_state'])
+            start_phase, start_generation = state['phase'], state['generation']
+        else:
+            population = executor.initial_population(population_size, rng, seed_strategy, constructive_share)
+            if warm_start is not None:
+                # Теплий старт: попередній розклад, перенесений на поточні дані, та його мутовані копії
+                warm = checkpoints.warm_schedule(warm_start, groups, subjects, lecturers, auditoriums, rng)
+                n_warm = min(max(1, round(population_size * warm_share)), population_size)
+                population[0] = warm
+                for i in range(1, n_warm):
+                    population[i] = warm.copy()
+                    mutate(population[i], lecturers, auditoriums, rng=rng)
+        stats['phase_seconds']['initial_population'] = time.perf_counter() - clock
+        stats['evaluations'] = len(population)  # Оцінка кожного розкладу оновлюється під час його побудови
+        stats['feasible_generation'] = None
+        incumbent = None  # Найкращий за score() розклад з усіх поколінь (результат запуску)
+
+        # Етап 1: Жорсткі обмеження; Етап 2: Оптимізація м'яких обмежень без втрати досягнутого за жорсткими
+        # (розклади ранжуються спершу за жорсткими порушеннями, тож еліта не може їх збільшити)
+        for phase, key in (('hard', lambda sched: sched.hard_constraints_violations),
+                           ('soft', lambda sched: (sched.hard_constraints_violations, sched.soft_constraints_score))):
+            if phase == 'hard' and start_phase == 'soft':
+                continue  # Етап жорстких обмежень завершено до контрольної точки
+            clock = time.perf_counter()
+            first = start_generation if phase == start_phase else 0
+            monitor = Stagnation(stagnation) if stagnation else None
+            stats['stop_reason'] = 'generations'
+            last_generation = 0.0  # Тривалість попереднього покоління
+            for generation in (range(first, generations) if generations is not None else itertools.count(first)):
+                # Бюджет часу перевіряється між поколіннями: наступне покоління не починається, якщо за
+                # тривалістю попереднього воно не встигне завершитись (перше покоління виконується завжди)
+                generation_clock = time.perf_counter()
+                if incumbent is not None and deadline is not None and generation_clock + last_generation >= deadline:
+                    stats['stop_reason'] = 'time_limit'
+                    break
+                # Контрольна точка на початку покоління: продовження з неї повторює запуск без переривання
+                if (checkpoint and generation % checkpoint_interval == 0
+                        and (phase, generation) != (start_phase, start_generation)):
+                    checkpoints.save_checkpoint(checkpoint, population, phase, generation, rng, fingerprint)
+                stats['generations_' + phase] = generation + 1
+                timings = {}
+                if observers:
+                    summary = _population_summary(population, expected_events, timings)
+
+                # Ранжування популяції (копії однакових розкладів — після всіх різних); батьків обирає selection
+                selection_clock = time.perf_counter()
+                population = select_top_n(population, key, len(population), unique=True)
+                timings['selection'] = time.perf_counter() - selection_clock
+                best_schedule = population[0]
+                if incumbent is None or best_schedule.score() < incumbent.score():
+                    incumbent = best_schedule  # Батьків не змінюють: нащадки є копіями
+
+                # Перевірка, чи знайдено розклад без порушень жорстких (або м'яких) обмежень
+                done = best_schedule.hard_constraints_violations == 0 and (
+                    phase == 'hard' or best_schedule.soft_constraints_score == 0)
+                level = monitor.update(key(best_schedule)) if monitor else None
+                if level is not None:
+                    telemetry.notify(observers, {'event': 'stagnation', 'phase': phase, 'generation': generation + 1,
+                                                 'level': level})
+                stalled = monitor is not None and monitor.level >= STAGNATION_STOP
+                if not done and not stalled:
+                    # Схрещування відібраних пар батьків та мутація нащадків; elites найкращих розкладів
+                    # переходять у нове покоління без змін (нащадки є копіями, тож батьків не змінюють)
+                    probability, intensity = monitor.mutation() if monitor else STAGNATION_MUTATION[0]
+                    n_children = population_size - elites
+                    children = executor.breed(population, n_children, rng, probability, timings, intensity,
+                                              repair_probability, crossover_operator, selection)[:n_children]
+                    if level == 2:
+                        # Новий матеріал замість частини нащадків, коли посилена мутація вже не допомагає
+                        n_immigrants = min(max(1, round(population_size * IMMIGRANT_SHARE)), n_children)
+                        children[-n_immigrants:] = executor.initial_population(n_immigrants, rng)
+                    population = population[:elites] + children
+                    stats['evaluations'] += len(children)
+
+                if observers:
+                    telemetry.notify(observers, telemetry.generation_record(
+                        'python', phase, generation + 1, *summary, timings, time.perf_counter() - start))
+                last_generation = time.perf_counter() - generation_clock
+                if done:
+                    if phase == 'hard':
+                        stats['feasible_generation'] = generation + 1
+                    stats['stop_reason'] = 'solved'
+                    break
+                if stalled:
+                    stats['stop_reason'] = 'stagnation'
+                    break
+            if stats['stop_reason'] in ('time_limit', 'stagnation'):
+                telemetry.notify(observers, {'event': 'stop', 'phase': phase, 'reason': stats['stop_reason'],
+                                             'generation': stats.get('generations_' + phase, 0)})
+            stats['phase_seconds'][phase] = time.perf_counter() - clock
+            if stats['stop_reason'] == 'time_limit':
+                break  # Бюджет часу вичерпано: наступний етап не починається
+
+    # Без жодного покоління (generations=0 або продовження з контрольної точки останнього покоління)
+    # результатом є найкращий розклад поточної популяції
+    best_schedule = incumbent if incumbent is not None else min(population, key=lambda sched: sched.score())
+    # Розклад міг бути отриманий з іншого процесу, тож відновлюємо його лічильники
+    return best_schedule.attach(groups, lecturers, auditoriums)
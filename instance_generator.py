@@ -0,0 +1,197 @@
+import argparse  # Розбір параметрів командного рядка
+import csv
+import os
+import time
+
+import numpy as np
+
+from file_processor import PROBLEM_FILES
+from calendar_model import EVERY_WEEK, WEEK_TYPES
+from problem import EVENT_TYPES
+
+# Кількість груп, що генеруються та записуються за один крок (обмежує пам'ять на великих задачах)
+CHUNK_GROUPS = 4096
+
+# Розмір групи: нормальний розподіл, обмежений межами
+GROUP_SIZE_MEAN = 25
+GROUP_SIZE_STD = 4
+GROUP_SIZE_RANGE = (12, 35)
+
+# Типи аудиторій: (частка, найменша місткість, найбільша місткість) — кабінети для підгруп,
+# звичайні аудиторії та лекційні зали для потоків з кількох груп
+AUDITORIUM_MIX = [(0.35, 15, 20), (0.5, 30, 40), (0.15, 60, 150)]
+
+# Кількість пар дисципліни в кожному типі тижня
+LECTURES_RANGE = (1, 2)
+PRACTICALS_RANGE = (0, 2)
+
+# Тип тижня дисципліни: частки 'Both', 'EVEN' та 'ODD'
+WEEK_TYPE_SHARES = [0.7, 0.15, 0.15]
+
+# Частка дисциплін групи з підгрупами, практики яких ведуться окремо для кожної підгрупи
+SUBGROUP_SUBJECT_SHARE = 0.6
+
+# Розкид популярності викладачів (сигма логнормального розподілу): чим більший, тим більше дисциплін
+# у найпопулярніших викладачів
+LECTURER_SPREAD = 0.75
+
+# Тижневе навантаження викладача в годинах: нормальний розподіл, обмежений межами
+LECTURER_HOURS_MEAN = 18
+LECTURER_HOURS_STD = 4
+LECTURER_HOURS_RANGE = (8, 30)
+
+
+# Цілі з нормального розподілу, обмежені межами [low, high]
+def _clipped_normal(rng, mean, std, bounds, size):
+    return np.clip(np.rint(rng.normal(mean, std, size)), *bounds).astype(np.int64)
+
+
+# Ймовірності вибору викладачів: логнормальна популярність, тож частина викладачів веде в кілька разів
+# більше дисциплін, ніж у середньому, а частина — одну-дві
+def _lecturer_weights(rng, num_lecturers):
+    weights = rng.lognormal(0.0, LECTURER_SPREAD, num_lecturers)
+    return weights / weights.sum()
+
+
+# Вибір викладачів для дисциплін кафедр departments: з імовірністю cross_share — серед усіх викладачів,
+# інакше — серед викладачів тієї ж кафедри (кафедри — суцільні блоки номерів з межами bounds).
+# Вибір за популярністю через обернену функцію накопичених ваг cumulative
+def _pick_lecturers(rng, cumulative, bounds, departments, cross_share):
+    low = np.concatenate([[0.0], cumulative])[bounds[departments]]
+    high = cumulative[bounds[departments + 1] - 1]
+    cross = rng.random(len(departments)) < cross_share
+    low[cross], high[cross] = 0.0, cumulative[-1]
+    picks = np.searchsorted(cumulative, low + rng.random(len(departments)) * (high - low), side='right')
+    return np.minimum(picks, len(cumulative) - 1)
+
+
+# Генерація задачі з num_groups груп та потоковий запис у CSV-файли каталогу directory
+# (ті самі файли та стовпці, що читає file_processor.load_problem). Значення вибираються пакетами
+# NumPy по CHUNK_GROUPS груп, а рядки записуються одразу. Кожна дисципліна має основного викладача,
+# який веде і лекції, і практики, тож для кожного заняття є придатний викладач; решта викладачів
+# ведуть практики як асистенти. Групи та викладачі діляться на departments кафедр: дисципліни групи
+# ведуть викладачі її кафедри, крім частки cross_department_share міжкафедральних призначень.
+# Повертає кількість записаних груп, дисциплін, викладачів та аудиторій
+def generate_instance(directory, num_groups, subjects_per_group=5, subgroup_share=0.7, lecturers=None,
+                      subjects_per_lecturer=4, assistant_rate=0.3, auditoriums=None, departments=1,
+                      cross_department_share=0.05, seed=None):
+    rng = np.random.default_rng(seed)
+    num_lecturers = lecturers or max(1, round(num_groups * subjects_per_group / subjects_per_lecturer))
+    num_auditoriums = auditoriums or max(1, round(num_groups * 1.2))  # Аудиторій трохи більше, ніж груп
+    departments = max(1, min(departments, num_groups, num_lecturers))
+    cumulative = np.cumsum(_lecturer_weights(rng, num_lecturers))
+    lecturer_bounds = np.arange(departments + 1) * num_lecturers // departments
+    cross_share = cross_department_share if departments > 1 else 0.0
+    os.makedirs(directory, exist_ok=True)
+    groups_path, subjects_path, lecturers_path, auditoriums_path = (
+        os.path.join(directory, name) for name in PROBLEM_FILES)
+
+    # Пари (викладач, дисципліна): основні викладачі та асистенти
+    pair_lecturers, pair_subjects, subject_departments = [], [], []
+    num_subjects = 0
+    with open(groups_path, 'w', newline='', encoding='utf-8') as groups_file, \
+            open(subjects_path, 'w', newline='', encoding='utf-8') as subjects_file:
+        groups_writer = csv.writer(groups_file)
+        subjects_writer = csv.writer(subjects_file)
+        groups_writer.writerow(['groupNumber', 'studentAmount', 'subgroups'])
+        subjects_writer.writerow(['id', 'name', 'groupID', 'numLectures', 'numPracticals', 'requiresSubgroups',
+                                  'weekType'])
+        for start in range(0, num_groups, CHUNK_GROUPS):
+            count = min(CHUNK_GROUPS, num_groups - start)
+            group_numbers = np.arange(start + 1, start + count + 1)
+            sizes = _clipped_normal(rng, GROUP_SIZE_MEAN, GROUP_SIZE_STD, GROUP_SIZE_RANGE, count)
+            has_subgroups = rng.random(count) < subgroup_share
+            groups_writer.writerows(
+                (f"G{number}", size, '1;2' if split else '')
+                for number, size, split in zip(group_numbers.tolist(), sizes.tolist(), has_subgroups.tolist()))
+
+            # Дисципліни груп: щонайменше одна на групу
+            per_group = np.maximum(rng.poisson(subjects_per_group, count), 1)
+            subject_group = np.repeat(np.arange(count), per_group)
+            n = len(subject_group)
+            lectures = rng.integers(LECTURES_RANGE[0], LECTURES_RANGE[1] + 1, n)
+            practicals = rng.integers(PRACTICALS_RANGE[0], PRACTICALS_RANGE[1] + 1, n)
+            split = has_subgroups[subject_group] & (rng.random(n) < SUBGROUP_SUBJECT_SHARE) & (practicals > 0)
+            week_types = rng.choice(3, n, p=WEEK_TYPE_SHARES)
+            subject_numbers = np.arange(num_subjects + 1, num_subjects + n + 1)
+            week_names = [EVERY_WEEK] + WEEK_TYPES
+            subjects_writer.writerows(
+                (f"S{number}", f"Дисципліна {number}", f"G{group_numbers[group]}", lecture_count, practical_count,
+                 'Yes' if subgroups else 'No', week_names[week])
+                for number, group, lecture_count, practical_count, subgroups, week in zip(
+                    subject_numbers.tolist(), subject_group.tolist(), lectures.tolist(), practicals.tolist(),
+                    split.tolist(), week_types.tolist()))
+
+            # Основний викладач кожної дисципліни та асистенти (в середньому assistant_rate на дисципліну)
+            departments_chunk = (start + subject_group) * departments // num_groups
+            subject_departments.append(departments_chunk)
+            pair_lecturers.append(_pick_lecturers(rng, cumulative, lecturer_bounds, departments_chunk, cross_share))
+            pair_subjects.append(subject_numbers - 1)
+            assistants = rng.poisson(assistant_rate, n)
+            pair_lecturers.append(_pick_lecturers(rng, cumulative, lecturer_bounds,
+                                                  np.repeat(departments_chunk, assistants), cross_share))
+            pair_subjects.append(np.repeat(subject_numbers - 1, assistants))
+            num_subjects += n
+
+    # Основні викладачі ведуть обидва типи занять; викладачі без дисциплін стають асистентами
+    # випадкових дисциплін своєї кафедри, тож кожен викладач має щонайменше одну дисципліну
+    primary = np.zeros(num_lecturers, dtype=bool)
+    for k in range(0, len(pair_lecturers), 2):
+        primary[pair_lecturers[k]] = True
+    lecturer_ids = np.concatenate(pair_lecturers)
+    subject_ids = np.concatenate(pair_subjects)
+    idle = np.setdiff1d(np.arange(num_lecturers), lecturer_ids)
+    lecturer_ids = np.concatenate([lecturer_ids, idle])
+    idle_departments = np.searchsorted(lecturer_bounds, idle, side='right') - 1
+    subject_bounds = np.searchsorted(np.concatenate(subject_departments), np.arange(departments + 1))
+    subject_ids = np.concatenate([subject_ids, rng.integers(subject_bounds[idle_departments],
+                                                            subject_bounds[idle_departments + 1])])
+
+    # Дисципліни кожного викладача: пари, відсортовані за викладачем, без повторів
+    pairs = np.unique(lecturer_ids * num_subjects + subject_ids)
+    lecturer_ids, subject_ids = np.divmod(pairs, num_subjects)
+    bounds = np.searchsorted(lecturer_ids, np.arange(num_lecturers + 1))
+    subject_names = [f"S{number}" for number in range(1, num_subjects + 1)]
+    subject_ids = subject_ids.tolist()
+    hours = _clipped_normal(rng, LECTURER_HOURS_MEAN, LECTURER_HOURS_STD, LECTURER_HOURS_RANGE, num_lecturers)
+    all_types = ';'.join(EVENT_TYPES)
+    with open(lecturers_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['lecturerID', 'lecturerName', 'subjectsCanTeach', 'typesCanTeach', 'maxHoursPerWeek'])
+        writer.writerows(
+            (f"L{lecturer + 1}", f"Викладач {lecturer + 1}",
+             ';'.join(subject_names[s] for s in subject_ids[bounds[lecturer]:bounds[lecturer + 1]]),
+             all_types if is_primary else 'Практика', max_hours)
+            for lecturer, (is_primary, max_hours) in enumerate(zip(primary.tolist(), hours.tolist())))
+
+    # Аудиторії: суміш кабінетів, звичайних аудиторій та лекційних залів
+    shares, low, high = (np.array(column) for column in zip(*AUDITORIUM_MIX))
+    kinds = rng.choice(len(AUDITORIUM_MIX), num_auditoriums, p=shares / shares.sum())
+    capacities = rng.integers(low[kinds], high[kinds] + 1)
+    with open(auditoriums_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['auditoriumID', 'capacity'])
+        writer.writerows((f"A{number}", capacity) for number, capacity in enumerate(capacities.tolist(), 1))
+    return num_groups, num_subjects, num_lecturers, num_auditoriums
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерація синтетичної задачі розкладу у CSV-файли")
+    parser.add_argument('directory')  # Каталог для groups.csv, subjects.csv, lectures.csv та auditoriums.csv
+    parser.add_argument('--groups', type=int, default=100)  # Кількість груп
+    parser.add_argument('--subjects-per-group', type=float, default=5)  # Середня кількість дисциплін групи
+    parser.add_argument('--subgroup-share', type=float, default=0.7)  # Частка груп з поділом на підгрупи
+    parser.add_argument('--lecturers', type=int)  # Кількість викладачів (за замовчуванням — з subjects-per-lecturer)
+    parser.add_argument('--subjects-per-lecturer', type=float, default=4)  # Середня кількість дисциплін викладача
+    parser.add_argument('--assistant-rate', type=float, default=0.3)  # Середня кількість асистентів дисципліни
+    parser.add_argument('--auditoriums', type=int)  # Кількість аудиторій (за замовчуванням — 1.2 на групу)
+    parser.add_argument('--departments', type=int, default=1)  # Кількість кафедр
+    parser.add_argument('--cross-department-share', type=float, default=0.05)  # Частка міжкафедральних призначень
+    parser.add_argument('--seed', type=int)  # Seed для відтворюваної генерації
+    args = parser.parse_args()
+    clock = time.perf_counter()
+    counts = generate_instance(args.directory, args.groups, args.subjects_per_group, args.subgroup_share,
+                               args.lecturers, args.subjects_per_lecturer, args.assistant_rate, args.auditoriums,
+                               args.departments, args.cross_department_share, args.seed)
+    print("Груп: {}, дисциплін: {}, викладачів: {}, аудиторій: {}".format(*counts),
+          f"({time.perf_counter() - clock:.2f} с)")
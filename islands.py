@@ -0,0 +1,217 @@
+import multiprocessing
+import queue
+import random
+import time
+
+import telemetry
+from calendar_model import CALENDAR, use_calendar
+from constructive import constructive_population
+from genetic_algo import (generate_initial_population, select_top_n, predator_approach, rain, herbivore_smoothing,
+                          breed, REPAIR_PROBABILITY, SELECTIONS)
+from parallel import initial_constructive_count
+
+# Стратегії островів за замовчуванням (призначаються островам по колу):
+# 'predator' — батьками стає краща половина популяції після "хижака";
+# 'rain' — частка нащадків, замінена новими випадковими розкладами ("дощ");
+# 'herbivore' — частка нащадків, замінена "травоїдним" згладжуванням навколо найкращого розкладу острова
+ISLAND_STRATEGIES = [
+    {},
+    {'predator': True},
+    {'rain': 0.2},
+    {'herbivore': 0.2},
+]
+
+# Як часто (секунд) головний процес перевіряє, чи острови ще працюють, поки чекає на їх повідомлення
+POLL_INTERVAL = 1.0
+
+
+# Острови, яким острів index надсилає мігрантів
+def migration_targets(topology, index, n_islands):
+    if n_islands < 2:
+        return []
+    if topology == 'ring':
+        return [(index + 1) % n_islands]
+    if topology == 'complete':
+        return [i for i in range(n_islands) if i != index]
+    if topology == 'star':
+        # Острів 0 — центр: обмінюється з усіма, решта — лише з центром
+        return list(range(1, n_islands)) if index == 0 else [0]
+    raise ValueError(f"Невідома топологія міграції: {topology}")
+
+
+# Оцінка для сортування всередині острова: жорсткі обмеження важать більше за м'які
+def _island_score(schedule, *problem_data):
+    return schedule.score()
+
+
+# Запис телеметрії покоління острова (оцінки, різноманітність та втрачені події популяції перед відбором)
+def _generation_record(index, generation, population, expected_events, timings, elapsed):
+    clock = time.perf_counter()
+    hard = [schedule.hard_constraints_violations for schedule in population]
+    soft = [schedule.soft_constraints_score for schedule in population]
+    diversity = telemetry.schedule_diversity(population)
+    dropped = sum(max(expected_events - len(schedule.events), 0) for schedule in population)
+    timings['evaluation'] = time.perf_counter() - clock
+    record = telemetry.generation_record('islands', 'score', generation, hard, soft, diversity, dropped, timings,
+                                         elapsed)
+    record['island'] = index
+    return record
+
+
+# Еволюція одного острова в окремому процесі (з календарем головного процесу). Якщо settings['telemetry'],
+# запис кожного покоління надсилається в results як ('generation', запис); результат острова —
+# ('result', index, найкращий розклад, кількість оцінок)
+def _run_island(index, problem, strategy, settings, seed, inbox, outboxes, results, calendar):
+    use_calendar(calendar)
+    groups, subjects, lecturers, auditoriums = problem
+    population_size = settings['population_size']
+    elites = min(settings['elites'], population_size - 1)  # Хоча б один нащадок у кожному поколінні
+    rng = random.Random(seed)
+    expected_events = telemetry.expected_event_count(groups, subjects)
+    start = time.perf_counter()
+
+    n_constructive = initial_constructive_count(population_size, settings['seed_strategy'],
+                                                settings['constructive_share'])
+    population = (constructive_population(n_constructive, groups, subjects, lecturers, auditoriums, rng)
+                  + generate_initial_population(population_size - n_constructive, groups, subjects, lecturers,
+                                                auditoriums, rng))
+    best_schedule = min(population, key=_island_score).copy()
+    evaluations = len(population)
+    n_sources = sum(1 for i in range(settings['n_islands'])
+                    if index in migration_targets(settings['topology'], i, settings['n_islands']))
+
+    for generation in range(settings['generations']):
+        timings = {}
+        if settings['telemetry']:
+            record = _generation_record(index, generation + 1, population, expected_events, timings,
+                                        time.perf_counter() - start)
+        # Острів з ідеальним розкладом лише бере участь в обміні мігрантами
+        if best_schedule.score() > 0:
+            selection_clock = time.perf_counter()
+            # Батьки упорядковані від найкращого; пари батьків обирає settings['selection']
+            if strategy.get('predator'):
+                parents = predator_approach(population, groups, lecturers, auditoriums, _island_score)
+            else:
+                parents = select_top_n(population, _island_score, len(population), unique=True)
+            timings['selection'] = time.perf_counter() - selection_clock
+            if _island_score(parents[0]) < _island_score(best_schedule):
+                best_schedule = parents[0].copy()
+
+            # elites найкращих батьків переходять у нове покоління без змін (нащадки є копіями)
+            n_children = population_size - elites
+            pairs = SELECTIONS[settings['selection']](len(parents), (n_children + 1) // 2, rng)
+            children = breed(parents, pairs, lecturers, auditoriums, rng, timings=timings,
+                             repair_probability=settings['repair_probability'],
+                             crossover_operator=settings['crossover_operator'])[:n_children]
+            population = parents[:elites] + children
+            evaluations += len(children)
+
+            # "Дощ" та "травоїдне" згладжування замінюють лише нащадків, а не еліту
+            n_rain = min(int(population_size * strategy.get('rain', 0)), n_children)
+            if n_rain:
+                population[-n_rain:] = rain(n_rain, groups, subjects, lecturers, auditoriums, rng)
+                evaluations += n_rain
+            n_herbivore = min(int(population_size * strategy.get('herbivore', 0)), n_children)
+            if n_herbivore:
+                population[elites:elites + n_herbivore] = herbivore_smoothing(
+                    population[elites:elites + n_herbivore], best_schedule, lecturers, auditoriums, rng)
+                evaluations += n_herbivore
+
+        # Міграція: кращі розклади надсилаються сусідам і замінюють найгірші розклади острова
+        if (generation + 1) % settings['migration_interval'] == 0 and n_sources + len(outboxes):
+            population.sort(key=_island_score)
+            migrants = [best_schedule] + population[:settings['migrants'] - 1]
+            for outbox in outboxes:
+                outbox.put((index, migrants))
+            received = sorted((inbox.get() for _ in range(n_sources)), key=lambda message: message[0])
+            arrivals = [schedule.attach(groups, lecturers, auditoriums)
+                        for _, schedules in received for schedule in schedules]
+            if arrivals:
+                population[-len(arrivals):] = arrivals
+                best_arrival = min(arrivals, key=_island_score)
+                if _island_score(best_arrival) < _island_score(best_schedule):
+                    best_schedule = best_arrival.copy()
+
+        if settings['telemetry']:
+            # Час етапів стає відомим лише після покоління, тож запис надсилається в кінці
+            record['seconds'] = {step: round(timings.get(step, 0.0), 6) for step in telemetry.GENERATION_STEPS}
+            results.put(('generation', record))
+
+    results.put(('result', index, best_schedule, evaluations))
+
+
+# Острівна модель: кілька популяцій еволюціонують у різних процесах і кожні migration_interval поколінь
+# обмінюються найкращими розкладами згідно з топологією ('ring', 'complete' або 'star').
+# seed_strategy, constructive_share, repair_probability, crossover_operator, selection та elites
+# мають те саме значення, що й у genetic_algorithm, і діють на кожному острові
+def island_model(groups, subjects, lecturers, auditoriums, n_islands=4, generations=100, population_size=50,
+                 migration_interval=10, migrants=2, topology='ring', strategies=None, seed=None, stats=None,
+                 observers=None, seed_strategy='random', constructive_share=0.5,
+                 repair_probability=REPAIR_PROBABILITY, crossover_operator='group', selection='tournament', elites=2):
+    strategies = strategies or ISLAND_STRATEGIES
+    observers = [telemetry.ConsoleSink()] if observers is None else observers
+    initial_constructive_count(population_size, seed_strategy, constructive_share)  # Перевірка стратегії
+    settings = {
+        'n_islands': n_islands, 'generations': generations, 'population_size': population_size,
+        'migration_interval': migration_interval, 'migrants': max(1, migrants), 'topology': topology,
+        'telemetry': bool(observers), 'seed_strategy': seed_strategy, 'constructive_share': constructive_share,
+        'repair_probability': repair_probability, 'crossover_operator': crossover_operator,
+        'selection': selection, 'elites': elites,
+    }
+    for i in range(n_islands):
+        migration_targets(topology, i, n_islands)  # Перевіряємо топологію до запуску процесів
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+    problem = (groups, subjects, lecturers, auditoriums)
+    clock = time.perf_counter()
+
+    inboxes = [multiprocessing.Queue() for _ in range(n_islands)]
+    results = multiprocessing.Queue()
+    processes = []
+    best_by_island, evaluations = {}, 0
+    # Процеси островів зупиняються за будь-якої помилки: падіння острова, виняток спостерігача
+    # (зокрема скасування завдання сервером) або переривання
+    try:
+        for i in range(n_islands):
+            outboxes = [inboxes[j] for j in migration_targets(topology, i, n_islands)]
+            process = multiprocessing.Process(target=_run_island, args=(
+                i, problem, strategies[i % len(strategies)], settings, rng.getrandbits(64), inboxes[i], outboxes,
+                results, CALENDAR
+            ))
+            process.start()
+            processes.append(process)
+
+        # Записи поколінь островів передаються спостерігачам у порядку надходження
+        while len(best_by_island) < n_islands:
+            # Острів, що завершився ще до очікування, вже передав усі свої повідомлення, тож якщо черга
+            # порожня, а результату від нього немає, — острів упав
+            exited = [i for i, process in enumerate(processes) if process.exitcode is not None]
+            try:
+                message = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                for i in exited:
+                    if i not in best_by_island:
+                        raise RuntimeError(f"Острів {i} завершився (код {processes[i].exitcode}) "
+                                           f"без найкращого розкладу")
+                continue
+            if message[0] == 'generation':
+                telemetry.notify(observers, message[1])
+                continue
+            _, index, best, island_evaluations = message
+            best_by_island[index] = best
+            evaluations += island_evaluations
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+    if stats is not None:
+        stats.setdefault('phase_seconds', {})['islands'] = time.perf_counter() - clock
+        stats['evaluations'] = evaluations
+
+    for i in range(n_islands):
+        best = best_by_island[i].attach(groups, lecturers, auditoriums)
+        telemetry.notify(observers, {'event': 'island', 'island': i, 'strategy': strategies[i % len(strategies)],
+                                     'hard': best.hard_constraints_violations, 'soft': best.soft_constraints_score})
+    return min(best_by_island.values(), key=_island_score)
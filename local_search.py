@@ -0,0 +1,125 @@
+import math
+import random
+import time
+
+from calendar_model import CALENDAR
+from genetic_algo import GenerationIndex, random_bit, sample_free, group_size
+
+# Види ходів локального пошуку
+MOVES = ('timeslot', 'auditorium', 'lecturer')
+
+# Частка ходів зміни викладача, у яких кандидатами є всі викладачі, а не лише придатні
+ANY_LECTURER_SHARE = 0.1
+
+
+# Новий слот події: випадковий доступний слот її тижня, де вільні викладач, групи та підгрупи
+# (якщо такого немає — будь-який інший доступний слот цього тижня)
+def _relocate(schedule, event, rng):
+    slot = event.slot
+    mask = CALENDAR.week_masks[CALENDAR.weeks[CALENDAR.slot_week[slot]]] & ~(1 << slot)
+    free = mask & schedule.occupancy.free_mask(event.lecturer_id, event.group_ids, event.subgroup_ids)
+    if free or mask:
+        return random_bit(free or mask, rng)
+    return None
+
+
+# Нова аудиторія події: достатньої місткості та, за можливості, вільна в її слоті
+def _reassign_auditorium(schedule, event, index, rng):
+    candidates = index.suitable_auditoriums(group_size(schedule.groups, event.group_ids, event.subgroup_ids))
+    candidates = [aid for aid in candidates or index.auditorium_ids if aid != event.auditorium_id]
+    if not candidates:
+        return None
+    bit = 1 << event.slot
+    auditorium = sample_free(candidates, lambda aid: not schedule.occupancy.auditoriums.mask(aid) & bit, rng)
+    return rng.choice(candidates) if auditorium is None else auditorium
+
+
+# Новий викладач події: з тих, хто може вести дисципліну та тип заняття, за можливості вільний у її слоті.
+# Кваліфікація — лише м'яке обмеження, тож зрідка (або якщо придатних немає) кандидатами є всі викладачі:
+# так подію можна забрати в перевантажених придатних викладачів
+def _reassign_lecturer(schedule, event, index, rng):
+    candidates = index.eligible_lecturers.get((event.subject_id, event.event_type), ())
+    if not candidates or rng.random() < ANY_LECTURER_SHARE:
+        candidates = tuple(schedule.lecturers)
+    candidates = [lid for lid in candidates if lid != event.lecturer_id]
+    if not candidates:
+        return None
+    bit = 1 << event.slot
+    lecturer = sample_free(candidates, lambda lid: not schedule.occupancy.lecturers.mask(lid) & bit, rng)
+    return rng.choice(candidates) if lecturer is None else lecturer
+
+
+# Імітація відпалу навколо розкладу schedule з бюджетом iterations ходів та/або time_limit секунд.
+# Кожен хід (перенесення події у вільний слот, зміна аудиторії або викладача) оцінюється інкрементально
+# через move_event, а відхилений хід скасовується зворотним move_event — повний fitness не викликається.
+# Температура спадає геометрично від initial_temperature до final_temperature за весь бюджет,
+# тому погіршення жорстких обмежень (1000 за порушення) приймаються лише на самому початку, якщо взагалі.
+# Ходи можна зосередити на подіях з позиціями focus (частка focus_share ходів), а penalty(i, event) додає
+# до оцінки штраф за поточні гени події на позиції i (наприклад, за відхід від попереднього розкладу).
+# Повертає найкращий знайдений розклад (вихідний розклад не змінюється)
+def simulated_annealing(schedule, groups, lecturers, auditoriums, iterations=20000, time_limit=None, rng=random,
+                        initial_temperature=2.0, final_temperature=0.05, index=None, focus=None, focus_share=0.8,
+                        penalty=None):
+    if iterations is None and time_limit is None:
+        raise ValueError("Локальному пошуку потрібен бюджет ітерацій або часу")
+    index = index or GenerationIndex(lecturers, auditoriums)
+    current = schedule.copy().attach(groups, lecturers, auditoriums)
+    current_score = current.score()
+    if penalty is not None:
+        current_score += sum(penalty(i, event) for i, event in enumerate(current.events))
+    best, best_score = current, current_score  # best є current, доки не прийнято погіршення
+    if not current.events:
+        return best
+
+    start = time.perf_counter()
+    cooling = math.log(final_temperature / initial_temperature)
+    temperature = initial_temperature
+    iteration = 0
+    while best_score > 0 and (iterations is None or iteration < iterations):
+        # Температуру та залишок часу перераховуємо не на кожному ході
+        if iteration % 256 == 0:
+            progress = iteration / iterations if iterations else 0.0
+            if time_limit is not None:
+                elapsed = time.perf_counter() - start
+                if elapsed >= time_limit:
+                    break
+                progress = max(progress, elapsed / time_limit)
+            temperature = initial_temperature * math.exp(cooling * progress)
+        iteration += 1
+
+        if focus and rng.random() < focus_share:
+            i = rng.choice(focus)
+        else:
+            i = rng.randrange(len(current.events))
+        event = current.events[i]
+        move = rng.choice(MOVES)
+        if move == 'timeslot':
+            old, new = event.slot, _relocate(current, event, rng)
+            change = {'slot': new}
+        elif move == 'auditorium':
+            old, new = event.auditorium_id, _reassign_auditorium(current, event, index, rng)
+            change = {'auditorium_id': new}
+        else:
+            old, new = event.lecturer_id, _reassign_lecturer(current, event, index, rng)
+            change = {'lecturer_id': new}
+        if new is None:
+            continue
+
+        before = current.score() + (penalty(i, event) if penalty is not None else 0)
+        current.move_event(event, **change)
+        delta = current.score() - before
+        if penalty is not None:
+            delta += penalty(i, event)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            if best is current and delta > 0:
+                # Погіршення з найкращого стану: зберігаємо найкращий розклад до ходу
+                current.move_event(event, **{key: old for key in change})
+                best = current.copy()
+                current.move_event(event, **change)
+            current_score += delta
+            if current_score < best_score:
+                best, best_score = current, current_score
+        else:
+            current.move_event(event, **{key: old for key in change})  # Скасовуємо хід
+
+    return best
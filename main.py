@@ -1,109 +1,169 @@
-import sys  # Імпортуємо модуль sys для роботи з параметрами командного рядка та стандартним виводом
+import argparse  # Імпортуємо модуль argparse для розбору параметрів командного рядка
+import contextlib  # Імпортуємо модуль contextlib для закриття файлів телеметрії та профілювання
+import random  # Імпортуємо модуль random для генератора перепланування
+import sys  # Імпортуємо модуль sys для роботи зі стандартним виводом
 
+import checkpoint  # Імпортуємо модуль контрольних точок та збереження розкладів
+import exporter  # Імпортуємо модуль експорту розкладу в різні формати
 import file_processor  # Імпортуємо модуль для обробки файлів з даними
 import randomizer  # Імпортуємо модуль для генерації випадкових даних (ймовірно, для тестування)
+import rescheduling  # Імпортуємо модуль інкрементального перепланування
+import telemetry  # Імпортуємо модуль телеметрії поколінь та профілювання
 
-from genetic_algo import genetic_algorithm, TIMESLOTS  # Імпортуємо генетичний алгоритм та часові слоти з модуля genetic_algo
-
-
-# Функція для виведення розкладу з додатковою інформацією
-def print_schedule(schedule, lecturers, groups, auditoriums):
-    schedule_dict = {}  # Створюємо словник для зберігання подій за часовими слотами
-    for event in schedule.events:
-        if event.timeslot not in schedule_dict:
-            schedule_dict[event.timeslot] = []  # Ініціалізуємо список подій для нового часовго слота
-        schedule_dict[event.timeslot].append(event)  # Додаємо подію до відповідного часовго слота
-
-    # Словник для підрахунку годин викладачів
-    lecturer_hours = {lecturer_id: 0 for lecturer_id in lecturers}
-
-    # Виведення заголовків колонок
-    print(f"{'Timeslot':<25} {'Group(s)':<30} {'Subject':<30} {'Type':<15} "
-          f"{'Lecturer':<25} {'Auditorium':<10} {'Students':<10} {'Capacity':<10}")
-    print("-" * 167)
-
-    for timeslot in TIMESLOTS:
-        if timeslot in schedule_dict:
-            for event in schedule_dict[timeslot]:
-                # Формуємо інформацію про групи, включаючи підгрупи, якщо вони є
-                group_info = ', '.join([
-                    f"{gid}" + (
-                        f" (Subgroup {event.subgroup_ids[gid]})" if event.subgroup_ids and gid in event.subgroup_ids else ''
-                    )
-                    for gid in event.group_ids
-                ])
-                # Обчислюємо кількість студентів у події
-                total_students = sum(
-                    groups[gid]['NumStudents'] // 2 if event.subgroup_ids and gid in event.subgroup_ids else
-                    groups[gid]['NumStudents']
-                    for gid in event.group_ids
-                )
-                # Отримуємо місткість аудиторії
-                auditorium_capacity = auditoriums[event.auditorium_id]
-
-                # Виводимо інформацію по колонках
-                print(f"{timeslot:<25} {group_info:<30} {event.subject_name:<30} {event.event_type:<15} "
-                      f"{lecturers[event.lecturer_id]['LecturerName']:<25} {event.auditorium_id:<10} "
-                      f"{total_students:<10} {auditorium_capacity:<10}")
-
-                # Додаємо 1.5 години до загальної кількості годин викладача
-                lecturer_hours[event.lecturer_id] += 1.5
-        else:
-            # Якщо у цьому часовому слоті немає подій, виводимо "EMPTY" у першій колонці
-            print(f"{timeslot:<25} {'EMPTY':<120}")
-        print()  # Додаємо порожній рядок для відділення часових слотів
-
-    # Виводимо кількість годин викладачів на тиждень
-    print("\nКількість годин лекторів на тиждень:")
-    print(f"{'Lecturer':<25} {'Total Hours':<10}")
-    print("-" * 35)
-    for lecturer_id, hours in lecturer_hours.items():
-        lecturer_name = lecturers[lecturer_id]['LecturerName']
-        print(f"{lecturer_name:<25} {hours:<10} годин")
-
-
-# Клас для дублювання стандартного виводу (stdout) у консоль та файл
-class Tee(object):
-    def __init__(self, *files):
-        self.files = files  # Зберігаємо файли, куди будемо записувати вивід
-
-    def write(self, obj):
-        for f in self.files:
-            f.write(obj)  # Записуємо об'єкт (текст) у всі файли
-
-    def flush(self):
-        for f in self.files:
-            f.flush()  # Очищуємо буфери всіх файлів
-
-
-def main():
-    # Завантажуємо дані з CSV-файлів
-    groups = file_processor.load_groups('datasource/groups.csv')  # Завантажуємо інформацію про групи
-    subjects = file_processor.load_subjects('datasource/subjects.csv')  # Завантажуємо інформацію про предмети
-    lecturers = file_processor.load_lecturers('datasource/lectures.csv')  # Завантажуємо інформацію про викладачів
-    auditoriums = file_processor.load_auditoriums('datasource/auditoriums.csv')  # Завантажуємо інформацію про аудиторії
+from genetic_algo import genetic_algorithm, REPAIR_PROBABILITY, CROSSOVERS, SELECTIONS  # Імпортуємо генетичний алгоритм з модуля genetic_algo
 
-    # Запускаємо генетичний алгоритм для отримання найкращого розкладу
-    best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums)
 
-    # Виводимо розклад у консоль та записуємо його у файл по заданій назві
-    with open('schedule_output.txt', 'w', encoding='utf-8') as f:
-        original_stdout = sys.stdout  # Зберігаємо оригінальний stdout
-        sys.stdout = Tee(sys.stdout, f)  # Перенаправляємо stdout на наш клас Tee, щоб дублювати вивід
-        try:
-            print("\nBest schedule:\n")
-            print_schedule(best_schedule, lecturers, groups, auditoriums)  # Виводимо розклад
-        finally:
-            sys.stdout = original_stdout  # Відновлюємо оригінальний stdout
+# Каталог вхідних даних за замовчуванням
+DATA_DIR = 'datasource'
 
+# Каталог кешу скомпільованих вхідних даних
+PROBLEM_CACHE_DIR = '.problem_cache'
 
-# Виконуємо основну функцію при запуску скрипта
-if __name__ == "__main__":
-    method = sys.argv[1]  # Зчитуємо параметр з командного рядка
 
-    if method == 'FILE':
-        main()  # Якщо параметр 'FILE', виконуємо основну функцію
-    elif method == 'RANDOM':
-        randomizer.main()  # Якщо параметр 'RANDOM', запускаємо функцію з модуля randomizer
+# Функція для завантаження вхідних даних з CSV-файлів каталогу data_dir
+# (перевірених і, якщо задано cache_dir, кешованих)
+def load_problem(cache_dir=PROBLEM_CACHE_DIR, data_dir=DATA_DIR):
+    problem = file_processor.load_problem(data_dir, cache_dir)
+    return problem.groups, problem.subjects, problem.lecturers, problem.auditoriums
+
+
+def main(incremental=None, views=('text',), export_dir='.', problem_cache=PROBLEM_CACHE_DIR, data_dir=DATA_DIR,
+         console=sys.stdout, **ga_options):
+    # Завантажуємо дані з CSV-файлів
+    groups, subjects, lecturers, auditoriums = load_problem(problem_cache, data_dir)
+
+    if incremental:
+        # Інкрементальне перепланування: ремонтуємо лише події, яких стосуються зміни даних
+        best_schedule = reschedule_previous(incremental, groups, subjects, lecturers, auditoriums, **ga_options)
     else:
-        print("Invalid parameter!!!")  # Якщо параметр невідомий, виводимо повідомлення про помилку
+        # Запускаємо генетичний алгоритм для отримання найкращого розкладу
+        best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums, **ga_options)
+
+    # Виводимо розклад у консоль (якщо console) та записуємо вибрані подання у файли
+    exporter.export(best_schedule, groups, lecturers, auditoriums, views, export_dir, console=console)
+    return best_schedule
+
+
+# Тривалість з командного рядка: секунди або число з суфіксом s, m чи h (наприклад, 30s або 2m)
+def parse_duration(value):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    try:
+        if value[-1:] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Некоректна тривалість: {value}") from None
+
+
+# Функція для інкрементального перепланування розкладу, збереженого разом з вхідними даними (--save-best)
+def reschedule_previous(path, groups, subjects, lecturers, auditoriums, **ga_options):
+    previous_data = checkpoint.load_problem_data(path)
+    if previous_data is None:
+        raise ValueError(f"У файлі {path} немає вхідних даних попереднього розкладу")
+    seed = ga_options.get('seed')
+    best_schedule, report = rescheduling.reschedule(
+        checkpoint.load_schedule(path), previous_data, groups, subjects, lecturers, auditoriums,
+        ga_options.get('local_search_iterations') or 20000, ga_options.get('local_search_time'),
+        rng=random.Random(random.getrandbits(64) if seed is None else seed))
+
+    # Виводимо, що змінилося у вхідних даних і скільки подій довелося змінити
+    for kind, changes in report['diff'].items():
+        for change, ids in changes.items():
+            if ids:
+                print(f"{kind}: {change} {', '.join(ids)}")
+    print(f"Подій для ремонту: {report['affected']} з {report['events']}, "
+          f"змінено незачеплених подій: {report['moved_untouched']}, "
+          f"оцінка: {report['score_before_repair']} -> {report['score']}")
+    return best_schedule
+
+
+# Виконуємо основну функцію при запуску скрипта
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('method')  # Джерело даних: 'FILE' або 'RANDOM'
+    parser.add_argument('engine', nargs='?', default='python', choices=['python', 'numpy'])  # Рушій алгоритму
+    parser.add_argument('--backend', default='serial', choices=['serial', 'thread', 'process'])  # Виконання поколінь
+    parser.add_argument('--workers', type=int)  # Кількість потоків/процесів (за замовчуванням — кількість ядер)
+    parser.add_argument('--seed', type=int)  # Seed для відтворюваного запуску
+    parser.add_argument('--islands', type=int, default=0)  # Кількість островів (0 — звичайний алгоритм)
+    parser.add_argument('--migration-interval', type=int, default=10)  # Частота міграції між островами
+    parser.add_argument('--topology', default='ring', choices=['ring', 'complete', 'star'])  # Топологія міграції
+    parser.add_argument('--seed-strategy', default='random',
+                        choices=['random', 'constructive', 'mixed'])  # Спосіб побудови початкової популяції
+    parser.add_argument('--constructive-share', type=float, default=0.5)  # Частка конструктивних розкладів ('mixed')
+    parser.add_argument('--local-search-iterations', type=int, default=0)  # Ходи імітації відпалу після алгоритму
+    parser.add_argument('--local-search-time', type=float)  # Ліміт часу імітації відпалу в секундах
+    parser.add_argument('--quiet', action='store_true')  # Не виводити перебіг поколінь і таблицю розкладу в консоль
+    parser.add_argument('--telemetry')  # Файл телеметрії поколінь (.jsonl або .csv)
+    parser.add_argument('--profile', nargs='?', const='')  # cProfile: файл статистики або топ-функції в консоль
+    parser.add_argument('--trace-memory', action='store_true')  # tracemalloc: пікова пам'ять і найбільші виділення
+    parser.add_argument('--checkpoint')  # Файл контрольної точки, що періодично перезаписується
+    parser.add_argument('--checkpoint-interval', type=int, default=10)  # Поколінь між контрольними точками
+    parser.add_argument('--resume')  # Продовжити запуск з контрольної точки
+    parser.add_argument('--warm-start')  # Почати з раніше збереженого найкращого розкладу
+    parser.add_argument('--save-best')  # Зберегти найкращий розклад для теплого старту
+    parser.add_argument('--incremental')  # Перепланувати розклад, збережений через --save-best, під змінені дані
+    parser.add_argument('--time-limit', type=parse_duration)  # Бюджет часу запуску (anytime, без ліміту поколінь)
+    parser.add_argument('--stagnation', type=int)  # Поколінь без покращення до посилення мутації та зупинки
+    parser.add_argument('--decompose', action='store_true')  # Розв'язувати незалежні частини задачі паралельно
+    parser.add_argument('--repair-probability', type=float,
+                        default=REPAIR_PROBABILITY)  # Ймовірність ремонту порушень кожного нащадка
+    parser.add_argument('--crossover', dest='crossover_operator', default='group',
+                        choices=list(CROSSOVERS))  # Оператор схрещування (блоки занять, що успадковуються разом)
+    parser.add_argument('--selection', default='tournament', choices=list(SELECTIONS))  # Відбір пар батьків
+    parser.add_argument('--elites', type=int, default=2)  # Найкращі розклади, що переходять у покоління без змін
+    parser.add_argument('--export', nargs='+', choices=list(exporter.VIEWS))  # Подання розкладу для запису у файли
+    parser.add_argument('--export-dir', default='.')  # Каталог файлів експорту
+    parser.add_argument('--no-problem-cache', dest='problem_cache', action='store_const', const=None,
+                        default=PROBLEM_CACHE_DIR)  # Не використовувати кеш скомпільованих вхідних даних
+    parser.add_argument('--data-dir', default=DATA_DIR)  # Каталог CSV-файлів задачі (наприклад, з instance_generator)
+    args = parser.parse_args()  # Зчитуємо параметри з командного рядка
+    ga_options = {'engine': args.engine, 'backend': args.backend, 'workers': args.workers, 'seed': args.seed,
+                  'islands': args.islands, 'migration_interval': args.migration_interval, 'topology': args.topology,
+                  'seed_strategy': args.seed_strategy, 'constructive_share': args.constructive_share,
+                  'local_search_iterations': args.local_search_iterations, 'local_search_time': args.local_search_time,
+                  'repair_probability': args.repair_probability, 'decompose': args.decompose,
+                  'crossover_operator': args.crossover_operator, 'selection': args.selection, 'elites': args.elites}
+    if args.time_limit is not None:
+        # Режим anytime: покоління тривають до вичерпання бюджету, застою або ідеального розкладу
+        ga_options.update(generations=None, time_limit=args.time_limit)
+    if args.stagnation:
+        ga_options['stagnation'] = args.stagnation
+
+    # Спостерігачі поколінь: консоль (якщо не --quiet) та файл телеметрії
+    observers = [] if args.quiet else [telemetry.ConsoleSink()]
+    if args.telemetry:
+        observers.append(telemetry.file_sink(args.telemetry))
+    ga_options['observers'] = observers
+    ga_options.update(checkpoint=args.checkpoint, checkpoint_interval=args.checkpoint_interval, resume=args.resume)
+    if args.warm_start:
+        ga_options['warm_start'] = checkpoint.load_schedule(args.warm_start)
+    if args.incremental and args.method != 'FILE':
+        parser.error("--incremental працює лише з даними з файлів (FILE)")
+
+    method = args.method
+    # За замовчуванням дані з файлів дають загальну таблицю (schedule_output.txt), а випадкові — лише вивід у консоль
+    views = args.export if args.export is not None else (['text'] if method == 'FILE' else [])
+    # Загальна таблиця виводиться в консоль, лише якщо вона серед подань (або файлів експорту немає взагалі)
+    console = None if args.quiet or (views and 'text' not in views) else sys.stdout
+    try:
+        with contextlib.ExitStack() as stack:
+            for observer in observers:
+                stack.callback(observer.close)
+            if args.profile is not None or args.trace_memory:
+                stack.enter_context(telemetry.profiling(args.profile or None, args.trace_memory))
+            best_schedule = None
+            if method == 'FILE':
+                best_schedule = main(args.incremental, views, args.export_dir, args.problem_cache, args.data_dir,
+                                     console, **ga_options)  # Якщо параметр 'FILE', виконуємо основну функцію
+            elif method == 'RANDOM':
+                # Якщо параметр 'RANDOM', запускаємо функцію з модуля randomizer
+                best_schedule = randomizer.main(views, args.export_dir, console, **ga_options)
+            else:
+                print("Invalid parameter!!!")  # Якщо параметр невідомий, виводимо повідомлення про помилку
+            if best_schedule is not None and args.save_best:
+                # Зберігаємо розклад для теплого старту (дані з файлів — для подальшого перепланування)
+                problem_data = load_problem(args.problem_cache, args.data_dir) if method == 'FILE' else None
+                checkpoint.save_schedule(args.save_best, best_schedule, problem_data)
+    except file_processor.ProblemDataError as error:
+        parser.exit(1, f"{error}\n")  # Некоректні вхідні дані: повідомляємо про всі проблеми одразу
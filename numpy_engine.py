@@ -0,0 +1,379 @@
+import bisect
+import itertools
+import random
+import time
+
+import numpy as np
+
+from constructive import construct_genes
+from genetic_algo import (FitnessCache, Stagnation, STAGNATION_MUTATION, STAGNATION_STOP, IMMIGRANT_SHARE,
+                          GAP_WEIGHT)
+from parallel import initial_constructive_count
+from problem import compile_problem
+import telemetry
+
+# Seed генератора ключів Зобріста: відбитки розкладів однакові в усіх запусках
+FINGERPRINT_SEED = 0x5EED
+
+
+# Масиви NumPy зі скомпільованої задачі, які потрібні для пакетної оцінки та генерації популяції
+class ProblemArrays:
+    def __init__(self, problem):
+        self.problem = problem
+        lessons = problem.lessons
+
+        self.n_slots = len(problem.slot_week)
+        self.n_weeks = len(problem.week_slots)
+        self.n_lecturers = len(problem.lecturer_ids)
+        self.n_auditoriums = len(problem.auditorium_ids)
+        self.n_groups = len(problem.group_ids)
+        self.n_subgroups = len(problem.subgroup_keys)
+
+        # Поля занять (по одному значенню на стовпець популяції)
+        self.lesson_week = np.array([lesson.week for lesson in lessons], dtype=np.int64)
+        self.lesson_group = np.array([lesson.group for lesson in lessons], dtype=np.int64)
+        self.lesson_subgroup = np.array([lesson.subgroup for lesson in lessons], dtype=np.int64)
+        self.lesson_subject = np.array([lesson.subject for lesson in lessons], dtype=np.int64)
+        self.lesson_type = np.array([lesson.event_type for lesson in lessons], dtype=np.int64)
+        self.lesson_size = np.array([lesson.size for lesson in lessons], dtype=np.int64)
+        self.subgroup_columns = np.flatnonzero(self.lesson_subgroup >= 0)
+        self.lecture_columns = np.flatnonzero(self.lesson_type == 0)
+        self.group_lesson_columns = np.flatnonzero(self.lesson_subgroup < 0)
+        # Група кожної підгрупи
+        self.subgroup_group = np.array([problem.group_index[gid] for gid, _ in problem.subgroup_keys], dtype=np.int64)
+
+        self.slot_week = np.array(problem.slot_week, dtype=np.int64)
+        # Доступні слоти тижнів (рядки різної довжини доповнено нулями) та їх кількість
+        self.week_slot_count = np.array([len(week_slots) for week_slots in problem.week_slots], dtype=np.int64)
+        self.week_slot_table = np.zeros((self.n_weeks, max(self.week_slot_count.max(), 1)), dtype=np.int64)
+        for week, week_slots in enumerate(problem.week_slots):
+            self.week_slot_table[week, :len(week_slots)] = week_slots
+        self.blocked = np.zeros(self.n_slots, dtype=bool)
+        self.blocked[problem.blocked_slots] = True
+        self.lessons_per_day = problem.lessons_per_day
+        self.day_gaps = np.array(problem.day_gaps, dtype=np.int64)  # «Вікна» дня за маскою його пар
+        self.capacity = np.array(problem.auditorium_capacity, dtype=np.int64)
+        self.lecturer_limit = np.array(problem.lecturer_limit, dtype=np.int64)
+
+        # Матриці кваліфікації: дисципліна × викладач та тип заняття × викладач
+        self.subject_ok = np.zeros((len(problem.subjects), self.n_lecturers), dtype=bool)
+        self.type_ok = np.zeros((2, self.n_lecturers), dtype=bool)
+        for lecturer, (subjects, types) in enumerate(zip(problem.lecturer_subjects, problem.lecturer_types)):
+            self.subject_ok[list(subjects), lecturer] = True
+            self.type_ok[list(types), lecturer] = True
+
+        # Аудиторії, відсортовані за місткістю: для заняття підходить суфікс цього списку
+        self.sorted_auditoriums = np.argsort(self.capacity, kind='stable')
+        sorted_capacity = self.capacity[self.sorted_auditoriums].tolist()
+        first_ok = np.array([bisect.bisect_left(sorted_capacity, lesson.size) for lesson in lessons], dtype=np.int64)
+        # Якщо жодна аудиторія не вміщає заняття, обираємо з усіх (штраф нарахує оцінка)
+        first_ok[first_ok == self.n_auditoriums] = 0
+        self.auditorium_first = first_ok
+        self.auditorium_count = self.n_auditoriums - first_ok
+
+        # Придатні викладачі для кожного заняття у вигляді плаского масиву зі зсувами
+        eligible_by_kind = {}
+        flat, start, count = [], [], []
+        for lesson in lessons:
+            kind = (lesson.subject, lesson.event_type)
+            if kind not in eligible_by_kind:
+                eligible = [lid for lid in range(self.n_lecturers) if problem.can_teach(lid, lesson)]
+                # Якщо придатних викладачів немає, обираємо з усіх (штраф нарахує оцінка)
+                eligible_by_kind[kind] = (len(flat), eligible or list(range(self.n_lecturers)))
+                flat.extend(eligible_by_kind[kind][1])
+            offset, eligible = eligible_by_kind[kind]
+            start.append(offset)
+            count.append(len(eligible))
+        self.eligible_flat = np.array(flat, dtype=np.int64)
+        self.eligible_start = np.array(start, dtype=np.int64)
+        self.eligible_count = np.array(count, dtype=np.int64)
+
+        # Ключі Зобріста для відбитків розкладів: заняття (стовпець) та значення кожного гена
+        keys = np.random.default_rng(FINGERPRINT_SEED)
+        self.lesson_keys = _random_keys(keys, len(lessons))
+        self.slot_keys = _random_keys(keys, self.n_slots)
+        self.auditorium_keys = _random_keys(keys, self.n_auditoriums)
+        self.lecturer_keys = _random_keys(keys, self.n_lecturers)
+
+
+# Випадкові 64-бітні ключі
+def _random_keys(rng, n):
+    return np.frombuffer(rng.bytes(8 * n), dtype=np.uint64).copy()
+
+
+# Перемішування 64-бітних чисел (фіналізатор splitmix64; множення uint64 виконується за модулем 2^64)
+def _mix64(z):
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+# Відбитки розкладів популяції: сума за модулем 2^64 перемішаних ключів занять та їх генів
+def fingerprints(arrays, slots, auditoriums, lecturers):
+    keys = arrays.lesson_keys ^ arrays.slot_keys[slots] ^ arrays.auditorium_keys[auditoriums]
+    keys ^= arrays.lecturer_keys[lecturers]
+    return _mix64(keys).sum(axis=1, dtype=np.uint64)
+
+
+# Генерація випадкових генів (слот, аудиторія, викладач) для матриці розміру shape = (розклади, заняття)
+def random_genes(arrays, shape, rng):
+    slot_pick = (rng.random(shape) * arrays.week_slot_count[arrays.lesson_week]).astype(np.int64)
+    slots = arrays.week_slot_table[arrays.lesson_week, slot_pick]
+    auditorium_pick = (rng.random(shape) * arrays.auditorium_count).astype(np.int64)
+    auditoriums = arrays.sorted_auditoriums[arrays.auditorium_first + auditorium_pick]
+    lecturer_pick = (rng.random(shape) * arrays.eligible_count).astype(np.int64)
+    lecturers = arrays.eligible_flat[arrays.eligible_start + lecturer_pick]
+    return slots, auditoriums, lecturers
+
+
+# Кількість повторів ключа в кожному рядку (кожна подія понад першу з тим самим ключем — конфлікт)
+def _row_collisions(keys):
+    if keys.shape[1] < 2:
+        return np.zeros(keys.shape[0], dtype=np.int64)
+    keys = np.sort(keys, axis=1)
+    return (keys[:, 1:] == keys[:, :-1]).sum(axis=1)
+
+
+# Оцінка всієї популяції одразу: повертає масиви жорстких та м'яких порушень для кожного розкладу
+def evaluate(arrays, slots, auditoriums, lecturers):
+    population_size = slots.shape[0]
+    n_slots = arrays.n_slots
+
+    # Жорсткі обмеження: викладач, група, підгрупа та аудиторія зайняті в один слот
+    hard = _row_collisions(lecturers * n_slots + slots)
+    hard += _row_collisions(arrays.lesson_group * n_slots + slots)
+    columns = arrays.subgroup_columns
+    if columns.size:
+        hard += _row_collisions(arrays.lesson_subgroup[columns] * n_slots + slots[:, columns])
+    auditorium_keys = auditoriums * n_slots + slots
+    hard += _row_collisions(auditorium_keys)
+    hard -= _shared_lecture_credit(arrays, auditorium_keys, lecturers)
+    hard += arrays.blocked[slots].sum(axis=1)  # Заняття в заблокованих слотах календаря
+
+    # Перевищення тижневого навантаження викладача
+    hours_keys = (np.arange(population_size)[:, None] * arrays.n_lecturers + lecturers) * arrays.n_weeks
+    hours_keys += arrays.slot_week[slots]
+    hours = np.bincount(hours_keys.ravel(), minlength=population_size * arrays.n_lecturers * arrays.n_weeks)
+    hours = hours.reshape(population_size, arrays.n_lecturers, arrays.n_weeks)
+    hard += np.maximum(hours - arrays.lecturer_limit[None, :, None], 0).sum(axis=(1, 2))
+
+    # М'які обмеження: місткість аудиторії та кваліфікація викладача
+    soft = (arrays.capacity[auditoriums] < arrays.lesson_size).sum(axis=1)
+    soft += (~arrays.subject_ok[arrays.lesson_subject, lecturers]).sum(axis=1)
+    soft += (~arrays.type_ok[arrays.lesson_type, lecturers]).sum(axis=1)
+
+    # «Вікна» викладачів, груп та підгруп (розклад підгрупи — заняття всієї групи разом з її власними)
+    gaps = _gaps(arrays, _occupied(lecturers, slots, arrays.n_lecturers, n_slots))
+    gaps += _gaps(arrays, _occupied(arrays.lesson_group, slots, arrays.n_groups, n_slots))
+    if arrays.n_subgroups:
+        columns = arrays.group_lesson_columns
+        whole = _occupied(arrays.lesson_group[columns], slots[:, columns], arrays.n_groups, n_slots)
+        columns = arrays.subgroup_columns
+        occupied = _occupied(arrays.lesson_subgroup[columns], slots[:, columns], arrays.n_subgroups, n_slots)
+        gaps += _gaps(arrays, occupied | whole[:, arrays.subgroup_group])
+    soft += GAP_WEIGHT * gaps
+    return hard, soft
+
+
+# Зайнятість слотів ресурсами в кожному розкладі: булевий масив (розклади, ресурси, слоти)
+def _occupied(resources, slots, n_resources, n_slots):
+    population_size = slots.shape[0]
+    occupied = np.zeros((population_size, n_resources * n_slots), dtype=bool)
+    rows = np.broadcast_to(np.arange(population_size)[:, None], slots.shape)
+    occupied[rows, resources * n_slots + slots] = True
+    return occupied.reshape(population_size, n_resources, n_slots)
+
+
+# Кількість «вікон» у кожному розкладі: зайнятість дня пакується в маску пар і рахується за таблицею day_gaps
+def _gaps(arrays, occupied):
+    days = occupied.reshape(occupied.shape[0], -1, arrays.lessons_per_day)
+    day_masks = days @ (1 << np.arange(arrays.lessons_per_day))
+    return arrays.day_gaps[day_masks].sum(axis=1)
+
+
+# Оцінка популяції з кешем: однакові розклади (за відбитком) оцінюються один раз, а оцінки розкладів
+# з попередніх поколінь беруться з LRU-кешу. Повертає оцінки, відбитки та кількість справжніх оцінок
+def evaluate_cached(arrays, genes, cache):
+    prints = fingerprints(arrays, *genes)
+    unique, first, inverse = np.unique(prints, return_index=True, return_inverse=True)
+    hard = np.empty(len(unique), dtype=np.int64)
+    soft = np.empty(len(unique), dtype=np.int64)
+    missing = []
+    for k, fingerprint in enumerate(unique.tolist()):
+        scores = cache.get(fingerprint)
+        if scores is None:
+            missing.append(k)
+        else:
+            hard[k], soft[k] = scores
+    if missing:
+        rows = first[missing]
+        new_hard, new_soft = evaluate(arrays, *(gene[rows] for gene in genes))
+        hard[missing], soft[missing] = new_hard, new_soft
+        for k, h, s in zip(missing, new_hard.tolist(), new_soft.tolist()):
+            cache.put(int(unique[k]), (h, s))
+    inverse = inverse.reshape(-1)
+    return hard[inverse], soft[inverse], prints, len(missing)
+
+
+# Спільні лекції одного викладача в одній аудиторії не є конфліктом:
+# кожна лекція того самого викладача в тій самій аудиторії та слоті понад першу знімає одне порушення
+def _shared_lecture_credit(arrays, auditorium_keys, lecturers):
+    columns = arrays.lecture_columns
+    return _row_collisions(auditorium_keys[:, columns] * arrays.n_lecturers + lecturers[:, columns])
+
+
+# Схрещування пар батьків у точці посередині геному (заняття в усіх розкладах вирівняні)
+def crossover(genes, parents1, parents2):
+    point = genes[0].shape[1] // 2
+    children = []
+    for gene in genes:
+        child1 = np.concatenate([gene[parents1, :point], gene[parents2, point:]], axis=1)
+        child2 = np.concatenate([gene[parents2, :point], gene[parents1, point:]], axis=1)
+        children.append(np.concatenate([child1, child2]))
+    return children
+
+
+# Мутація: для обраних розкладів частина занять отримує нові випадкові слот, аудиторію та викладача
+def mutate(arrays, genes, rng, probability=0.3, intensity=0.3):
+    slots, auditoriums, lecturers = genes
+    shape = slots.shape
+    mask = (rng.random(shape[0]) < probability)[:, None] & (rng.random(shape) < intensity)
+    new_slots, new_auditoriums, new_lecturers = random_genes(arrays, shape, rng)
+    # Як і у звичайній мутації, аудиторія та викладач змінюються з імовірністю 0.5
+    slots = np.where(mask, new_slots, slots)
+    auditoriums = np.where(mask & (rng.random(shape) < 0.5), new_auditoriums, auditoriums)
+    lecturers = np.where(mask & (rng.random(shape) < 0.5), new_lecturers, lecturers)
+    return [slots, auditoriums, lecturers]
+
+
+# Різноманітність популяції: середня частка занять, гени яких відрізняються від генів першого розкладу
+def population_diversity(genes):
+    if genes[0].shape[0] < 2:
+        return 0.0
+    differs = np.zeros(genes[0][1:].shape, dtype=bool)
+    for gene in genes:
+        differs |= gene[1:] != gene[0]
+    return float(differs.mean())
+
+
+# Відбір n найкращих розкладів за основним ключем (з додатковим ключем для рівних значень).
+# Якщо передано відбитки, копії вже відібраних розкладів ідуть лише після всіх різних розкладів
+def _select_top_n(genes, primary, secondary, n, prints=None):
+    order = np.lexsort((secondary, primary))
+    if prints is not None:
+        _, first = np.unique(prints[order], return_index=True)
+        distinct = np.zeros(len(order), dtype=bool)
+        distinct[first] = True
+        order = np.concatenate([order[distinct], order[~distinct]])
+    order = order[:n]
+    return [gene[order] for gene in genes], primary[order], secondary[order]
+
+
+# Генетичний алгоритм над цілочисельною популяцією (розклади × заняття)
+def genetic_algorithm(groups, subjects, lecturers, auditoriums, generations=100,
+                      population_size=50, n_best_to_select=10, seed=None, seed_strategy='random',
+                      constructive_share=0.5, stats=None, observers=None, cache_size=4096, deadline=None,
+                      stagnation=None):
+    stats = {} if stats is None else stats
+    observers = [telemetry.ConsoleSink()] if observers is None else observers
+    phase_seconds = stats.setdefault('phase_seconds', {})
+    clock = time.perf_counter()
+    problem = compile_problem(groups, subjects, lecturers, auditoriums)
+    arrays = ProblemArrays(problem)
+    # Без явного seed генератор залежить від стану модуля random, тож random.seed() відтворює запуск
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    genes = list(random_genes(arrays, (population_size, len(problem.lessons)), rng))
+    # Перші рядки популяції за потреби заповнюємо конструктивними розкладами
+    construct_rng = random.Random(int(rng.integers(2 ** 63)))
+    for row in range(initial_constructive_count(population_size, seed_strategy, constructive_share)):
+        for gene, values in zip(genes, construct_genes(problem, construct_rng)):
+            gene[row] = values
+    n_best_to_select = min(n_best_to_select, population_size)
+    phase_seconds['initial_population'] = time.perf_counter() - clock
+    stats['evaluations'] = 0
+    stats['cache_hits'] = 0  # Розклади, оцінку яких узято з кешу або з однакового розкладу покоління
+    stats['feasible_generation'] = None
+    cache = FitnessCache(cache_size)
+
+    # Найкращий за оцінкою hard * 1000 + soft розклад з усіх поколінь (результат запуску)
+    incumbent, incumbent_score = None, None
+
+    # Етап 1: Жорсткі обмеження; Етап 2: Оптимізація м'яких обмежень
+    start = time.perf_counter()
+    for phase in range(2):
+        phase_name = ('hard', 'soft')[phase]
+        clock = time.perf_counter()
+        monitor = Stagnation(stagnation) if stagnation else None
+        stats['stop_reason'] = 'generations'
+        last_generation = 0.0  # Тривалість попереднього покоління
+        for generation in (range(generations) if generations is not None else itertools.count()):
+            # Бюджет часу перевіряється між поколіннями: наступне покоління не починається, якщо за
+            # тривалістю попереднього воно не встигне завершитись (перше покоління виконується завжди)
+            generation_clock = time.perf_counter()
+            if incumbent is not None and deadline is not None and generation_clock + last_generation >= deadline:
+                stats['stop_reason'] = 'time_limit'
+                break
+            stats['generations_' + phase_name] = generation + 1
+            timings = {}
+            step_clock = time.perf_counter()
+            hard, soft, prints, evaluated = evaluate_cached(arrays, genes, cache)
+            timings['evaluation'] = time.perf_counter() - step_clock
+            stats['evaluations'] += len(hard)
+            stats['cache_hits'] += len(hard) - evaluated
+            if observers:
+                summary = (hard, soft, population_diversity(genes), 0)  # Рушій розміщує всі заняття
+
+            step_clock = time.perf_counter()
+            # В обох етапах ранжуємо за (hard, soft): на етапі м'яких обмежень еліта не повинна
+            # втрачати вже досягнутий прогрес за жорсткими обмеженнями
+            genes, hard, soft = _select_top_n(genes, hard, soft, n_best_to_select, prints)
+            done = hard[0] == 0 and (phase == 0 or soft[0] == 0)
+            best = [gene[0].copy() for gene in genes]
+            timings['selection'] = time.perf_counter() - step_clock
+            score = int(hard[0]) * 1000 + int(soft[0])
+            if incumbent is None or score < incumbent_score:
+                incumbent, incumbent_score = best, score
+
+            level = monitor.update(int((hard, soft)[phase][0])) if monitor else None
+            if level is not None:
+                telemetry.notify(observers, {'event': 'stagnation', 'phase': phase_name,
+                                             'generation': generation + 1, 'level': level})
+            stalled = monitor is not None and monitor.level >= STAGNATION_STOP
+
+            if not done and not stalled:
+                # Схрещування між вибраними найкращими розкладами та мутація нової популяції
+                step_clock = time.perf_counter()
+                pairs = (population_size + 1) // 2
+                parents = np.argsort(rng.random((pairs, len(genes[0]))), axis=1)[:, :2]
+                genes = crossover(genes, parents[:, 0], parents[:, 1])
+                timings['crossover'] = time.perf_counter() - step_clock
+                step_clock = time.perf_counter()
+                probability, intensity = monitor.mutation() if monitor else STAGNATION_MUTATION[0]
+                genes = mutate(arrays, [gene[:population_size] for gene in genes], rng, probability, intensity)
+                if level == 2:
+                    # Новий матеріал замість частини нащадків, коли посилена мутація вже не допомагає
+                    n_immigrants = max(1, round(population_size * IMMIGRANT_SHARE))
+                    for gene, values in zip(genes, random_genes(arrays, (n_immigrants, genes[0].shape[1]), rng)):
+                        gene[-n_immigrants:] = values
+                timings['mutation'] = time.perf_counter() - step_clock
+
+            if observers:
+                telemetry.notify(observers, telemetry.generation_record(
+                    'numpy', phase_name, generation + 1, *summary, timings, time.perf_counter() - start))
+            last_generation = time.perf_counter() - generation_clock
+            if done:
+                if phase == 0:
+                    stats['feasible_generation'] = generation + 1
+                stats['stop_reason'] = 'solved'
+                break
+            if stalled:
+                stats['stop_reason'] = 'stagnation'
+                break
+        if stats['stop_reason'] in ('time_limit', 'stagnation'):
+            telemetry.notify(observers, {'event': 'stop', 'phase': phase_name, 'reason': stats['stop_reason'],
+                                         'generation': stats.get('generations_' + phase_name, 0)})
+        phase_seconds[phase_name] = time.perf_counter() - clock
+        if stats['stop_reason'] == 'time_limit':
+            break  # Бюджет часу вичерпано: наступний етап не починається
+
+    return problem.to_schedule(*incumbent)
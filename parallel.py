@@ -0,0 +1,125 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from calendar_model import CALENDAR, use_calendar
+from genetic_algo import generate_initial_population, breed, REPAIR_PROBABILITY, SELECTIONS
+
+# Доступні способи виконання поколінь
+BACKENDS = ('serial', 'thread', 'process')
+
+# Дані задачі (groups, subjects, lecturers, auditoriums) у робочому процесі.
+# Передаються один раз під час запуску процесу (разом з календарем), а не з кожним завданням
+_worker_problem = None
+
+
+def _init_worker(problem, calendar):
+    global _worker_problem
+    _worker_problem = problem
+    use_calendar(calendar)
+
+
+# Завдання: генерація count випадкових (або конструктивних) розкладів з власним потоком випадкових чисел
+def _generate_task(problem, count, seed, constructive=False):
+    groups, subjects, lecturers, auditoriums = problem or _worker_problem
+    if constructive:
+        from constructive import constructive_population
+        return constructive_population(count, groups, subjects, lecturers, auditoriums, random.Random(seed))
+    return generate_initial_population(count, groups, subjects, lecturers, auditoriums, random.Random(seed))
+
+
+# Завдання: схрещування пар батьків, мутація та ремонт нащадків з власним потоком випадкових чисел.
+# Повертає нащадків і час схрещування, мутації та ремонту в цьому завданні
+def _breed_task(problem, parents, pairs, mutation_probability, seed, mutation_intensity=0.3,
+                repair_probability=REPAIR_PROBABILITY, crossover_operator='group'):
+    groups, subjects, lecturers, auditoriums = problem or _worker_problem
+    for parent in parents:
+        parent.attach(groups, lecturers, auditoriums)  # Батьки з іншого процесу приходять без лічильників
+    timings = {}
+    children = breed(parents, pairs, lecturers, auditoriums, random.Random(seed), mutation_probability, timings,
+                     mutation_intensity, repair_probability, crossover_operator)
+    return children, timings
+
+
+# Кількість конструктивних розкладів у початковій популяції розміру size
+def initial_constructive_count(size, seed_strategy, constructive_share=0.5):
+    if seed_strategy == 'random':
+        return 0
+    if seed_strategy == 'constructive':
+        return size
+    if seed_strategy == 'mixed':
+        return round(size * constructive_share)
+    raise ValueError(f"Невідома стратегія початкової популяції: {seed_strategy}")
+
+
+# Виконавець поколінь: послідовно, у пулі потоків або у пулі процесів.
+# Робота ділиться на завдання фіксованого розміру, кожне з власним seed, отриманим з головного генератора,
+# тому результат при однаковому seed не залежить ні від способу виконання, ні від кількості виконавців
+class GenerationExecutor:
+    def __init__(self, groups, subjects, lecturers, auditoriums, backend='serial', workers=None, chunk_size=5):
+        if backend not in BACKENDS:
+            raise ValueError(f"Невідомий спосіб виконання: {backend}")
+        self.problem = (groups, subjects, lecturers, auditoriums)
+        self.backend = backend
+        self.chunk_size = chunk_size  # Кількість розкладів (або пар батьків) в одному завданні
+        self.workers = workers or os.cpu_count() or 1
+
+        self._pool = None
+        if backend == 'thread':
+            self._pool = ThreadPoolExecutor(self.workers)
+        elif backend == 'process':
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self.problem, CALENDAR))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    # Запуск завдань і збір результатів у порядку завдань
+    def _run(self, task, jobs):
+        if self._pool is None:
+            return [task(self.problem, *job) for job in jobs]
+        # Процесам дані задачі не передаються: вони вже є в _worker_problem
+        problem = self.problem if self.backend == 'thread' else None
+        futures = [self._pool.submit(task, problem, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+    # Початкова популяція розміру size: seed_strategy 'random', 'constructive' або 'mixed'
+    # (у змішаній популяції частка constructive_share розкладів будується конструктивно)
+    def initial_population(self, size, rng, seed_strategy='random', constructive_share=0.5):
+        n_constructive = initial_constructive_count(size, seed_strategy, constructive_share)
+        jobs = []
+        for constructive, count in ((True, n_constructive), (False, size - n_constructive)):
+            for start in range(0, count, self.chunk_size):
+                jobs.append((min(self.chunk_size, count - start), rng.getrandbits(64), constructive))
+        return [schedule for result in self._run(_generate_task, jobs) for schedule in result]
+
+    # Нове покоління розміру size з батьків parents, упорядкованих від найкращого (пари батьків способом
+    # selection обирає головний генератор). Якщо передано словник timings, до нього додається сумарний час
+    # схрещування, мутації та ремонту в усіх завданнях
+    def breed(self, parents, size, rng, mutation_probability=0.3, timings=None, mutation_intensity=0.3,
+              repair_probability=REPAIR_PROBABILITY, crossover_operator='group', selection='tournament'):
+        pairs = SELECTIONS[selection](len(parents), (size + 1) // 2, rng)
+        jobs = []
+        for start in range(0, len(pairs), self.chunk_size):
+            chunk = pairs[start:start + self.chunk_size]
+            # Кожному завданню передаються лише ті батьки, які йому потрібні
+            used = sorted({i for pair in chunk for i in pair})
+            position = {index: k for k, index in enumerate(used)}
+            jobs.append(([parents[i] for i in used], [(position[i], position[j]) for i, j in chunk],
+                         mutation_probability, rng.getrandbits(64), mutation_intensity, repair_probability,
+                         crossover_operator))
+        children = []
+        for task_children, task_timings in self._run(_breed_task, jobs):
+            children.extend(task_children)
+            if timings is not None:
+                for step, seconds in task_timings.items():
+                    timings[step] = timings.get(step, 0.0) + seconds
+        return children
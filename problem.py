@@ -0,0 +1,132 @@
+from calendar_model import CALENDAR
+from genetic_algo import Schedule, generation_index, lecturer_limit, template_event
+
+# Типи занять у порядку їх цілочисельних індексів
+EVENT_TYPES = ['Лекція', 'Практика']
+
+
+# Заняття, яке потрібно розмістити в розкладі (незмінна частина події, усі поля — цілі індекси)
+class Lesson:
+    def __init__(self, subject, event_type, week, group, subgroup, size):
+        self.subject = subject        # Індекс дисципліни у списку subjects
+        self.event_type = event_type  # Індекс типу заняття в EVENT_TYPES
+        self.week = week              # Індекс тижня календаря
+        self.group = group            # Індекс групи
+        self.subgroup = subgroup      # Індекс підгрупи або -1, якщо заняття для всієї групи
+        self.size = size              # Кількість студентів на занятті
+
+
+# Скомпільоване представлення задачі: рядкові ідентифікатори замінено щільними цілими індексами
+class Problem:
+    def __init__(self, groups, subjects, lecturers, auditoriums):
+        # Вихідні дані зберігаються для перетворення результатів назад у Schedule/Event
+        self.groups = groups
+        self.subjects = subjects
+        self.lecturers = lecturers
+        self.auditoriums = auditoriums
+
+        # Календар, під який скомпільовано задачу
+        self.calendar_key = CALENDAR.key
+
+        # Часові слоти календаря: індекс слоту -> індекс тижня, доступні (незаблоковані) слоти кожного тижня,
+        # заблоковані слоти та таблиця «вікон» дня (задача компілюється під поточний календар)
+        self.slot_week = list(CALENDAR.slot_week)
+        self.week_slots = [[s for s in range(CALENDAR.n_slots) if mask >> s & 1]
+                           for mask in (CALENDAR.week_masks[week] for week in CALENDAR.weeks)]
+        self.blocked_slots = list(CALENDAR.blocked)
+        self.lessons_per_day = CALENDAR.lessons_per_day
+        self.day_gaps = list(CALENDAR.day_gaps)
+
+        # Викладачі та їх тижневий ліміт у парах
+        self.lecturer_ids = list(lecturers)
+        self.lecturer_index = {lid: i for i, lid in enumerate(self.lecturer_ids)}
+        self.lecturer_limit = [lecturer_limit(lecturers, lid) for lid in self.lecturer_ids]
+
+        # Аудиторії та їх місткість
+        self.auditorium_ids = list(auditoriums)
+        self.auditorium_index = {aid: i for i, aid in enumerate(self.auditorium_ids)}
+        self.auditorium_capacity = [auditoriums[aid] for aid in self.auditorium_ids]
+
+        # Групи, їх розміри та підгрупи (кожна пара (група, підгрупа) має власний індекс)
+        self.group_ids = list(groups)
+        self.group_index = {gid: i for i, gid in enumerate(self.group_ids)}
+        self.group_size = [groups[gid]['NumStudents'] for gid in self.group_ids]
+        self.subgroup_keys = [(gid, sg) for gid in self.group_ids for sg in groups[gid]['Subgroups']]
+        self.subgroup_index = {key: i for i, key in enumerate(self.subgroup_keys)}
+        self.subgroup_size = [groups[gid]['NumStudents'] // 2 for gid, _ in self.subgroup_keys]
+
+        # Дисципліни
+        self.subject_index = {subj['SubjectID']: i for i, subj in enumerate(subjects)}
+
+        # Кваліфікація викладачів: які дисципліни та типи занять може вести кожен викладач
+        self.lecturer_subjects = [
+            {self.subject_index[sid] for sid in lecturers[lid]['SubjectsCanTeach'] if sid in self.subject_index}
+            for lid in self.lecturer_ids
+        ]
+        self.lecturer_types = [
+            {EVENT_TYPES.index(t) for t in lecturers[lid]['TypesCanTeach'] if t in EVENT_TYPES}
+            for lid in self.lecturer_ids
+        ]
+
+        self.lessons = self._build_lessons()
+
+    # Перелік усіх занять, які мають бути в розкладі (так само, як у generate_initial_population)
+    def _build_lessons(self):
+        lessons = []
+        for s, subj in enumerate(self.subjects):
+            group = self.group_index[subj['GroupID']]
+            for week_type in CALENDAR.subject_weeks(subj['WeekType']):
+                week = CALENDAR.weeks.index(week_type)
+                for _ in range(subj['NumLectures']):
+                    lessons.append(Lesson(s, 0, week, group, -1, self.group_size[group]))
+                for _ in range(subj['NumPracticals']):
+                    if subj['RequiresSubgroups']:
+                        # Для кожної підгрупи окреме заняття
+                        for subgroup_id in self.groups[subj['GroupID']]['Subgroups']:
+                            subgroup = self.subgroup_index[(subj['GroupID'], subgroup_id)]
+                            lessons.append(Lesson(s, 1, week, group, subgroup, self.subgroup_size[subgroup]))
+                    else:
+                        lessons.append(Lesson(s, 1, week, group, -1, self.group_size[group]))
+        return lessons
+
+    # Чи може викладач вести дисципліну та тип заняття
+    def can_teach(self, lecturer, lesson):
+        return lesson.subject in self.lecturer_subjects[lecturer] and lesson.event_type in self.lecturer_types[lecturer]
+
+    # Перетворення закодованих генів (слот, аудиторія, викладач для кожного заняття) у звичайний Schedule
+    def to_schedule(self, slots, auditoriums, lecturers):
+        schedule = Schedule(self.groups, self.lecturers, self.auditoriums, len(self.lessons))
+        index = generation_index(self.lecturers, self.auditoriums)
+        for lesson, slot, auditorium, lecturer in zip(self.lessons, slots, auditoriums, lecturers):
+            subgroup_ids = None
+            if lesson.subgroup >= 0:
+                group_id, subgroup_id = self.subgroup_keys[lesson.subgroup]
+                subgroup_ids = {group_id: subgroup_id}
+            template = index.template(self.subjects[lesson.subject], EVENT_TYPES[lesson.event_type],
+                                      CALENDAR.weeks[lesson.week], subgroup_ids)
+            schedule.add_event(template_event(template, int(slot), self.lecturer_ids[int(lecturer)],
+                                              self.auditorium_ids[int(auditorium)]))
+        return schedule
+
+
+# Остання скомпільована задача: ті самі об'єкти даних (наприклад, з кешу file_processor.load_problem)
+# не компілюються повторно
+_last_problem = None
+
+
+# Скомпільована задача для даних, повторно використовує останню, якщо дані — ті самі об'єкти,
+# а поточний календар не змінився
+def compile_problem(groups, subjects, lecturers, auditoriums):
+    problem = _last_problem
+    if (problem is None or problem.groups is not groups or problem.subjects is not subjects
+            or problem.lecturers is not lecturers or problem.auditoriums is not auditoriums
+            or problem.calendar_key != CALENDAR.key):
+        problem = remember_problem(Problem(groups, subjects, lecturers, auditoriums))
+    return problem
+
+
+# Запам'ятовування вже скомпільованої задачі (наприклад, завантаженої з кешу) для compile_problem
+def remember_problem(problem):
+    global _last_problem
+    _last_problem = problem
+    return problem
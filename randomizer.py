@@ -1,5 +1,8 @@
 import random  # Імпортуємо модуль random для генерації випадкових чисел
-from main import genetic_algorithm, print_schedule  # Імпортуємо генетичний алгоритм та функцію для виведення розкладу
+import sys  # Імпортуємо модуль sys для виведення розкладу в консоль
+
+import exporter  # Імпортуємо модуль експорту розкладу
+from genetic_algo import genetic_algorithm  # Імпортуємо генетичний алгоритм
 
 
 # Функції для випадкової генерації даних
@@ -75,7 +78,7 @@ def generate_random_auditoriums(num_auditoriums):
 
 
 # Головна функція для запуску генерації даних та алгоритму
-def main():
+def main(views=(), export_dir='.', console=sys.stdout, **ga_options):
     # Параметри для генерації даних
     num_groups = 5  # Кількість груп
     num_subjects_per_group = 3  # Кількість предметів на групу
@@ -89,6 +92,7 @@ def main():
     auditoriums = generate_random_auditoriums(num_auditoriums)  # Генеруємо аудиторії
 
     # Запускаємо генетичний алгоритм для створення розкладу
-    best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums)
-    print("\nBest schedule:\n")
-    print_schedule(best_schedule, lecturers, groups, auditoriums)  # Виводимо найкращий знайдений розклад
+    best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums, **ga_options)
+    # Виводимо найкращий знайдений розклад у консоль (якщо console) та записуємо вибрані подання у файли
+    exporter.export(best_schedule, groups, lecturers, auditoriums, views, export_dir, console=console)
+    return best_schedule
@@ -0,0 +1,126 @@
+import random
+
+from checkpoint import lesson_key, warm_schedule
+from calendar_model import CALENDAR
+from genetic_algo import GenerationIndex, group_size, lecturer_limit
+from local_search import simulated_annealing
+
+
+# Кількість занять кожного виду (ключ lesson_key), яких вимагають дані
+def lesson_counts(groups, subjects):
+    counts = {}
+    for subj in subjects:
+        for week in CALENDAR.subject_weeks(subj['WeekType']):
+            keys = [lesson_key(subj['SubjectID'], 'Лекція', week, None, None)] * subj['NumLectures']
+            for _ in range(subj['NumPracticals']):
+                if subj['RequiresSubgroups']:
+                    keys.extend(lesson_key(subj['SubjectID'], 'Практика', week, [subj['GroupID']],
+                                           {subj['GroupID']: subgroup_id})
+                                for subgroup_id in groups[subj['GroupID']]['Subgroups'])
+                else:
+                    keys.append(lesson_key(subj['SubjectID'], 'Практика', week, [subj['GroupID']], None))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+# Відмінності двох словників: видалені, додані та змінені ключі
+def _diff_mapping(old, new):
+    return {
+        'removed': sorted(key for key in old if key not in new),
+        'added': sorted(key for key in new if key not in old),
+        'changed': sorted(key for key in old if key in new and old[key] != new[key]),
+    }
+
+
+# Відмінності між старими та новими вхідними даними (кортежі groups, subjects, lecturers, auditoriums)
+def diff_inputs(old, new):
+    old_groups, old_subjects, old_lecturers, old_auditoriums = old
+    groups, subjects, lecturers, auditoriums = new
+    return {
+        'groups': _diff_mapping(old_groups, groups),
+        'subjects': _diff_mapping({subj['SubjectID']: subj for subj in old_subjects},
+                                  {subj['SubjectID']: subj for subj in subjects}),
+        'lecturers': _diff_mapping(old_lecturers, lecturers),
+        'auditoriums': _diff_mapping(old_auditoriums, auditoriums),
+    }
+
+
+# Позиції подій, які зміни даних зробили недійсними: викладач більше не веде дисципліну чи тип заняття
+# або перевищує новий тижневий ліміт, аудиторія (чи її місткість для зміненої групи) стала замалою.
+# Події, яких зміни не стосуються, не перевіряються: їх наявні порушення не є наслідком змін.
+# Видалені викладачі, аудиторії та змінені заняття дисциплін обробляє перенесення розкладу (warm_schedule)
+def affected_events(schedule, diff, groups, lecturers, auditoriums):
+    changed_lecturers = set(diff['lecturers']['changed'])
+    changed_auditoriums = set(diff['auditoriums']['changed'])
+    changed_groups = set(diff['groups']['changed'])
+
+    affected = set()
+    by_lecturer_week = {}
+    for i, event in enumerate(schedule.events):
+        if event.lecturer_id in changed_lecturers:
+            lecturer = lecturers[event.lecturer_id]
+            if event.subject_id not in lecturer['SubjectsCanTeach'] or event.event_type not in lecturer['TypesCanTeach']:
+                affected.add(i)
+            week = CALENDAR.slot_week[event.slot]
+            by_lecturer_week.setdefault((event.lecturer_id, week), []).append(i)
+        if event.auditorium_id in changed_auditoriums or changed_groups.intersection(event.group_ids):
+            if auditoriums[event.auditorium_id] < group_size(groups, event.group_ids, event.subgroup_ids):
+                affected.add(i)
+
+    # Знижений ліміт навантаження: недійсні лише пари понад новий ліміт (останні за розкладом тижня)
+    for (lecturer_id, week), positions in by_lecturer_week.items():
+        limit = lecturer_limit(lecturers, lecturer_id)
+        if len(positions) > limit:
+            positions.sort(key=lambda i: schedule.events[i].slot)
+            affected.update(positions[limit:])
+    return sorted(affected)
+
+
+# Інкрементальне перепланування: попередній розклад переноситься на нові дані (previous_data — дані,
+# для яких його побудовано), недійсні та нові події ремонтуються локальним пошуком, який зосереджений
+# на них, а за кожну змінену незачеплену подію додає штраф move_penalty.
+# Повертає новий розклад та звіт про зміни
+def reschedule(previous, previous_data, groups, subjects, lecturers, auditoriums, iterations=20000, time_limit=None,
+               move_penalty=2, rng=random):
+    index = GenerationIndex(lecturers, auditoriums)
+    diff = diff_inputs(previous_data, (groups, subjects, lecturers, auditoriums))
+
+    # Нові випадкові події отримують лише заняття, яких додали в даних; заняття, що не вмістились
+    # у попередній розклад, так і залишаються нерозміщеними
+    quota = lesson_counts(groups, subjects)
+    for key, count in lesson_counts(previous_data[0], previous_data[1]).items():
+        if key in quota:
+            quota[key] = max(quota[key] - count, 0)
+    # Події з видаленими викладачами чи аудиторіями також отримують нові гени
+    renewed = []
+    schedule = warm_schedule(previous, groups, subjects, lecturers, auditoriums, rng, index, renewed, quota)
+    affected = sorted(set(renewed) | set(affected_events(schedule, diff, groups, lecturers, auditoriums)))
+    before = schedule.score()
+
+    # Гени незачеплених подій до ремонту: відхід від них штрафується
+    touched = set(affected)
+    original = [None if i in touched else (event.slot, event.lecturer_id, event.auditorium_id)
+                for i, event in enumerate(schedule.events)]
+
+    def penalty(i, event):
+        genes = original[i]
+        if genes is None or genes == (event.slot, event.lecturer_id, event.auditorium_id):
+            return 0
+        return move_penalty
+
+    repaired = schedule
+    if affected:
+        repaired = simulated_annealing(schedule, groups, lecturers, auditoriums, iterations, time_limit, rng,
+                                       initial_temperature=1.0, index=index, focus=affected, penalty=penalty)
+
+    moved = sum(1 for i, event in enumerate(repaired.events) if penalty(i, event))
+    report = {
+        'diff': diff,
+        'events': len(repaired.events),
+        'affected': len(affected),
+        'moved_untouched': moved,
+        'score_before_repair': before,
+        'score': repaired.score(),
+    }
+    return repaired, report
@@ -0,0 +1,372 @@
+import argparse  # Розбір параметрів командного рядка
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import exporter
+import file_processor
+from calendar_model import calendar_from_config, calendar_scope, use_calendar
+from genetic_algo import genetic_algorithm
+
+# Параметри алгоритму, які може задати завдання (options)
+JOB_OPTIONS = ('generations', 'engine', 'backend', 'workers', 'seed', 'seed_strategy', 'constructive_share',
+               'islands', 'migration_interval', 'topology', 'local_search_iterations', 'local_search_time',
+               'time_limit', 'stagnation', 'repair_probability', 'decompose', 'crossover_operator', 'selection',
+               'elites')
+
+# Події, якими завершується завдання, та відповідний стан завдання
+FINAL_EVENTS = {'result': 'done', 'error': 'failed', 'cancelled': 'cancelled'}
+
+# Ключі CSV-даних завдання: назви файлів задачі без розширення (groups, subjects, lectures, auditoriums)
+CSV_KEYS = [os.path.splitext(name)[0] for name in file_processor.PROBLEM_FILES]
+
+# Ключі розібраних даних завдання ('data')
+DATA_KEYS = ('groups', 'subjects', 'lecturers', 'auditoriums')
+
+# Найбільший рядок протоколу (завдання з CSV-даними великих факультетів передаються одним рядком)
+LINE_LIMIT = 1 << 28
+
+DEFAULT_PORT = 8765
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Дані задачі завдання: 'csv' — тексти CSV-файлів у форматі datasource (і, за потреби, 'calendar' — текст
+# calendar.json), 'data' — вже розібрані дані у форматі file_processor (groups, subjects, lecturers,
+# auditoriums) з необов'язковими налаштуваннями календаря 'calendar'. Обидва варіанти перевіряються,
+# а календар завдання стає поточним CALENDAR робочого процесу (до кінця завдання, див. _run_job)
+def job_problem(job):
+    if 'csv' in job:
+        with tempfile.TemporaryDirectory() as directory:
+            for key, name in zip(CSV_KEYS, file_processor.PROBLEM_FILES):
+                with open(os.path.join(directory, name), 'w', encoding='utf-8', newline='') as f:
+                    f.write(job['csv'][key])
+            if 'calendar' in job['csv']:
+                with open(os.path.join(directory, file_processor.CALENDAR_FILE), 'w', encoding='utf-8') as f:
+                    f.write(job['csv']['calendar'])
+            problem = file_processor.load_problem(directory)
+        return problem.groups, problem.subjects, problem.lecturers, problem.auditoriums
+    data = job['data']
+    try:
+        use_calendar(calendar_from_config(data.get('calendar', {})))
+    except (ValueError, TypeError, AttributeError) as error:
+        raise file_processor.ProblemDataError([f"calendar: {type(error).__name__}: {error}"]) from None
+    missing = [key for key in DATA_KEYS if key not in data]
+    if missing:
+        raise file_processor.ProblemDataError([f"data: відсутні дані {', '.join(missing)}"])
+    problem_data = tuple(data[key] for key in DATA_KEYS)
+    errors = file_processor.validate_problem(*problem_data)
+    if errors:
+        raise file_processor.ProblemDataError(errors)
+    return problem_data
+
+
+# Виконання одного завдання в робочому процесі. Записи телеметрії відправляються серверу,
+# а між поколіннями перевіряється, чи не надійшло скасування цього завдання. Календар завдання діє
+# лише до його завершення: наступне завдання процесу починає з попереднього календаря
+def _run_job(conn, job_id, job):
+    def observer(record):
+        conn.send((job_id, record))
+        while conn.poll():
+            message = conn.recv()
+            if message is not None and message[0] == 'cancel' and message[1] == job_id:
+                raise JobCancelled()
+
+    try:
+        with calendar_scope():
+            groups, subjects, lecturers, auditoriums = job_problem(job)
+            options = job.get('options', {})
+            options = {key: options[key] for key in JOB_OPTIONS if key in options}
+            stats = {}
+            best_schedule = genetic_algorithm(groups, subjects, lecturers, auditoriums, stats=stats,
+                                              observers=[observer], **options)
+            best_schedule.attach(groups, lecturers, auditoriums)
+            return {
+                'event': 'result',
+                'hard': best_schedule.hard_constraints_violations,
+                'soft': best_schedule.soft_constraints_score,
+                'stats': stats,
+                'exports': exporter.render(best_schedule, groups, lecturers, auditoriums,
+                                           job.get('views', ['json'])),
+            }
+    except JobCancelled:
+        return {'event': 'cancelled'}
+    except file_processor.ProblemDataError as error:
+        # Помилки даних повертаються переліком, як і під час завантаження CSV-файлів
+        return {'event': 'error', 'message': f"{type(error).__name__}: {error}", 'errors': error.errors}
+    except Exception as error:  # Помилка завдання не повинна зупиняти робочий процес
+        return {'event': 'error', 'message': f"{type(error).__name__}: {error}"}
+
+
+# Робочий процес: модулі алгоритму імпортуються один раз під час запуску, далі процес виконує
+# завдання одне за одним, доки сервер не надішле None
+def _worker(conn):
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        kind, job_id, job = message
+        if kind == 'job':  # Скасування вже завершених завдань ігноруються
+            conn.send((job_id, _run_job(conn, job_id, job)))
+
+
+# Завдання на сервері: стан, усі його події (для спостерігачів, що під'єдналися пізніше)
+# та черги подій поточних спостерігачів
+class Job:
+    def __init__(self, job_id, spec):
+        self.id = job_id
+        self.spec = spec
+        self.status = 'queued'  # queued, running, done, failed або cancelled
+        self.events = []
+        self.watchers = set()
+        self.worker = None
+
+    @property
+    def finished(self):
+        return self.status in FINAL_EVENTS.values()
+
+    def publish(self, record):
+        record = dict(record, job_id=self.id)
+        self.events.append(record)
+        if record['event'] in FINAL_EVENTS:
+            self.status = FINAL_EVENTS[record['event']]
+        for queue in self.watchers:
+            queue.put_nowait(record)
+
+
+# Робочий процес з боку сервера
+class Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # Процес не демонічний: завдання з backend='process' чи островами запускають власні процеси
+        self.process = context.Process(target=_worker, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        self.job = None
+
+
+# Сервер завдань: приймає завдання через TCP (протокол JSON Lines), ставить їх у чергу
+# на пул робочих процесів і транслює клієнтам перебіг поколінь та результат.
+# Запити клієнта (по одному JSON-об'єкту на рядок):
+#   {"op": "submit", "job": {...}, "watch": true} — нове завдання (з watch — одразу транслювати події);
+#       job: "csv" або "data" (див. job_problem), "options" (JOB_OPTIONS), "views" (подання exporter.VIEWS)
+#   {"op": "watch", "job_id": "1"} — усі події завдання до його завершення
+#   {"op": "cancel", "job_id": "1"} — скасування завдання в черзі або під час виконання
+#   {"op": "status", "job_id": "1"} — стан завдання
+# Помилка завдання — подія "error" з повідомленням "message"; для помилок у даних задачі — також
+# перелік усіх знайдених проблем "errors"
+class JobServer:
+    def __init__(self, workers=None):
+        self.n_workers = workers or os.cpu_count() or 1
+        self.jobs = {}
+        self.queue = collections.deque()  # Завдання, що очікують на вільний процес
+        self.idle = []
+        self.workers = []
+        self.closing = False
+        self._ids = itertools.count(1)
+        self._context = multiprocessing.get_context('spawn')
+        # Потоки, що чекають на повідомлення робочих процесів (по одному на процес)
+        self._readers = ThreadPoolExecutor(self.n_workers)
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        for _ in range(self.n_workers):
+            self._add_worker()
+        self._server = await asyncio.start_server(self._handle_client, host, port, limit=LINE_LIMIT)
+        return self._server
+
+    def _add_worker(self):
+        worker = Worker(self._context)
+        self.workers.append(worker)
+        self.idle.append(worker)
+        asyncio.get_running_loop().create_task(self._read_worker(worker))
+
+    # Повідомлення робочого процесу: події поточного завдання; після завершальної події процес вільний
+    async def _read_worker(self, worker):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                job_id, record = await loop.run_in_executor(self._readers, worker.conn.recv)
+            except (EOFError, OSError):
+                break
+            job = self.jobs[job_id]
+            job.publish(record)
+            if job.finished:
+                job.worker = worker.job = None
+                self.idle.append(worker)
+                self._dispatch()
+
+        # Процес завершився: його завдання не буде виконано, а замість процесу запускається новий
+        self.workers.remove(worker)
+        if worker in self.idle:
+            self.idle.remove(worker)
+        if worker.job is not None:
+            worker.job.publish({'event': 'error', 'message': "Робочий процес аварійно завершився"})
+        if not self.closing:
+            self._add_worker()
+            self._dispatch()
+
+    # Передача завдань з черги вільним процесам
+    def _dispatch(self):
+        while self.queue and self.idle and not self.closing:
+            job = self.queue.popleft()
+            worker = self.idle.pop()
+            job.worker, worker.job = worker, job
+            job.status = 'running'
+            job.publish({'event': 'started'})
+            worker.conn.send(('job', job.id, job.spec))
+
+    def submit(self, spec):
+        views = spec.get('views', ['json'])
+        unknown = [view for view in views if view not in exporter.VIEWS]
+        if unknown:
+            raise ValueError(f"Невідомі подання: {', '.join(unknown)}")
+        if 'csv' not in spec and 'data' not in spec:
+            raise ValueError("Завдання має містити дані задачі: 'csv' або 'data'")
+        job = Job(str(next(self._ids)), spec)
+        self.jobs[job.id] = job
+        self.queue.append(job)
+        job.publish({'event': 'accepted', 'position': len(self.queue)})
+        self._dispatch()
+        return job
+
+    # Скасування: завдання з черги знімається одразу, виконуване — після поточного покоління
+    def cancel(self, job):
+        if job.status == 'queued':
+            self.queue.remove(job)
+            job.publish({'event': 'cancelled'})
+        elif job.status == 'running':
+            job.worker.conn.send(('cancel', job.id, None))
+
+    # Трансляція подій завдання клієнту: спочатку вже наявні, далі нові до завершення завдання
+    async def _watch(self, job, writer):
+        queue = asyncio.Queue()
+        for record in job.events:
+            queue.put_nowait(record)
+        if not job.finished:
+            job.watchers.add(queue)
+        try:
+            while True:
+                record = await queue.get()
+                await self._send(writer, record)
+                if record['event'] in FINAL_EVENTS:
+                    break
+        finally:
+            job.watchers.discard(queue)
+
+    @staticmethod
+    async def _send(writer, record):
+        writer.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    await self._handle_request(json.loads(line), writer)
+                except (ValueError, KeyError, TypeError) as error:
+                    await self._send(writer, {'event': 'error', 'message': f"{type(error).__name__}: {error}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Клієнт від'єднався
+        finally:
+            writer.close()
+
+    async def _handle_request(self, request, writer):
+        op = request['op']
+        if op == 'submit':
+            job = self.submit(request['job'])
+            if request.get('watch'):
+                await self._watch(job, writer)
+            else:
+                await self._send(writer, job.events[0])
+            return
+        job = self.jobs.get(request['job_id'])
+        if job is None:
+            raise KeyError(f"Немає завдання {request['job_id']}")
+        if op == 'watch':
+            await self._watch(job, writer)
+        elif op == 'cancel':
+            self.cancel(job)
+            await self._send(writer, {'event': 'status', 'job_id': job.id, 'status': job.status})
+        elif op == 'status':
+            await self._send(writer, {'event': 'status', 'job_id': job.id, 'status': job.status})
+        else:
+            raise ValueError(f"Невідома операція: {op}")
+
+    # Зупинка: виконувані завдання скасовуються, робочі процеси завершуються
+    async def close(self):
+        self.closing = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for job in list(self.queue):
+            self.cancel(job)
+        for worker in self.workers:
+            if worker.job is not None:
+                worker.conn.send(('cancel', worker.job.id, None))
+            worker.conn.send(None)
+        loop = asyncio.get_running_loop()
+        for worker in list(self.workers):
+            await loop.run_in_executor(None, worker.process.join)
+        self._readers.shutdown()
+
+
+# Клієнт: надсилає запит і повертає події відповіді (для submit з watch та watch — до завершення завдання)
+async def request(message, host='127.0.0.1', port=DEFAULT_PORT):
+    reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    try:
+        writer.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+        await writer.drain()
+        streaming = message['op'] == 'watch' or (message['op'] == 'submit' and message.get('watch'))
+        records = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            records.append(json.loads(line))
+            if not streaming or records[-1]['event'] in FINAL_EVENTS:
+                break
+        return records
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def serve(host, port, workers):
+    server = JobServer(workers)
+    tcp_server = await server.start(host, port)
+    print(f"Сервер завдань слухає {host}:{port}, робочих процесів: {server.n_workers}", flush=True)
+    try:
+        await tcp_server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальний сервер завдань складання розкладу')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int)  # Кількість робочих процесів (за замовчуванням — кількість ядер)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
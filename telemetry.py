@@ -0,0 +1,171 @@
+import contextlib
+import cProfile
+import csv
+import json
+import pstats
+import tracemalloc
+
+from calendar_model import CALENDAR
+
+# Етапи покоління, час яких потрапляє в запис телеметрії
+GENERATION_STEPS = ('selection', 'crossover', 'mutation', 'repair', 'evaluation')
+
+# Стовпці CSV-файлу з записами поколінь
+CSV_FIELDS = ['engine', 'island', 'phase', 'generation', 'elapsed',
+              'best_hard', 'mean_hard', 'worst_hard', 'best_soft', 'mean_soft', 'worst_soft',
+              'diversity', 'dropped_events'] + [f'seconds_{step}' for step in GENERATION_STEPS]
+
+
+# Кількість подій, які має містити повний розклад (так само, як у generate_initial_population)
+def expected_event_count(groups, subjects):
+    count = 0
+    for subj in subjects:
+        weeks = len(CALENDAR.subject_weeks(subj['WeekType']))
+        practicals = subj['NumPracticals']
+        if subj['RequiresSubgroups']:
+            practicals *= len(groups[subj['GroupID']]['Subgroups'])
+        count += weeks * (subj['NumLectures'] + practicals)
+    return count
+
+
+# Різноманітність популяції розкладів: середня частка подій, гени яких (слот, аудиторія, викладач)
+# відрізняються від генів тієї самої події в першому розкладі популяції
+def schedule_diversity(population):
+    if len(population) < 2:
+        return 0.0
+    reference = [(e.slot, e.auditorium_id, e.lecturer_id) for e in population[0].events]
+    total = 0.0
+    for schedule in population[1:]:
+        events = schedule.events
+        n = max(len(events), len(reference)) or 1
+        same = sum(1 for event, genes in zip(events, reference)
+                   if (event.slot, event.auditorium_id, event.lecturer_id) == genes)
+        total += 1 - same / n
+    return total / (len(population) - 1)
+
+
+# Запис телеметрії одного покоління зі списків (або масивів) жорстких і м'яких оцінок популяції
+def generation_record(engine, phase, generation, hard, soft, diversity, dropped_events, seconds, elapsed):
+    n = len(hard)
+    return {
+        'event': 'generation',
+        'engine': engine,
+        'phase': phase,  # 'hard' або 'soft' ('score' — острови, що оптимізують загальну оцінку)
+        'generation': generation,
+        'elapsed': round(elapsed, 6),  # Секунд від початку еволюції
+        'best_hard': int(min(hard)), 'mean_hard': float(sum(hard)) / n, 'worst_hard': int(max(hard)),
+        'best_soft': int(min(soft)), 'mean_soft': float(sum(soft)) / n, 'worst_soft': int(max(soft)),
+        'diversity': round(float(diversity), 6),
+        'dropped_events': int(dropped_events),  # Подій, що не вдалося розмістити, у всій популяції
+        'seconds': {step: round(seconds.get(step, 0.0), 6) for step in GENERATION_STEPS},
+    }
+
+
+# Передача запису всім спостерігачам (спостерігач — будь-який виклик з одним аргументом-записом)
+def notify(observers, record):
+    for observer in observers:
+        observer(record)
+
+
+# Вивід перебігу алгоритму в консоль (ті самі повідомлення, що й раніше друкувались у циклах поколінь)
+class ConsoleSink:
+    def __call__(self, record):
+        kind = record['event']
+        if kind == 'generation':
+            if record['phase'] == 'hard' and record['best_hard'] == 0:
+                print(f"Покоління: {record['generation']}, Найкращий розклад для жорстких обмежень знайдено.")
+            elif record['phase'] == 'soft':
+                print(f"Покоління: {record['generation']}, Оптимізація м'яких обмежень, "
+                      f"поточна найкраща оцінка: {record['best_soft']}")
+        elif kind == 'island':
+            print(f"Острів {record['island'] + 1}: стратегія {record['strategy'] or 'базова'}, "
+                  f"жорсткі порушення: {record['hard']}, м'які: {record['soft']}")
+        elif kind == 'part':
+            print(f"Частина {record['part'] + 1}: груп {record['groups']}, подій {record['events']}, "
+                  f"викладачів {record['lecturers']}, жорсткі порушення: {record['hard']}, м'які: {record['soft']}")
+        elif kind == 'local_search':
+            print(f"Локальний пошук: оцінка {record['before']} -> {record['after']}")
+        elif kind == 'stagnation':
+            print(f"Покоління: {record['generation']}, застій, рівень {record['level']}")
+        elif kind == 'stop':
+            reason = 'ліміт часу' if record['reason'] == 'time_limit' else 'застій'
+            print(f"Покоління: {record['generation']}, етап {record['phase']} зупинено: {reason}")
+
+    def close(self):
+        pass
+
+
+# Запис усіх записів телеметрії у файл JSON Lines (один JSON-об'єкт на рядок)
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Запис поколінь у CSV-файл (час етапів розгортається в окремі стовпці seconds_*)
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.DictWriter(self.file, CSV_FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def __call__(self, record):
+        if record['event'] != 'generation':
+            return  # Інші записи не мають фіксованого набору стовпців
+        row = dict(record)
+        for step, seconds in record['seconds'].items():
+            row[f'seconds_{step}'] = seconds
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Файловий приймач за розширенням шляху: .csv — CsvSink, інакше JsonlSink
+def file_sink(path):
+    return CsvSink(path) if path.lower().endswith('.csv') else JsonlSink(path)
+
+
+# Профілювання блоку коду: cProfile (статистика у файл profile_path або топ-функції в консоль)
+# та, за бажанням, tracemalloc (пікова пам'ять і рядки з найбільшими виділеннями).
+# Робота в процесах-виконавцях (backend='process', острови) не профілюється
+@contextlib.contextmanager
+def profiling(profile_path=None, trace_memory=False, top=15):
+    if trace_memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        stats = pstats.Stats(profiler).sort_stats('cumulative')
+        if profile_path:
+            stats.dump_stats(profile_path)
+            print(f"\nПрофіль збережено у {profile_path}")
+        else:
+            stats.print_stats(top)
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"\nПікова пам'ять (tracemalloc): {peak / 2 ** 20:.1f} MB")
+            for stat in snapshot.statistics('lineno')[:top]:
+                print(stat)
@@ -0,0 +1,49 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Модулі проєкту лежать у корені репозиторію
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import randomizer  # noqa: E402
+from genetic_algo import generate_initial_population  # noqa: E402
+
+
+# Невелика випадкова задача (групи, дисципліни, викладачі, аудиторії), відтворювана за seed;
+# стан модуля random після побудови відновлюється
+def make_problem(seed=1, n_groups=2, subjects_per_group=2, n_lecturers=4, n_auditoriums=4):
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        groups = randomizer.generate_random_groups(n_groups)
+        subjects = randomizer.generate_random_subjects(groups, subjects_per_group)
+        lecturers = randomizer.generate_random_lecturers(n_lecturers, subjects)
+        auditoriums = randomizer.generate_random_auditoriums(n_auditoriums)
+    finally:
+        random.setstate(state)
+    return groups, subjects, lecturers, auditoriums
+
+
+# Оцінка розкладу повним перерахунком (на копії, тож лічильники самого розкладу не змінюються)
+def recount(schedule):
+    fresh = schedule.copy()
+    fresh.fitness(schedule.groups, schedule.lecturers, schedule.auditoriums)
+    return fresh.hard_constraints_violations, fresh.soft_constraints_score, fresh.gaps, fresh.fingerprint
+
+
+# Поточні (інкрементальні) лічильники розкладу в тому ж порядку, що й recount
+def counters(schedule):
+    return (schedule.hard_constraints_violations, schedule.soft_constraints_score, schedule.gaps,
+            schedule.fingerprint)
+
+
+@pytest.fixture
+def problem():
+    return make_problem()
+
+
+@pytest.fixture
+def population(problem):
+    return generate_initial_population(6, *problem, rng=random.Random(7))
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from genetic_algo import STAGNATION_MUTATION, STAGNATION_STOP, Stagnation, genetic_algorithm
+
+
+def test_stagnation_levels_rise_and_reset():
+    monitor = Stagnation(2)
+    levels = [monitor.update(value) for value in (5, 5, 5, 5, 5)]
+    assert levels == [None, None, 1, None, 2]
+    assert monitor.mutation() == STAGNATION_MUTATION[2]
+    assert monitor.update(4) == 0 and monitor.level == 0
+    for _ in range(10):
+        monitor.update(4)
+    assert monitor.level == STAGNATION_STOP
+
+
+def test_unbounded_run_needs_a_limit(problem):
+    with pytest.raises(ValueError):
+        genetic_algorithm(*problem, generations=None, observers=[])
+
+
+@pytest.mark.parametrize('engine', ['python', 'numpy'])
+def test_time_limit_stops_an_unbounded_run(problem, engine):
+    stats, records = {}, []
+    start = time.perf_counter()
+    best = genetic_algorithm(*problem, generations=None, time_limit=0.5, engine=engine, seed=1,
+                             observers=[records.append], stats=stats)
+    assert time.perf_counter() - start < 5
+    assert best is not None
+    assert stats['stop_reason'] in ('time_limit', 'solved')
+    if stats['stop_reason'] == 'time_limit':
+        assert records[-1]['event'] == 'stop' and records[-1]['reason'] == 'time_limit'
+
+
+def test_stagnation_ends_an_unbounded_run(problem):
+    stats, records = {}, []
+    best = genetic_algorithm(*problem, generations=None, stagnation=1, seed=1, observers=[records.append],
+                             stats=stats)
+    assert best is not None
+    assert stats['stop_reason'] in ('stagnation', 'solved')
+    # Рівень 0 повідомляється, коли покращення скидає застій
+    levels = [record['level'] for record in records if record['event'] == 'stagnation']
+    assert set(levels) <= set(range(STAGNATION_STOP + 1))
+    if stats['stop_reason'] == 'stagnation':
+        assert levels[-1] == STAGNATION_STOP and records[-1]['reason'] == 'stagnation'
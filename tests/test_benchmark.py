@@ -0,0 +1,28 @@
+import benchmark
+
+
+def test_instances_are_reproducible():
+    first = benchmark.generate_instance('small', 3)
+    second = benchmark.generate_instance('small', 3)
+    assert first == second
+    groups, subjects, lecturers, auditoriums = first
+    assert len(groups) == benchmark.LADDER['small']['groups']
+    assert len(lecturers) == benchmark.LADDER['small']['lecturers']
+
+
+def test_run_case_reports_the_compared_metrics():
+    result = benchmark.run_case('small', 1, {'generations': 1})
+    assert set(benchmark.COMPARED_METRICS) <= set(result)
+    assert result['evaluations'] > 0
+    assert 'initial_population' in result['phase_seconds']
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {'results': [{'size': 'small', 'wall_seconds': 10.0, 'evaluations_per_second': 100.0,
+                             'peak_memory_mb': 50.0, 'hard': 10, 'soft': 20}]}
+    same = [dict(baseline['results'][0], wall_seconds=11.0, evaluations_per_second=90.0)]
+    assert benchmark.compare(same, baseline) == []
+    worse = [dict(baseline['results'][0], wall_seconds=13.0, evaluations_per_second=70.0, hard=None)]
+    assert benchmark.compare(worse, baseline) == [
+        ('small', 'wall_seconds', 10.0, 13.0), ('small', 'evaluations_per_second', 100.0, 70.0)]
+    assert benchmark.compare([dict(worse[0], size='medium')], baseline) == []
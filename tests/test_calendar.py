@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from calendar_model import CALENDAR, Calendar, calendar_from_config, calendar_scope
+from genetic_algo import generate_initial_population
+from problem import compile_problem
+
+
+def test_slot_arithmetic_round_trips():
+    calendar = Calendar(weeks=['A', 'B', 'C'], days_per_week=6, lessons_per_day=5)
+    assert calendar.n_slots == 3 * 6 * 5
+    for slot in range(calendar.n_slots):
+        week, day, lesson = calendar.week(slot), calendar.day(slot), calendar.lesson(slot)
+        assert calendar.slot(week, day, lesson) == slot and calendar.slot_week[slot] == week
+        assert calendar.labels[slot] == f"{calendar.weeks[week]} - day {day + 1}, lesson {lesson + 1}"
+
+
+def test_key_follows_settings():
+    assert Calendar().key == Calendar().key
+    assert Calendar().key != Calendar(lessons_per_day=5).key
+    assert Calendar().key != Calendar(blocked=[(None, 4, 3)]).key
+
+
+def test_config_blocks_slots_by_week_type_and_day():
+    calendar = calendar_from_config({'days_per_week': 5, 'blocked': [{'week': 'ODD', 'day': 5},
+                                                                     {'day': 1, 'lesson': 1}]})
+    odd = calendar.weeks.index('ODD')
+    expected = {calendar.slot(odd, 4, lesson) for lesson in range(calendar.lessons_per_day)}
+    expected |= {calendar.slot(week, 0, 0) for week in range(len(calendar.weeks))}
+    assert set(calendar.blocked) == expected
+    assert all(not calendar.week_masks[week] & calendar.blocked_mask for week in calendar.weeks)
+
+
+@pytest.mark.parametrize('settings', [dict(weeks=['A', 'A']), dict(week_types=['Both', 'ODD']),
+                                      dict(lessons_per_day=13), dict(blocked=[(0, 7, 0)])])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        Calendar(**settings)
+
+
+def test_config_rejects_unknown_blocked_week():
+    with pytest.raises(ValueError):
+        calendar_from_config({'blocked': [{'week': 'W9'}]})
+
+
+def test_generated_events_avoid_blocked_slots(problem):
+    with calendar_scope(Calendar(blocked=[(None, None, 0), (None, 2, None)])) as calendar:
+        schedule = generate_initial_population(1, *problem, rng=random.Random(1))[0]
+        assert schedule.events and all(not calendar.blocked_mask >> event.slot & 1 for event in schedule.events)
+
+
+def test_calendar_scope_restores_the_calendar():
+    key, labels = CALENDAR.key, CALENDAR.labels
+    with pytest.raises(RuntimeError), calendar_scope(Calendar(lessons_per_day=6)) as calendar:
+        assert calendar is CALENDAR and CALENDAR.lessons_per_day == 6
+        raise RuntimeError
+    assert CALENDAR.key == key and CALENDAR.labels is labels
+
+
+def test_compiled_problem_is_rebuilt_for_another_calendar(problem):
+    compiled = compile_problem(*problem)
+    assert compile_problem(*problem) is compiled
+    with calendar_scope(Calendar(lessons_per_day=6)):
+        other = compile_problem(*problem)
+        assert other is not compiled and other.lessons_per_day == 6
+    assert compile_problem(*problem).calendar_key == CALENDAR.key
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+import checkpoint
+from genetic_algo import generate_initial_population, genetic_algorithm
+
+
+# Гени розкладу для порівняння (шаблон події та її розміщення)
+def genes(schedule):
+    return [(event.subject_id, event.event_type, event.week_type, tuple(event.group_ids), event.slot,
+             event.lecturer_id, event.auditorium_id) for event in schedule.events]
+
+
+def test_population_round_trip(problem, population):
+    tables, sizes, values = checkpoint.encode_population(population)
+    decoded = checkpoint.decode_population(tables, sizes, values)
+    assert [genes(schedule) for schedule in decoded] == [genes(schedule) for schedule in population]
+
+
+def test_checkpoint_round_trip(tmp_path, problem, population):
+    path = str(tmp_path / 'run.ckpt')
+    rng = random.Random(5)
+    fingerprint = checkpoint.problem_fingerprint(*problem)
+    checkpoint.save_checkpoint(path, population, 'soft', 7, rng, fingerprint)
+    state = checkpoint.load_checkpoint(path, *problem)
+    assert (state['phase'], state['generation']) == ('soft', 7)
+    assert state['rng_state'] == rng.getstate()
+    assert [genes(schedule) for schedule in state['population']] == [genes(schedule) for schedule in population]
+    # Лічильники відновлених розкладів перераховуються під час прив'язки до даних
+    assert [schedule.score() for schedule in state['population']] == [schedule.score() for schedule in population]
+
+
+def test_checkpoint_rejects_changed_problem(tmp_path, problem, population):
+    path = str(tmp_path / 'run.ckpt')
+    checkpoint.save_checkpoint(path, population, 'hard', 1, random.Random(), checkpoint.problem_fingerprint(*problem))
+    groups, subjects, lecturers, auditoriums = problem
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(path, groups, subjects[1:], lecturers, auditoriums)
+    checkpoint.save_schedule(path, population[0])
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(path, *problem)
+
+
+def test_resume_repeats_the_uninterrupted_run(tmp_path, problem):
+    path = str(tmp_path / 'run.ckpt')
+    options = dict(generations=6, seed=3, observers=[], checkpoint_interval=2)
+    uninterrupted = genetic_algorithm(*problem, checkpoint=path, **options)
+    state = checkpoint.load_checkpoint(path, *problem)
+    assert state['generation'] > 0
+    resumed = genetic_algorithm(*problem, resume=path, **options)
+    assert genes(resumed) == genes(uninterrupted)
+    assert resumed.score() == uninterrupted.score()
+
+
+def test_saved_schedule_keeps_problem_data(tmp_path, problem):
+    path = str(tmp_path / 'best.ckpt')
+    schedule = generate_initial_population(1, *problem, rng=random.Random(1))[0]
+    checkpoint.save_schedule(path, schedule, problem)
+    assert genes(checkpoint.load_schedule(path)) == genes(schedule)
+    assert checkpoint.load_problem_data(path) == tuple(problem)
@@ -0,0 +1,51 @@
+import random
+
+from conftest import counters, recount
+from constructive import constructive_population
+from genetic_algo import generate_initial_population, lesson_count
+
+
+# Задача з n_groups груп по n_subjects дисциплін; кожен викладач може вести половину дисциплін
+def _uniform_problem(n_groups, n_subjects, n_lecturers, n_auditoriums, n_lectures, n_practicals, max_hours):
+    groups = {f'G{g}': {'NumStudents': 30, 'Subgroups': ['1', '2']} for g in range(n_groups)}
+    subjects = [{'SubjectID': f'S{g}_{s}', 'SubjectName': f'Предмет {s}', 'GroupID': f'G{g}',
+                 'NumLectures': n_lectures, 'NumPracticals': n_practicals, 'RequiresSubgroups': s % 2 == 0,
+                 'WeekType': ['Both', 'EVEN', 'ODD'][s % 3]}
+                for g in range(n_groups) for s in range(n_subjects)]
+    subject_ids = [subj['SubjectID'] for subj in subjects]
+    lecturers = {f'L{i}': {'LecturerName': f'Викладач {i}', 'SubjectsCanTeach': subject_ids[i % 2::2],
+                           'TypesCanTeach': ['Лекція', 'Практика'], 'MaxHoursPerWeek': max_hours}
+                 for i in range(n_lecturers)}
+    auditoriums = {f'A{i}': 40 for i in range(n_auditoriums)}
+    return groups, subjects, lecturers, auditoriums
+
+
+def test_constructive_schedules_place_every_lesson(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    lessons = lesson_count(*problem)
+    for schedule in constructive_population(3, *problem, rng=random.Random(1)):
+        assert len(schedule.events) == lessons
+        assert schedule.missing == 0
+        assert counters(schedule) == recount(schedule)
+
+
+def test_random_schedules_count_unplaced_lessons(problem):
+    lessons = lesson_count(*problem)
+    for schedule in generate_initial_population(3, *problem, rng=random.Random(1)):
+        assert schedule.missing == lessons - len(schedule.events)
+        assert counters(schedule) == recount(schedule)
+
+
+def test_easy_problem_is_constructed_without_violations():
+    problem = _uniform_problem(4, 3, 4, 5, 3, 3, 40)
+    for schedule in constructive_population(5, *problem, rng=random.Random(2)):
+        assert schedule.hard_constraints_violations == 0
+
+
+# На тісній, але майже допустимій задачі конструктивні розклади мають менше жорстких порушень
+def test_constructive_seeding_beats_random_seeding():
+    problem = _uniform_problem(6, 4, 8, 6, 2, 3, 30)
+    constructive = constructive_population(5, *problem, rng=random.Random(3))
+    randomized = generate_initial_population(5, *problem, rng=random.Random(3))
+    mean = lambda population: sum(s.hard_constraints_violations for s in population) / len(population)  # noqa: E731
+    assert mean(constructive) < mean(randomized)
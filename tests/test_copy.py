@@ -0,0 +1,40 @@
+import random
+
+from conftest import counters, recount
+from genetic_algo import herbivore_smoothing, mutate
+
+
+def _genes(schedule):
+    return [(event.slot, event.auditorium_id, event.lecturer_id) for event in schedule.events]
+
+
+def test_copy_shares_templates_but_not_genes(population):
+    schedule = population[0]
+    copy = schedule.copy()
+    assert _genes(copy) == _genes(schedule)
+    assert counters(copy) == counters(schedule)
+    for original, copied in zip(schedule.events, copy.events):
+        assert copied is not original
+        assert copied.template is original.template
+    assert copy.occupancy is not schedule.occupancy
+
+
+def test_mutating_a_copy_leaves_the_original_intact(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    genes, scores = _genes(schedule), counters(schedule)
+    copy = schedule.copy()
+    mutate(copy, lecturers, auditoriums, intensity=0.5, rng=random.Random(1))
+    assert _genes(copy) != genes
+    assert (_genes(schedule), counters(schedule)) == (genes, scores)
+    assert counters(schedule) == recount(schedule)
+    assert counters(copy) == recount(copy)
+
+
+def test_herbivore_smoothing_copies_the_best_schedule(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    best = population[0]
+    genes = _genes(best)
+    smoothed = herbivore_smoothing(population[1:4], best, lecturers, auditoriums, random.Random(2))
+    assert _genes(best) == genes
+    assert all(schedule is not best and counters(schedule) == recount(schedule) for schedule in smoothed)
@@ -0,0 +1,62 @@
+import collections
+import random
+
+import pytest
+
+import checkpoint
+from conftest import counters, recount
+from genetic_algo import (CROSSOVERS, SELECTIONS, aligned_lessons, crossover, genetic_algorithm,
+                          truncation_pairs)
+
+
+# Заняття розкладу з кількістю повторень (за шаблоном події)
+def lessons(schedule):
+    return collections.Counter(id(event.template) for event in schedule.events)
+
+
+def test_aligned_lessons_cover_every_event(population):
+    schedule = population[0]
+    aligned = aligned_lessons(schedule)
+    assert len(aligned) == len(schedule.events)
+    assert {id(event) for event in aligned.values()} == {id(event) for event in schedule.events}
+
+
+@pytest.mark.parametrize('operator', sorted(CROSSOVERS))
+def test_crossover_neither_duplicates_nor_loses_lessons(population, operator):
+    rng = random.Random(4)
+    parent1, parent2 = population[0].copy(), population[1].copy()
+    # Другий з батьків втратив кілька занять: нащадки беруть їх від першого
+    for event in rng.sample(parent2.events, 3):
+        parent2.events.remove(event)
+    parent2.fitness(parent2.groups, parent2.lecturers, parent2.auditoriums)
+    union = lessons(parent1) | lessons(parent2)
+    for _ in range(5):
+        for child in crossover(parent1, parent2, operator, rng):
+            assert lessons(child) == union
+            assert counters(child) == recount(child)
+
+
+@pytest.mark.parametrize('selection', sorted(SELECTIONS))
+def test_selection_pairs_are_distinct_ranks(selection):
+    rng = random.Random(1)
+    pairs = SELECTIONS[selection](20, 200, rng)
+    assert len(pairs) == 200
+    assert all(i != j and 0 <= i < 20 and 0 <= j < 20 for i, j in pairs)
+    assert max(max(pair) for pair in truncation_pairs(20, 200, rng, n_best=5)) < 5
+
+
+def test_elites_keep_the_best_score(problem):
+    records = []
+    genetic_algorithm(*problem, generations=8, seed=3, elites=1, observers=[records.append])
+    # Обидва етапи ранжують спершу за жорсткими порушеннями, тож еліта не дає їм зрости
+    best = [record['best_hard'] for record in records if record['event'] == 'generation']
+    assert len(best) > 1 and best == sorted(best, reverse=True)
+
+
+def test_run_without_generations_returns_the_best_schedule(tmp_path, problem, population):
+    assert genetic_algorithm(*problem, generations=0, seed=1, observers=[]) is not None
+    # Контрольна точка після останнього покоління: продовження не виконує жодного покоління
+    path = str(tmp_path / 'run.ckpt')
+    checkpoint.save_checkpoint(path, population, 'soft', 2, random.Random(1), checkpoint.problem_fingerprint(*problem))
+    best = genetic_algorithm(*problem, generations=2, observers=[], resume=path)
+    assert best.score() == min(schedule.score() for schedule in population)
@@ -0,0 +1,59 @@
+import pytest
+
+import decomposition
+from calendar_model import calendar_scope
+from conftest import counters, recount
+from file_processor import load_problem
+from genetic_algo import generation_index, lesson_count
+from instance_generator import generate_instance
+
+
+# Задача з departments кафедр без міжкафедральних призначень (незалежні компоненти)
+@pytest.fixture
+def departments(tmp_path):
+    generate_instance(str(tmp_path), 8, subjects_per_group=2, auditoriums=4, departments=2,
+                      cross_department_share=0.0, seed=4)
+    with calendar_scope():
+        problem = load_problem(str(tmp_path))
+        yield problem.groups, problem.subjects, problem.lecturers, problem.auditoriums
+
+
+def test_components_do_not_share_groups_or_lecturers(departments):
+    found = decomposition.components(*departments)
+    assert len(found) >= 2
+    groups, subjects, lecturers, auditoriums = departments
+    assert sorted(gid for part in found for gid in part.groups) == sorted(
+        {subj['GroupID'] for subj in subjects})
+    assert sum(len(part.lecturers) for part in found) == len({lid for part in found for lid in part.lecturers})
+    assert sum(part.events for part in found) == lesson_count(*departments)
+
+
+def test_packing_balances_events():
+    parts = []
+    for events in (9, 7, 5, 3, 2, 1):
+        part = decomposition.SubProblem()
+        part.subjects, part.events = [{}], events
+        parts.append(part)
+    packed = decomposition.pack_components(parts, 2)
+    assert sorted(part.events for part in packed) == [13, 14]
+    assert len(decomposition.pack_components(parts[:1], 4)) == 1
+
+
+def test_whole_component_drops_no_assignments(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    index = generation_index(lecturers, auditoriums)
+    found = decomposition.components(*problem)
+    assert decomposition.dropped_share(found, index) == 0.0
+    pieces = decomposition.split_component(found[0], 2, groups, index) if len(found) == 1 else found
+    assert 0.0 <= decomposition.dropped_share(pieces, index) <= 1.0
+
+
+def test_merged_schedule_repairs_room_clashes(departments):
+    stats = {}
+    merged = decomposition.solve(*departments, workers=1, parts=2, seed=1, stats=stats, observers=[],
+                                 generations=3)
+    assert len(stats['parts']) == 2 and stats['shared_lecturers'] == 0
+    assert stats['merge_conflicts'] > 0  # Частини ділять чотири аудиторії
+    assert counters(merged) == recount(merged)
+    # Ремонт після об'єднання усуває частину конфліктів і не додає нових порушень
+    assert merged.hard_constraints_violations < sum(part['hard'] for part in stats['parts']) + stats['merge_conflicts']
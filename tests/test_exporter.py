@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+import os
+
+import exporter
+
+
+def test_export_writes_every_view(tmp_path, problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    paths = exporter.export(schedule, groups, lecturers, auditoriums, tuple(exporter.VIEWS), str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == list(exporter.VIEWS.values())
+
+    with open(tmp_path / exporter.VIEWS['csv'], encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(schedule.events)
+    assert set(rows[0]) == set(exporter.CSV_FIELDS)
+
+    with open(tmp_path / exporter.VIEWS['json'], encoding='utf-8') as f:
+        document = json.load(f)
+    assert list(document['groups']) == list(groups)
+    assert sum(len(events) for events in document['groups'].values()) == sum(
+        len(event.group_ids) for event in schedule.events)
+
+    with open(tmp_path / exporter.VIEWS['ical'], 'rb') as f:
+        lines = f.read().split(b'\r\n')
+    assert lines.count(b'BEGIN:VEVENT') == len(schedule.events)
+    assert all(len(line) <= 75 for line in lines)
+
+
+def test_console_gets_the_text_table_only_when_given(tmp_path, problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    console = io.StringIO()
+    exporter.export(population[0], groups, lecturers, auditoriums, views=('text',), directory=str(tmp_path),
+                    console=console)
+    with open(tmp_path / exporter.VIEWS['text'], encoding='utf-8') as f:
+        assert console.getvalue() == f.read()
+    assert exporter.export(population[0], groups, lecturers, auditoriums, views=(), console=None) == []
+
+
+def test_render_matches_exported_files(tmp_path, problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    views = ('text', 'groups', 'lecturers', 'auditoriums', 'csv', 'json')
+    rendered = exporter.render(population[0], groups, lecturers, auditoriums, views)
+    exporter.export(population[0], groups, lecturers, auditoriums, views, str(tmp_path))
+    for view in views:
+        with open(tmp_path / exporter.VIEWS[view], encoding='utf-8', newline='') as f:
+            assert f.read() == rendered[view]
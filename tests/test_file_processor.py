@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pytest
+
+import file_processor
+from calendar_model import calendar_scope
+from file_processor import ProblemDataError, load_problem, validate_problem
+
+DATASOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasource')
+
+
+# Копія каталогу datasource, у якому можна змінювати файли
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / 'datasource'
+    shutil.copytree(DATASOURCE, directory)
+    return directory
+
+
+def test_valid_problem_has_no_errors(problem):
+    assert validate_problem(*problem) == []
+
+
+def test_validation_collects_every_error(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    subjects = [dict(subjects[0], GroupID='G9', NumLectures=-1)] + subjects[1:]
+    lecturers = dict(lecturers, L9={'LecturerName': 'X', 'SubjectsCanTeach': ['S9'], 'TypesCanTeach': ['Семінар'],
+                                    'MaxHoursPerWeek': 4})
+    auditoriums = dict(auditoriums, A9=0)
+    errors = validate_problem(groups, subjects, lecturers, auditoriums)
+    assert len(errors) == 5
+    assert any('G9' in error for error in errors) and any('S9' in error for error in errors)
+
+
+def test_structure_errors_are_reported_before_values(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    subjects = [{key: value for key, value in subjects[0].items() if key != 'NumLectures'}] + subjects[1:]
+    assert validate_problem(groups, subjects, lecturers, auditoriums) == [
+        f"Дисципліна {subjects[0]['SubjectID']}: відсутнє поле NumLectures"]
+    assert validate_problem(groups, {}, lecturers, auditoriums) == ["subjects: очікується list"]
+
+
+def test_bad_csv_row_names_file_and_line(source):
+    path = source / 'auditoriums.csv'
+    path.write_text(path.read_text(encoding='utf-8') + 'A99,many\n', encoding='utf-8')
+    with calendar_scope(), pytest.raises(ProblemDataError) as error:
+        load_problem(str(source))
+    (message,) = error.value.errors
+    assert str(path) in message and 'ValueError' in message
+
+
+def test_invalid_data_raises_with_all_errors(source):
+    path = source / 'groups.csv'
+    lines = path.read_text(encoding='utf-8').splitlines()
+    lines[1] = lines[1].split(',')[0] + ',0,1;2'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    with calendar_scope(), pytest.raises(ProblemDataError) as error:
+        load_problem(str(source))
+    assert error.value.errors == [f"Група {lines[1].split(',')[0]}: кількість студентів має бути додатною"]
+
+
+def test_cache_is_reused_until_sources_change(source, tmp_path, monkeypatch):
+    cache = tmp_path / 'cache'
+    with calendar_scope():
+        first = load_problem(str(source), str(cache))
+        assert len(os.listdir(cache)) == 1
+        # Повторний запуск з тими самими файлами не розбирає CSV
+        monkeypatch.setattr(file_processor, 'load_groups', None)
+        cached = load_problem(str(source), str(cache))
+        assert (cached.groups, cached.subjects) == (first.groups, first.subjects)
+        monkeypatch.undo()
+        path = source / 'auditoriums.csv'
+        path.write_text(path.read_text(encoding='utf-8') + 'A99,40\n', encoding='utf-8')
+        changed = load_problem(str(source), str(cache))
+    assert 'A99' in changed.auditoriums and len(os.listdir(cache)) == 2
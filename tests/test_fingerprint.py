@@ -0,0 +1,55 @@
+import pickle
+import random
+
+from genetic_algo import FitnessCache, crossover, select_top_n
+
+
+def test_fingerprint_ignores_event_order(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    shuffled = schedule.copy()
+    random.Random(1).shuffle(shuffled.events)
+    shuffled.fitness(groups, lecturers, auditoriums)
+    assert shuffled.fingerprint == schedule.fingerprint
+
+
+def test_fingerprint_follows_gene_changes(population):
+    schedule = population[0]
+    before = schedule.fingerprint
+    event = schedule.events[0]
+    slot = event.slot
+    schedule.move_event(event, slot=next(other.slot for other in schedule.events if other.slot != slot))
+    assert schedule.fingerprint != before
+    schedule.move_event(event, slot=slot)
+    assert schedule.fingerprint == before
+
+
+def test_fingerprint_survives_copy_and_pickle(population):
+    schedule = population[0]
+    assert schedule.copy().fingerprint == schedule.fingerprint
+    assert pickle.loads(pickle.dumps(schedule)).fingerprint == schedule.fingerprint
+
+
+def test_fitness_cache_evicts_least_recently_used():
+    cache = FitnessCache(maxsize=2)
+    cache.put(1, (0, 1))
+    cache.put(2, (0, 2))
+    assert cache.get(1) == (0, 1)  # 1 стає нещодавно використаним, тож витісняється 2
+    cache.put(3, (0, 3))
+    assert cache.get(2) is None and cache.get(3) == (0, 3)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_select_top_n_prefers_distinct_schedules(population):
+    best = min(population, key=lambda sched: sched.score())
+    candidates = population + [best.copy() for _ in range(3)]
+    selected = select_top_n(candidates, lambda sched: sched.score(), len(population), unique=True)
+    assert len({sched.fingerprint for sched in selected}) == len({sched.fingerprint for sched in population})
+    padded = select_top_n(candidates, lambda sched: sched.score(), len(candidates), unique=True)
+    assert [sched.fingerprint for sched in padded[-3:]] == [best.fingerprint] * 3
+
+
+def test_identical_parents_give_copies(population):
+    parent = population[0]
+    child1, child2 = crossover(parent, parent.copy(), rng=random.Random(2))
+    assert child1 is not parent and child1.fingerprint == child2.fingerprint == parent.fingerprint
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from calendar_model import Calendar, calendar_scope
+from conftest import counters, recount
+from genetic_algo import generate_initial_population
+
+
+# «Вікна» маски перебором: вільні пари між першою та останньою зайнятою парою кожного дня
+def brute_gaps(calendar, mask):
+    gaps = 0
+    for day in range(calendar.n_slots // calendar.lessons_per_day):
+        lessons = [lesson for lesson in range(calendar.lessons_per_day)
+                   if mask >> (day * calendar.lessons_per_day + lesson) & 1]
+        if lessons:
+            gaps += lessons[-1] - lessons[0] + 1 - len(lessons)
+    return gaps
+
+
+@pytest.mark.parametrize('lessons_per_day', [1, 2, 4, 5, 7])
+def test_mask_gaps_matches_brute_force(lessons_per_day):
+    calendar = Calendar(days_per_week=3, lessons_per_day=lessons_per_day)
+    rng = random.Random(lessons_per_day)
+    masks = list(range(1 << lessons_per_day)) + [rng.getrandbits(calendar.n_slots) for _ in range(200)]
+    for mask in masks:
+        assert calendar.mask_gaps(mask) == brute_gaps(calendar, mask)
+
+
+def test_gap_change_is_the_difference_of_day_gaps():
+    calendar = Calendar(lessons_per_day=4)
+    for mask in range(1 << 4):
+        for lesson in range(4):
+            assert calendar.gap_change[mask][lesson] == (calendar.mask_gaps(mask)
+                                                         - calendar.mask_gaps(mask ^ (1 << lesson)))
+
+
+def test_gaps_counter_matches_recount_on_other_calendars(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    for calendar in (Calendar(days_per_week=3, lessons_per_day=6), Calendar(weeks=['W1'], lessons_per_day=3)):
+        with calendar_scope(calendar):
+            schedule = generate_initial_population(1, *problem, rng=random.Random(4))[0]
+            rng = random.Random(5)
+            for _ in range(100):
+                event = rng.choice(schedule.events)
+                schedule.move_event(event, slot=rng.randrange(calendar.n_slots))
+                assert counters(schedule) == recount(schedule)
+            assert schedule.gaps > 0
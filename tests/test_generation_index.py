@@ -0,0 +1,49 @@
+import random
+
+from genetic_algo import GenerationIndex, generate_initial_population, generation_index, group_size, sample_free
+
+
+def test_eligible_lecturers_and_auditoriums_match_brute_force(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    index = GenerationIndex(lecturers, auditoriums)
+    for subj in subjects:
+        for event_type in ('Лекція', 'Практика'):
+            expected = [lid for lid, lecturer in lecturers.items()
+                        if subj['SubjectID'] in lecturer['SubjectsCanTeach'] and event_type in lecturer['TypesCanTeach']]
+            assert list(index.eligible_lecturers.get((subj['SubjectID'], event_type), ())) == expected
+    for size in (0, 25, 35, 40, 51):
+        assert sorted(index.suitable_auditoriums(size)) == sorted(
+            aid for aid, capacity in auditoriums.items() if capacity >= size)
+
+
+def test_index_is_reused_for_the_same_data(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    assert generation_index(lecturers, auditoriums) is generation_index(lecturers, auditoriums)
+    assert generation_index(dict(lecturers), auditoriums) is not generation_index(lecturers, auditoriums)
+
+
+def test_generated_events_are_qualified_and_conflict_free(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    index = generation_index(lecturers, auditoriums)
+    schedule = generate_initial_population(1, *problem, rng=random.Random(4))[0]
+    seen = {}
+    for event in schedule.events:
+        assert event.lecturer_id in index.eligible_lecturers[(event.subject_id, event.event_type)]
+        assert auditoriums[event.auditorium_id] >= group_size(groups, event.group_ids, event.subgroup_ids)
+        for group_id in event.group_ids:
+            subgroup = (event.subgroup_ids or {}).get(group_id)
+            seen.setdefault((event.slot, 'group', group_id), []).append(subgroup)
+        for key in ((event.slot, 'lecturer', event.lecturer_id), (event.slot, 'auditorium', event.auditorium_id)):
+            assert key not in seen
+            seen[key] = True
+    # У слоті група має або одне спільне заняття, або заняття різних підгруп
+    for key, subgroups in seen.items():
+        if key[1] == 'group':
+            assert len(subgroups) == 1 or (None not in subgroups and len(set(subgroups)) == len(subgroups))
+
+
+def test_sample_free_returns_a_free_candidate_or_none():
+    rng = random.Random(1)
+    assert all(sample_free(range(10), lambda x: x in (3, 7), rng) in (3, 7) for _ in range(50))
+    assert sample_free(range(10), lambda x: False, rng) is None
+    assert {sample_free(range(4), lambda x: True, rng) for _ in range(200)} == {0, 1, 2, 3}
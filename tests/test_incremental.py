@@ -0,0 +1,56 @@
+import random
+
+from conftest import counters, recount
+from genetic_algo import Schedule, crossover, mutate
+
+
+def test_initial_population_scores_match_full_recount(population):
+    for schedule in population:
+        assert counters(schedule) == recount(schedule)
+
+
+def test_moves_and_swaps_keep_scores_current(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    rng = random.Random(3)
+    schedule = population[0]
+    for _ in range(300):
+        event, other = rng.sample(schedule.events, 2)
+        kind = rng.randrange(4)
+        if kind == 0:
+            schedule.move_event(event, slot=other.slot)
+        elif kind == 1:
+            schedule.move_event(event, auditorium_id=rng.choice(list(auditoriums)),
+                                lecturer_id=rng.choice(list(lecturers)))
+        elif kind == 2:
+            schedule.swap_events(event, other, rng.choice(['slot', 'auditorium_id', 'lecturer_id']))
+        else:
+            mutate(schedule, lecturers, auditoriums, rng=rng)
+        assert counters(schedule) == recount(schedule)
+
+
+def test_children_and_parents_keep_scores_current(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    rng = random.Random(5)
+    parents = [schedule.copy() for schedule in population[:2]]
+    before = [counters(parent) for parent in parents]
+    child1, child2 = crossover(parents[0], parents[1], rng=rng)
+    for child in (child1, child2):
+        mutate(child, lecturers, auditoriums, rng=rng)
+        assert counters(child) == recount(child)
+    # Нащадки є копіями: їх мутація не змінює батьків
+    assert [counters(parent) for parent in parents] == before
+    assert [recount(parent) for parent in parents] == before
+
+
+def test_splice_and_unplaced_lessons(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule, donor = population[0], population[1]
+    schedule.splice(len(schedule.events) // 2, donor.events[len(donor.events) // 2:])
+    assert counters(schedule) == recount(schedule)
+
+    # Заняття без події рахується як порушення жорстких обмежень
+    empty = Schedule(groups, lecturers, auditoriums, lessons=3)
+    assert (empty.hard_constraints_violations, empty.missing) == (3, 3)
+    empty.add_event(schedule.events[0].copy())
+    assert empty.missing == 2
+    assert counters(empty) == recount(empty)
@@ -0,0 +1,37 @@
+import os
+
+from calendar_model import calendar_scope
+from file_processor import PROBLEM_FILES, load_problem
+from instance_generator import generate_instance
+
+
+def test_instance_is_valid_and_every_lesson_has_a_lecturer(tmp_path):
+    counts = generate_instance(str(tmp_path), 30, seed=1)
+    with calendar_scope():
+        problem = load_problem(str(tmp_path))  # Дані перевіряються під час завантаження
+    assert counts == (len(problem.groups), len(problem.subjects), len(problem.lecturers), len(problem.auditoriums))
+    teaches = {}
+    for lecturer in problem.lecturers.values():
+        assert lecturer['SubjectsCanTeach']
+        for subject_id in lecturer['SubjectsCanTeach']:
+            teaches.setdefault(subject_id, set()).update(lecturer['TypesCanTeach'])
+    assert all({'Лекція', 'Практика'} <= teaches[subj['SubjectID']] for subj in problem.subjects)
+
+
+def test_same_seed_gives_the_same_files(tmp_path):
+    generate_instance(str(tmp_path / 'a'), 20, departments=2, seed=5)
+    generate_instance(str(tmp_path / 'b'), 20, departments=2, seed=5)
+    for name in PROBLEM_FILES:
+        with open(os.path.join(tmp_path, 'a', name), 'rb') as a, open(os.path.join(tmp_path, 'b', name), 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_departments_without_cross_assignments_are_separate(tmp_path):
+    generate_instance(str(tmp_path), 40, departments=4, cross_department_share=0.0, seed=2)
+    with calendar_scope():
+        problem = load_problem(str(tmp_path))
+    # Кафедра групи за її номером, як у generate_instance
+    department = {gid: (int(gid[1:]) - 1) * 4 // len(problem.groups) for gid in problem.groups}
+    subject_department = {subj['SubjectID']: department[subj['GroupID']] for subj in problem.subjects}
+    for lecturer in problem.lecturers.values():
+        assert len({subject_department[sid] for sid in lecturer['SubjectsCanTeach']}) == 1
@@ -0,0 +1,58 @@
+import multiprocessing
+
+import pytest
+
+import islands
+from conftest import counters, recount
+from genetic_algo import genetic_algorithm
+
+
+def test_migration_targets():
+    assert islands.migration_targets('ring', 3, 4) == [0]
+    assert islands.migration_targets('complete', 1, 3) == [0, 2]
+    assert islands.migration_targets('star', 0, 3) == [1, 2]
+    assert islands.migration_targets('star', 2, 3) == [0]
+    assert islands.migration_targets('ring', 0, 1) == []
+    with pytest.raises(ValueError):
+        islands.migration_targets('mesh', 0, 2)
+
+
+def test_island_model_is_reproducible(problem):
+    options = dict(generations=4, islands=2, migration_interval=2, seed=3, observers=[],
+                   seed_strategy='mixed', selection='truncation', elites=1)
+    first = genetic_algorithm(*problem, **options)
+    second = genetic_algorithm(*problem, **options)
+    assert counters(first) == counters(second) == recount(first)
+
+
+def test_island_records_reach_observers(problem):
+    records = []
+    islands.island_model(*problem, n_islands=2, generations=3, population_size=6, seed=1,
+                         observers=[records.append])
+    generations = [record for record in records if record['event'] == 'generation']
+    assert sorted((record['island'], record['generation']) for record in generations) == [
+        (i, g) for i in range(2) for g in range(1, 4)]
+
+
+def test_options_the_islands_ignore_are_rejected(problem):
+    with pytest.raises(ValueError):
+        genetic_algorithm(*problem, generations=2, islands=2, engine='numpy', observers=[])
+    with pytest.raises(ValueError):
+        genetic_algorithm(*problem, generations=2, islands=2, backend='thread', observers=[])
+
+
+def test_crashed_island_raises_instead_of_hanging(problem):
+    # Некоректна стратегія «дощу» завершує процес острова винятком
+    with pytest.raises(RuntimeError):
+        islands.island_model(*problem, n_islands=2, generations=20, population_size=6, migration_interval=2,
+                             strategies=[{}, {'rain': 'x'}], observers=[])
+    assert multiprocessing.active_children() == []
+
+
+def test_failing_observer_stops_the_islands(problem):
+    def cancel(record):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        islands.island_model(*problem, n_islands=2, generations=50, population_size=6, observers=[cancel])
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from conftest import counters, recount
+from local_search import simulated_annealing
+
+
+def _genes(schedule):
+    return [(event.slot, event.auditorium_id, event.lecturer_id) for event in schedule.events]
+
+
+def test_annealing_never_returns_a_worse_schedule(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    genes, scores = _genes(schedule), counters(schedule)
+    best = simulated_annealing(schedule, groups, lecturers, auditoriums, 3000, rng=random.Random(1))
+    assert best.score() <= schedule.score()
+    assert counters(best) == recount(best)
+    # Вихідний розклад не змінюється
+    assert (_genes(schedule), counters(schedule)) == (genes, scores)
+
+
+def test_annealing_is_reproducible(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    results = [_genes(simulated_annealing(population[1], groups, lecturers, auditoriums, 1000, rng=random.Random(4)))
+               for _ in range(2)]
+    assert results[0] == results[1]
+
+
+def test_penalty_keeps_events_in_place(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[2]
+    original = _genes(schedule)
+
+    # Штраф, більший за будь-який виграш оцінки, забороняє змінювати гени подій
+    def penalty(i, event):
+        return 10 ** 9 * ((event.slot, event.auditorium_id, event.lecturer_id) != original[i])
+
+    best = simulated_annealing(schedule, groups, lecturers, auditoriums, 500, rng=random.Random(2),
+                               penalty=penalty, initial_temperature=0.01)
+    assert _genes(best) == original
+
+
+def test_annealing_needs_a_budget(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    with pytest.raises(ValueError):
+        simulated_annealing(population[0], groups, lecturers, auditoriums, None)
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+
+import numpy_engine
+from conftest import counters, recount
+from numpy_engine import ProblemArrays, evaluate, evaluate_cached, random_genes
+from genetic_algo import FitnessCache
+from problem import Problem
+
+
+def _population(problem, seed, size=12):
+    compiled = Problem(*problem)
+    arrays = ProblemArrays(compiled)
+    rng = np.random.default_rng(seed)
+    return compiled, arrays, list(random_genes(arrays, (size, len(compiled.lessons)), rng))
+
+
+def test_vectorized_fitness_matches_python_schedule(problem):
+    for seed in range(3):
+        compiled, arrays, genes = _population(problem, seed)
+        hard, soft = evaluate(arrays, *genes)
+        for row in range(len(hard)):
+            schedule = compiled.to_schedule(*(gene[row] for gene in genes))
+            assert (schedule.hard_constraints_violations, schedule.soft_constraints_score) == (hard[row], soft[row])
+            assert counters(schedule) == recount(schedule)
+
+
+def test_cached_evaluation_matches_direct_evaluation(problem):
+    compiled, arrays, genes = _population(problem, 4)
+    genes = [np.concatenate([gene, gene[:3]]) for gene in genes]  # Однакові розклади в одному поколінні
+    cache = FitnessCache(16)
+    hard, soft, prints, evaluated = evaluate_cached(arrays, genes, cache)
+    assert evaluated == len(hard) - 3
+    assert [hard.tolist(), soft.tolist()] == [values.tolist() for values in evaluate(arrays, *genes)]
+    _, _, _, evaluated = evaluate_cached(arrays, genes, cache)
+    assert evaluated == 0
+
+
+def test_selection_ranks_by_hard_then_soft():
+    genes = [np.arange(4).reshape(4, 1)]
+    hard = np.array([1, 0, 0, 2])
+    soft = np.array([0, 9, 3, 0])
+    selected, hard, soft = numpy_engine._select_top_n(genes, hard, soft, 3)
+    assert selected[0].ravel().tolist() == [2, 1, 0]
+    assert hard.tolist() == [0, 0, 1]
+
+
+def test_engine_is_reproducible_and_returns_scored_schedule(problem):
+    results = []
+    for _ in range(2):
+        random.seed(11)
+        schedule = numpy_engine.genetic_algorithm(*problem, generations=3, population_size=10, observers=[])
+        assert counters(schedule) == recount(schedule)
+        results.append([(event.slot, event.auditorium_id, event.lecturer_id) for event in schedule.events])
+    assert results[0] == results[1]
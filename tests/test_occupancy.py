@@ -0,0 +1,56 @@
+import collections
+import random
+
+from calendar_model import CALENDAR
+from genetic_algo import SlotBitset, mutate
+
+
+def test_slot_bitset_matches_event_counts():
+    rng = random.Random(2)
+    bitset = SlotBitset()
+    counts = collections.Counter()
+    conflicts = 0
+    for _ in range(2000):
+        resource, slot = rng.randrange(3), rng.randrange(8)
+        if counts[(resource, slot)] and rng.random() < 0.5:
+            conflicts += bitset.update(resource, slot, -1)
+            counts[(resource, slot)] -= 1
+        else:
+            conflicts += bitset.update(resource, slot, 1)
+            counts[(resource, slot)] += 1
+        assert conflicts == sum(max(count - 1, 0) for count in counts.values())
+    for resource in range(3):
+        assert bitset.mask(resource) == sum(1 << slot for slot in range(8) if counts[(resource, slot)])
+        for slot in range(8):
+            assert bitset.busy_without(resource, slot, False) == (counts[(resource, slot)] > 0)
+            assert bitset.busy_without(resource, slot, True) == (counts[(resource, slot)] > 1)
+
+
+def test_copied_bitset_is_independent():
+    bitset = SlotBitset()
+    bitset.update('L1', 3, 1)
+    copy = bitset.copy()
+    copy.update('L1', 3, 1)
+    copy.update('L1', 5, 1)
+    assert (bitset.mask('L1'), bitset.overflow) == (1 << 3, {})
+
+
+def test_occupancy_masks_follow_the_events(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    mutate(schedule, lecturers, auditoriums, intensity=0.5, rng=random.Random(3))
+    occupancy = schedule.occupancy
+    busy = collections.defaultdict(int)
+    for event in schedule.events:
+        busy[('lecturer', event.lecturer_id)] |= 1 << event.slot
+        busy[('auditorium', event.auditorium_id)] |= 1 << event.slot
+        for group_id in event.group_ids:
+            busy[('group', group_id)] |= 1 << event.slot
+    for lid in lecturers:
+        assert occupancy.lecturers.mask(lid) == busy[('lecturer', lid)]
+    for aid in auditoriums:
+        assert occupancy.auditoriums.mask(aid) == busy[('auditorium', aid)]
+    for group_id in groups:
+        assert occupancy.groups.mask(group_id) == busy[('group', group_id)]
+        free = occupancy.free_mask(None, [group_id])
+        assert all((free >> slot & 1) != (busy[('group', group_id)] >> slot & 1) for slot in range(CALENDAR.n_slots))
@@ -0,0 +1,40 @@
+import pickle
+import random
+
+import pytest
+
+from conftest import counters, recount
+from genetic_algo import genetic_algorithm
+from parallel import GenerationExecutor
+
+
+def _genes(schedule):
+    return [(event.slot, event.auditorium_id, event.lecturer_id) for event in schedule.events]
+
+
+@pytest.mark.parametrize('backend, workers', [('thread', 3), ('process', 2)])
+def test_result_does_not_depend_on_backend(problem, backend, workers):
+    expected = genetic_algorithm(*problem, generations=2, seed=5, observers=[])
+    result = genetic_algorithm(*problem, generations=2, seed=5, observers=[], backend=backend, workers=workers)
+    assert _genes(result) == _genes(expected)
+    assert counters(result) == counters(expected)
+
+
+def test_executor_breeds_the_same_children_on_every_backend(problem):
+    results = []
+    for backend in ('serial', 'thread'):
+        with GenerationExecutor(*problem, backend=backend, workers=2) as executor:
+            rng = random.Random(3)
+            parents = executor.initial_population(6, rng)
+            children = executor.breed(parents, 8, rng)
+        assert all(counters(child) == recount(child) for child in children)
+        results.append([_genes(child) for child in children])
+    assert results[0] == results[1]
+
+
+def test_pickled_schedule_is_reattached_to_problem_data(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    restored = pickle.loads(pickle.dumps(schedule)).attach(groups, lecturers, auditoriums)
+    assert _genes(restored) == _genes(schedule)
+    assert counters(restored) == counters(schedule) == recount(restored)
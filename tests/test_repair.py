@@ -0,0 +1,40 @@
+import random
+
+from conftest import counters, recount
+from genetic_algo import GenerationIndex, repair
+
+
+# Конфлікти викладачів перебором: позиції подій, викладач яких має в тому самому слоті ще одну подію
+def lecturer_conflicts(schedule):
+    slots = {}
+    for position, event in enumerate(schedule.events):
+        slots.setdefault((event.lecturer_id, event.slot), []).append(position)
+    return {position for positions in slots.values() if len(positions) > 1 for position in positions}
+
+
+def test_violations_index_marks_conflicting_events(population):
+    for schedule in population:
+        index = schedule.violations()
+        assert {position for position, kinds in index.items() if 'lecturer' in kinds} == lecturer_conflicts(schedule)
+        # Кожне жорстке порушення, крім нерозміщених занять, стосується хоча б однієї події
+        assert bool(index) == (schedule.hard_constraints_violations > schedule.missing)
+
+
+def test_repair_never_adds_hard_violations(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    index = GenerationIndex(lecturers, auditoriums)
+    rng = random.Random(3)
+    improved = False
+    for schedule in population:
+        before = schedule.hard_constraints_violations
+        repaired = repair(schedule, index, rng)
+        assert schedule.hard_constraints_violations <= before
+        assert counters(schedule) == recount(schedule)
+        improved |= repaired > 0 and schedule.hard_constraints_violations < before
+    assert improved
+
+
+def test_repair_limit_bounds_changed_events(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = population[0]
+    assert repair(schedule, GenerationIndex(lecturers, auditoriums), random.Random(1), limit=2) <= 2
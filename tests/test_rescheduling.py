@@ -0,0 +1,50 @@
+import copy
+import random
+
+import rescheduling
+from genetic_algo import generate_initial_population
+
+
+def test_diff_inputs_reports_changes(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    new_lecturers = copy.deepcopy(lecturers)
+    new_lecturers['L1']['MaxHoursPerWeek'] = 2
+    del new_lecturers['L2']
+    new_auditoriums = dict(auditoriums, A9=40)
+    diff = rescheduling.diff_inputs(problem, (groups, subjects, new_lecturers, new_auditoriums))
+    assert diff['lecturers'] == {'removed': ['L2'], 'added': [], 'changed': ['L1']}
+    assert diff['auditoriums'] == {'removed': [], 'added': ['A9'], 'changed': []}
+    assert diff['groups'] == diff['subjects'] == {'removed': [], 'added': [], 'changed': []}
+
+
+def test_unchanged_data_keeps_the_schedule(problem):
+    previous = generate_initial_population(1, *problem, rng=random.Random(3))[0]
+    schedule, report = rescheduling.reschedule(previous, problem, *problem, iterations=200, rng=random.Random(1))
+    assert report['affected'] == 0 and report['moved_untouched'] == 0
+    assert [(e.slot, e.lecturer_id, e.auditorium_id) for e in schedule.events] == [
+        (e.slot, e.lecturer_id, e.auditorium_id) for e in previous.events]
+
+
+def test_affected_events_follow_changed_lecturer(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    schedule = generate_initial_population(1, *problem, rng=random.Random(3))[0]
+    lecturer_id = schedule.events[0].lecturer_id
+    new_lecturers = copy.deepcopy(lecturers)
+    new_lecturers[lecturer_id]['SubjectsCanTeach'] = []
+    diff = rescheduling.diff_inputs(problem, (groups, subjects, new_lecturers, auditoriums))
+    affected = rescheduling.affected_events(schedule, diff, groups, new_lecturers, auditoriums)
+    assert affected == [i for i, event in enumerate(schedule.events) if event.lecturer_id == lecturer_id]
+
+
+def test_removed_lecturer_is_replaced(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    previous = generate_initial_population(1, *problem, rng=random.Random(3))[0]
+    # Практики дисципліни S4 веде також L3 та L4
+    removed = 'L2'
+    assert any(event.lecturer_id == removed for event in previous.events)
+    new_lecturers = {lid: lecturer for lid, lecturer in lecturers.items() if lid != removed}
+    schedule, report = rescheduling.reschedule(previous, problem, groups, subjects, new_lecturers, auditoriums,
+                                               iterations=500, rng=random.Random(1))
+    assert all(event.lecturer_id != removed for event in schedule.events)
+    assert report['affected'] > 0 and report['events'] == len(schedule.events) == len(previous.events)
+    assert report['score'] == schedule.score()
@@ -0,0 +1,73 @@
+import collections
+import multiprocessing
+import threading
+
+import server
+from calendar_model import CALENDAR
+
+
+# З'єднання з сервером для _run_job: надіслані записи та вхідні повідомлення, які видаються після
+# першого надісланого запису
+class FakeConn:
+    def __init__(self, incoming=()):
+        self.sent = []
+        self.incoming = collections.deque(incoming)
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def poll(self):
+        return bool(self.incoming)
+
+    def recv(self):
+        return self.incoming.popleft()
+
+
+# Завдання з уже розібраними даними задачі та власним календарем
+def data_job(problem, **options):
+    groups, subjects, lecturers, auditoriums = problem
+    data = {'groups': dict(groups), 'subjects': subjects, 'lecturers': lecturers, 'auditoriums': dict(auditoriums),
+            'calendar': {'days_per_week': 4}}
+    return {'data': data, 'options': dict(options), 'views': ['csv']}
+
+
+def test_job_returns_result_and_restores_calendar(problem):
+    key = CALENDAR.key
+    conn = FakeConn()
+    result = server._run_job(conn, '1', data_job(problem, generations=2, seed=1))
+    assert result['event'] == 'result' and set(result['exports']) == {'csv'}
+    assert all(job_id == '1' for job_id, record in conn.sent)
+    assert CALENDAR.key == key
+
+
+def test_cancel_stops_the_running_job(problem):
+    key = CALENDAR.key
+    conn = FakeConn([('cancel', '0', None), ('cancel', '1', None)])
+    result = server._run_job(conn, '1', data_job(problem, generations=50, seed=1))
+    assert result == {'event': 'cancelled'}
+    assert not conn.incoming and len(conn.sent) == 1  # Скасування перевіряється після першого запису
+    assert CALENDAR.key == key
+
+
+def test_data_errors_are_returned_as_a_list(problem):
+    job = data_job(problem)
+    job['data']['auditoriums'] = dict(job['data']['auditoriums'], A9=0)
+    del job['data']['groups'][next(iter(job['data']['groups']))]
+    result = server._run_job(FakeConn(), '1', job)
+    assert result['event'] == 'error' and len(result['errors']) > 1
+    assert any('A9' in error for error in result['errors'])
+
+
+def test_worker_runs_jobs_until_stopped(problem):
+    parent, child = multiprocessing.Pipe()
+    worker = threading.Thread(target=server._worker, args=(child,))
+    worker.start()
+    parent.send(('cancel', '0', None))  # Скасування завершеного завдання ігнорується
+    parent.send(('job', '1', data_job(problem, generations=1, seed=1)))
+    while True:
+        job_id, record = parent.recv()
+        if record['event'] in server.FINAL_EVENTS:
+            break
+    parent.send(None)
+    worker.join(timeout=10)
+    assert (job_id, record['event']) == ('1', 'result') and not worker.is_alive()
@@ -0,0 +1,53 @@
+import csv
+import json
+
+import telemetry
+from genetic_algo import genetic_algorithm, lesson_count
+
+
+def test_expected_event_count_matches_compiled_lessons(problem):
+    groups, subjects, lecturers, auditoriums = problem
+    assert telemetry.expected_event_count(groups, subjects) == lesson_count(*problem)
+
+
+def test_generation_record_summarises_the_population():
+    record = telemetry.generation_record('python', 'hard', 3, [4, 2, 6], [1, 5, 3], 0.25, 2,
+                                         {'selection': 0.5}, 1.5)
+    assert (record['best_hard'], record['mean_hard'], record['worst_hard']) == (2, 4.0, 6)
+    assert (record['best_soft'], record['mean_soft'], record['worst_soft']) == (1, 3.0, 5)
+    assert record['seconds'] == {step: 0.5 if step == 'selection' else 0.0 for step in telemetry.GENERATION_STEPS}
+
+
+def test_diversity_of_identical_and_changed_populations(population):
+    copies = [population[0], population[0].copy()]
+    assert telemetry.schedule_diversity(copies) == 0.0
+    assert 0.0 < telemetry.schedule_diversity(population) <= 1.0
+
+
+def test_every_generation_reaches_the_observers(problem):
+    records, stats = [], {}
+    genetic_algorithm(*problem, generations=3, seed=2, observers=[records.append], stats=stats)
+    generations = [record for record in records if record['event'] == 'generation']
+    assert [(r['phase'], r['generation']) for r in generations] == (
+        [('hard', g) for g in range(1, stats['generations_hard'] + 1)]
+        + [('soft', g) for g in range(1, stats.get('generations_soft', 0) + 1)])
+    assert all(set(r['seconds']) == set(telemetry.GENERATION_STEPS) for r in generations)
+
+
+def test_observers_do_not_change_the_result(problem):
+    quiet = genetic_algorithm(*problem, generations=3, seed=2, observers=[])
+    observed = genetic_algorithm(*problem, generations=3, seed=2, observers=[lambda record: None])
+    assert quiet.score() == observed.score()
+
+
+def test_file_sinks_write_generation_records(tmp_path):
+    record = telemetry.generation_record('numpy', 'soft', 1, [0], [2], 0.0, 0, {}, 0.1)
+    for name in ('run.jsonl', 'run.csv'):
+        with telemetry.file_sink(str(tmp_path / name)) as sink:
+            sink(record)
+            sink({'event': 'stop', 'phase': 'soft', 'reason': 'time_limit', 'generation': 1})
+    lines = (tmp_path / 'run.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['event'] for line in lines] == ['generation', 'stop']
+    with open(tmp_path / 'run.csv', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1 and rows[0]['engine'] == 'numpy' and rows[0]['best_soft'] == '2'
@@ -0,0 +1,43 @@
+import pickle
+import random
+
+import checkpoint
+from genetic_algo import Event, EventTemplate, generate_initial_population
+
+
+# Шаблони подій усіх розкладів (за id, щоб рахувати об'єкти, а не значення)
+def templates(population):
+    return {id(event.template): event.template for schedule in population for event in schedule.events}
+
+
+def test_events_and_templates_have_no_instance_dict(population):
+    event = population[0].events[0]
+    assert not hasattr(event, '__dict__') and not hasattr(event.template, '__dict__')
+    assert set(Event.__slots__) == {'slot', 'lecturer_id', 'auditorium_id', 'template'}
+    assert 'fingerprint' in EventTemplate.__slots__
+
+
+def test_population_shares_one_template_per_lesson(problem):
+    population = generate_initial_population(6, *problem, rng=random.Random(2))
+    shared = templates(population)
+    keys = {(t.subject_id, t.event_type, t.week_type, tuple(t.group_ids),
+             tuple(sorted(t.subgroup_ids.items())) if t.subgroup_ids else None) for t in shared.values()}
+    assert len(shared) == len(keys)
+    assert len(shared) < sum(len(schedule.events) for schedule in population)
+
+
+def test_lectures_are_held_for_the_subject_group(problem, population):
+    groups, subjects, lecturers, auditoriums = problem
+    group_of = {subj['SubjectID']: subj['GroupID'] for subj in subjects}
+    for event in population[0].events:
+        assert event.group_ids == [group_of[event.subject_id]]
+
+
+def test_copies_and_decoded_schedules_keep_templates_shared(problem, population):
+    copy = population[0].copy()
+    assert all(a.template is b.template for a, b in zip(copy.events, population[0].events))
+    tables, sizes, genes = checkpoint.encode_population(population)
+    decoded = checkpoint.decode_population(tables, sizes, genes)
+    assert len(templates(decoded)) == len(templates(population))
+    restored = pickle.loads(pickle.dumps(population))
+    assert len(templates(restored)) == len(templates(population))